@@ -0,0 +1,232 @@
+"""
+Deterministic synthetic fixtures for the benchmark suite.
+
+Everything is derived from a seeded random.Random, so two runs on the same
+code produce byte-identical documents, LLM responses and database rows.
+"""
+import json
+import random
+import sqlite3
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+
+from docx import Document
+
+SEED = 1729
+
+WORDS = (
+    "python fastapi sqlite react kubernetes docker aws terraform postgres redis kafka "
+    "spark airflow pandas typescript graphql rest grpc microservices observability "
+    "latency throughput pipeline migration architecture mentoring stakeholder roadmap "
+    "delivered reduced improved designed launched scaled automated optimized led built "
+    "customers revenue reliability incident oncall testing ci cd security compliance "
+    "analytics dashboards experimentation machine learning models features platform team"
+).split()
+
+SKILLS = ["Python", "FastAPI", "SQL", "React", "AWS", "Docker", "Kubernetes", "Terraform", "Kafka", "Go"]
+STATUSES = ["draft", "completed", "completed", "completed", "failed", "processing"]
+
+# Text lines per page for generated PDFs and (approximately) DOCX files
+LINES_PER_PAGE = 45
+
+
+# Bump when seed_applications() output changes so cached benchmark databases are rebuilt
+FIXTURE_VERSION = 1
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path: Path, pages: int, seed: int = SEED) -> Path:
+    """Write a text-only PDF with `pages` pages of resume-like lines (no third-party writer needed)."""
+    rng = random.Random(seed + pages)
+    # Object 1: catalog, 2: page tree, 3: font; then a (page, content stream) pair per page
+    objects: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for _ in range(pages):
+        lines = [_sentence(rng, rng.randint(8, 14)) for _ in range(LINES_PER_PAGE)]
+        text = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in lines)
+        stream = f"BT /F1 10 Tf 14 TL 50 790 Td {text} ET".encode("latin-1")
+        objects.append(b"")  # page placeholder, filled once the content object number is known
+        page_id = len(objects)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects[page_id - 1] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(page_id)
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+
+    path.write_bytes(bytes(out))
+    return path
+
+
+def make_docx(path: Path, pages: int, seed: int = SEED) -> Path:
+    """Write a DOCX with roughly `pages` pages of paragraphs plus a skills table."""
+    rng = random.Random(seed + pages)
+    doc = Document()
+    doc.add_heading("Jane Candidate", level=1)
+    for page in range(pages):
+        doc.add_heading(f"Section {page + 1}", level=2)
+        for _ in range(LINES_PER_PAGE - 5):
+            doc.add_paragraph(_sentence(rng, rng.randint(8, 14)))
+    table = doc.add_table(rows=max(pages, 1) * 2, cols=3)
+    for row in table.rows:
+        for cell in row.cells:
+            cell.text = rng.choice(SKILLS)
+    doc.save(str(path))
+    return path
+
+
+def make_job_description(sentences: int = 10, seed: int = SEED) -> str:
+    rng = random.Random(seed + sentences)
+    return " ".join(_sentence(rng, 20) for _ in range(sentences))
+
+
+def make_resume_data(experience: int, bullets: int, seed: int = SEED) -> Dict[str, Any]:
+    """Analysis/resume pair in the shape the LLM is asked to return."""
+    rng = random.Random(seed + experience * 100 + bullets)
+    return {
+        "analysis": {
+            "job_keywords": rng.sample(WORDS, 15),
+            "matching_skills": rng.sample(SKILLS, 5),
+            "gaps": rng.sample(WORDS, 4),
+            "recommendations": [_sentence(rng, 12) for _ in range(3)],
+        },
+        "resume": {
+            "name": "Jane Candidate",
+            "contact": {
+                "location": "Remote",
+                "phone": "+1 555 0100",
+                "email": "jane@example.com",
+                "linkedin": "linkedin.com/in/jane",
+            },
+            "professional_summary": " ".join(_sentence(rng, 16) for _ in range(3)),
+            "core_competencies": {
+                "Languages": rng.sample(SKILLS, 4),
+                "Platforms": rng.sample(SKILLS, 4),
+                "Practices": rng.sample(WORDS, 5),
+            },
+            "experience": [
+                {
+                    "company": f"Company {i}",
+                    "location": "Remote",
+                    "title": "Senior Engineer",
+                    "start_date": f"{2024 - i}-01",
+                    "end_date": "Present" if i == 0 else f"{2025 - i}-01",
+                    "bullets": [_sentence(rng, rng.randint(14, 24)) for _ in range(bullets)],
+                }
+                for i in range(experience)
+            ],
+            "education": [{
+                "degree": "BSc",
+                "field": "Computer Science",
+                "university": "State University",
+                "location": "Springfield",
+                "graduation_date": "2012",
+                "coursework": rng.sample(WORDS, 6),
+            }],
+            "certifications": ["AWS Cloud Practitioner (2021)"],
+            "skills": rng.sample(WORDS, 6),
+        },
+    }
+
+
+def make_llm_response(experience: int, bullets: int, seed: int = SEED) -> str:
+    """Raw LLM text: prose, then the JSON in a fenced block, then trailing prose."""
+    payload = json.dumps(make_resume_data(experience, bullets, seed), indent=2)
+    return (
+        "Here is the tailored resume you asked for, analysed against the job description.\n\n"
+        f"```json\n{payload}\n```\n\n"
+        "Let me know if you would like a different emphasis."
+    )
+
+
+def seed_applications(db_path: Path, rows: int, seed: int = SEED) -> List[str]:
+    """
+    Bulk-insert `rows` applications (each with 1-2 base resumes) into a migrated
+    database. Goes through sqlite3 directly so seeding 100k rows takes seconds;
+    the schema's FTS and version triggers still fire. Returns the inserted IDs;
+    run optimize_database(analyze=True) afterwards for realistic planner statistics.
+    """
+    rng = random.Random(seed + rows)
+    # Job descriptions are drawn from a sentence pool; generating every word per row dominates seeding time
+    sentences = [_sentence(rng, 20) for _ in range(2000)]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    ids = []
+    applications = []
+    resumes = []
+    for i in range(rows):
+        application_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        ids.append(application_id)
+        created = (start + timedelta(minutes=i * 7)).isoformat()
+        status = rng.choice(STATUSES)
+        analysis = None
+        if status == "completed":
+            analysis = json.dumps({"job_keywords": rng.sample(WORDS, 8), "gaps": rng.sample(WORDS, 3)})
+        applications.append((
+            application_id,
+            f"{rng.choice(['Senior', 'Staff', 'Lead'])} {rng.choice(SKILLS)} Engineer",
+            f"Company {rng.randint(1, rows // 3 + 1)}",
+            " ".join(rng.choices(sentences, k=10)),
+            "sonar-pro",
+            status,
+            analysis,
+            created,
+            created,
+        ))
+        for n in range(rng.randint(1, 2)):
+            resumes.append((application_id, f"uploads/{application_id}-{n}.pdf", f"resume-{n}.pdf",
+                            "application/pdf", rng.randint(20_000, 400_000), created))
+
+    conn = sqlite3.connect(str(db_path))
+    try:
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO applications (id, job_title, company, job_description, ai_model,
+                    status, analysis, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                applications
+            )
+            conn.executemany(
+                """
+                INSERT INTO base_resumes (application_id, file_path, file_name, file_type, file_size, uploaded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                resumes
+            )
+    finally:
+        conn.close()
+    return ids
+
+
+def application_ids(db_path: Path) -> List[str]:
+    """IDs of the seeded applications, in insertion order."""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return [row[0] for row in conn.execute("SELECT id FROM applications ORDER BY rowid")]
+    finally:
+        conn.close()
@@ -0,0 +1,323 @@
+"""
+Microbenchmarks for the document parser, DOCX generator, LLM response parsing
+and ApplicationRepository.
+
+Run from backend/:
+
+    python -m benchmarks.run                          # full suite, writes benchmarks/results/latest.json
+    python -m benchmarks.run --quick --filter parser  # fewer sizes and rounds, parser benchmarks only
+    python -m benchmarks.run --compare benchmarks/baseline.json
+
+--compare exits with status 1 when any benchmark's median is slower than the
+baseline by more than --threshold (default 15%). Timings are only comparable
+between runs on the same machine.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from config import settings  # noqa: E402
+from benchmarks import fixtures  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# Seeded databases are reused across runs; seeding 100k rows takes a while
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+
+PAGE_COUNTS = (1, 5, 20, 50)
+QUICK_PAGE_COUNTS = (1, 5)
+ROW_COUNTS = (10, 1_000, 100_000)
+QUICK_ROW_COUNTS = (10, 1_000)
+# (experience entries, bullets per entry) -> roughly 3 KB, 60 KB and 600 KB of JSON
+LLM_RESPONSE_SIZES = {"small": (3, 4), "large": (30, 12), "huge": (200, 20)}
+
+
+class Runner:
+    """Times callables until both a minimum round count and a minimum total time are reached."""
+
+    def __init__(self, min_rounds: int, min_time: float, max_rounds: int, name_filter: Optional[str]):
+        self.min_rounds = min_rounds
+        self.min_time = min_time
+        self.max_rounds = max_rounds
+        self.name_filter = name_filter
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def wanted(self, name: str) -> bool:
+        return not self.name_filter or self.name_filter in name
+
+    async def bench(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        setup: Optional[Callable[[], Any]] = None,
+        **params: Any
+    ) -> None:
+        """Time `func` (sync or async); `setup` runs untimed before every round."""
+        if not self.wanted(name):
+            return
+
+        async def call(fn):
+            result = fn()
+            if inspect.isawaitable(result):
+                await result
+
+        # One untimed warm-up round
+        if setup:
+            await call(setup)
+        await call(func)
+
+        samples: List[float] = []
+        total = 0.0
+        while len(samples) < self.max_rounds and (len(samples) < self.min_rounds or total < self.min_time):
+            if setup:
+                await call(setup)
+            start = time.perf_counter()
+            await call(func)
+            elapsed = time.perf_counter() - start
+            samples.append(elapsed * 1000)
+            total += elapsed
+
+        samples.sort()
+        result = {
+            "median_ms": statistics.median(samples),
+            "mean_ms": statistics.fmean(samples),
+            "min_ms": samples[0],
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "stdev_ms": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "rounds": len(samples),
+            "params": params,
+        }
+        self.results[name] = result
+        print(f"{name:<55} median {result['median_ms']:>10.3f} ms   ({result['rounds']} rounds)")
+
+
+async def bench_parser(runner: Runner, workdir: Path, page_counts) -> None:
+    from services.document_parser import DocumentParser
+
+    for pages in page_counts:
+        pdf = fixtures.make_pdf(workdir / f"resume-{pages}.pdf", pages)
+        docx = fixtures.make_docx(workdir / f"resume-{pages}.docx", pages)
+        txt = workdir / f"resume-{pages}.txt"
+        txt.write_text(await DocumentParser.parse_pdf(str(pdf)), encoding="utf-8")
+
+        await runner.bench(f"parser.parse_pdf[pages={pages}]", lambda p=pdf: DocumentParser.parse_pdf(str(p)), pages=pages)
+        await runner.bench(f"parser.parse_docx[pages={pages}]", lambda p=docx: DocumentParser.parse_docx(str(p)), pages=pages)
+        await runner.bench(f"parser.parse_txt[pages={pages}]", lambda p=txt: DocumentParser.parse_txt(str(p)), pages=pages)
+
+
+async def bench_generator(runner: Runner, workdir: Path) -> None:
+    from services.resume_generator import ResumeGenerator
+
+    for size, (experience, bullets) in LLM_RESPONSE_SIZES.items():
+        raw = fixtures.make_llm_response(experience, bullets)
+        await runner.bench(
+            f"generator.parse_llm_response[{size}]",
+            lambda r=raw: ResumeGenerator._parse_llm_response(r),
+            response_bytes=len(raw)
+        )
+        parsed = ResumeGenerator._parse_llm_response(raw)
+        await runner.bench(
+            f"generator.normalize_resume_data[{size}]",
+            lambda d=parsed: ResumeGenerator.normalize_resume_data(d),
+            response_bytes=len(raw)
+        )
+        # Output cut off at 80% has to go through the repair path
+        truncated = raw[:int(len(raw) * 0.8)]
+        await runner.bench(
+            f"generator.parse_llm_response_truncated[{size}]",
+            lambda r=truncated: ResumeGenerator._parse_llm_response(r),
+            response_bytes=len(truncated)
+        )
+
+    for size in ("small", "large"):
+        data = fixtures.make_resume_data(*LLM_RESPONSE_SIZES[size])
+        output = workdir / f"generated-{size}.docx"
+        await runner.bench(
+            f"generator.generate_docx[{size}]",
+            lambda d=data, o=output: ResumeGenerator.generate_docx(d, str(o)),
+            experience=len(data["resume"]["experience"])
+        )
+
+
+async def bench_repository(runner: Runner, workdir: Path, row_counts) -> None:
+    from database import init_database, optimize_database, MIGRATIONS
+    from models import JobApplication
+    from repositories.application_repo import ApplicationRepository, SUMMARY_FIELDS
+
+    for rows in row_counts:
+        if not any(runner.wanted(f"repo.{op}[rows={rows}]") for op in (
+            "get_all", "get_projection", "get_by_id", "update", "search", "create", "delete", "get_version"
+        )):
+            continue
+
+        settings.DB_PATH = workdir / f"bench-{rows}.db"
+        cached = CACHE_DIR / (
+            f"bench-{rows}-seed{fixtures.SEED}-fixtures{fixtures.FIXTURE_VERSION}"
+            f"-schema{MIGRATIONS[-1][0]}.db"
+        )
+        if cached.exists():
+            shutil.copyfile(cached, settings.DB_PATH)
+            await init_database()
+            ids = fixtures.application_ids(settings.DB_PATH)
+        else:
+            await init_database()
+            seed_start = time.perf_counter()
+            ids = fixtures.seed_applications(settings.DB_PATH, rows)
+            await optimize_database(analyze=True)
+            print(f"  seeded {rows} rows in {time.perf_counter() - seed_start:.1f}s")
+            CACHE_DIR.mkdir(exist_ok=True)
+            shutil.copyfile(settings.DB_PATH, cached)
+        ApplicationRepository._cache.clear()
+        target = ids[len(ids) // 2]
+        job_description = fixtures.make_job_description()
+
+        await runner.bench(f"repo.get_all[rows={rows}]", ApplicationRepository.get_all, rows=rows)
+        await runner.bench(
+            f"repo.get_projection[rows={rows}]",
+            lambda: ApplicationRepository.get_projection(SUMMARY_FIELDS),
+            rows=rows
+        )
+        await runner.bench(
+            f"repo.get_by_id[rows={rows},cache=cold]",
+            lambda: ApplicationRepository.get_by_id(target),
+            setup=ApplicationRepository._cache.clear,
+            rows=rows
+        )
+        await runner.bench(
+            f"repo.get_by_id[rows={rows},cache=warm]",
+            lambda: ApplicationRepository.get_by_id(target),
+            rows=rows
+        )
+        await runner.bench(
+            f"repo.update[rows={rows}]",
+            lambda: ApplicationRepository.update(target, {"formatting_preference": "concise"}),
+            rows=rows
+        )
+        await runner.bench(
+            f"repo.search[rows={rows}]",
+            lambda: ApplicationRepository.search("python engineer latency"),
+            rows=rows
+        )
+        await runner.bench(f"repo.get_version[rows={rows}]", ApplicationRepository.get_version, rows=rows)
+
+        created: List[str] = []
+
+        async def create():
+            application = JobApplication(
+                job_title="Benchmark Engineer", company="Bench Co",
+                job_description=job_description, ai_model="sonar-pro"
+            )
+            await ApplicationRepository.create(application)
+            created.append(application.id)
+
+        async def delete():
+            await ApplicationRepository.delete(created.pop())
+
+        await runner.bench(f"repo.create[rows={rows}]", create, rows=rows)
+        # Each round deletes a row created by the (untimed) setup
+        await runner.bench(f"repo.delete[rows={rows}]", delete, setup=create, rows=rows)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print a median-vs-baseline table; returns the names of benchmarks that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("median_ms"):
+            print(f"{name:<55} {'-':>12} {result['median_ms']:>10.3f}ms {'new':>9}")
+            continue
+        change = result["median_ms"] / base["median_ms"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  improved"
+        print(
+            f"{name:<55} {base['median_ms']:>10.3f}ms {result['median_ms']:>10.3f}ms {change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+async def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    runner = Runner(
+        min_rounds=3 if args.quick else 5,
+        min_time=0.1 if args.quick else 0.5,
+        max_rounds=args.max_rounds,
+        name_filter=args.filter
+    )
+    with tempfile.TemporaryDirectory(prefix="resume-bench-") as tmp:
+        workdir = Path(tmp)
+        await bench_parser(runner, workdir, QUICK_PAGE_COUNTS if args.quick else PAGE_COUNTS)
+        await bench_generator(runner, workdir)
+        await bench_repository(runner, workdir, args.rows or (QUICK_ROW_COUNTS if args.quick else ROW_COUNTS))
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "seed": fixtures.SEED,
+        },
+        "results": runner.results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the backend microbenchmarks")
+    parser.add_argument("--quick", action="store_true", help="smaller fixtures and fewer rounds")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--rows", type=lambda s: [int(v) for v in s.split(",")],
+                        help="comma-separated repository table sizes (default 10,1000,100000)")
+    parser.add_argument("--max-rounds", type=int, default=200, help="upper bound on timed rounds per benchmark")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "latest.json", help="where to write results")
+    parser.add_argument("--compare", type=Path, help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    # Benchmarks measure the code, not the log handlers
+    logging.disable(logging.WARNING)
+    results = asyncio.run(run_suite(args))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
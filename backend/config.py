@@ -1,4 +1,6 @@
 import os
+import socket
+import uuid
 from pathlib import Path
 from typing import List, Dict
 from dotenv import load_dotenv
@@ -14,14 +16,39 @@ class AIModelConfig(BaseModel):
     display_name: str
     description: str
     api_model_name: str  # The actual model name sent to the API
+    tokenizer: str = "cl100k_base"  # tiktoken encoding closest to the model's own tokenizer, for estimates
+    context_tokens: int = 0  # Prompt plus output the model accepts (0 if unknown)
 
 class Settings:
     # Database
     DB_NAME = "resume_builder.db"
     DB_PATH = ROOT_DIR / DB_NAME
+    DB_BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '5000'))
+    DB_OPTIMIZE_INTERVAL_SECONDS = int(os.getenv('DB_OPTIMIZE_INTERVAL_SECONDS', str(6 * 60 * 60)))
+    # Extra attempts for writes that still hit "database is locked" after busy_timeout
+    DB_WRITE_RETRIES = int(os.getenv('DB_WRITE_RETRIES', '5'))
+
+    # Worker processes sharing the database; uvicorn also reads WEB_CONCURRENCY as its --workers default.
+    # `uvicorn --workers N` does not tell the app, so unless WEB_CONCURRENCY=1 says otherwise other workers
+    # are assumed: cache hits are revalidated against the database and events are relayed between workers.
+    WORKERS = int(os.getenv('WEB_CONCURRENCY', '0'))
+    SINGLE_WORKER = WORKERS == 1
+    # Unique per process start, so a restarted process reusing a PID does not inherit leases
+    WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    # A generation claimed by a worker that died is reclaimable after this many seconds
+    GENERATION_LEASE_SECONDS = int(os.getenv('GENERATION_LEASE_SECONDS', '600'))
+    # Seconds between event relay polls in multi-worker mode
+    EVENT_RELAY_INTERVAL_SECONDS = float(os.getenv('EVENT_RELAY_INTERVAL_SECONDS', '0.5'))
+
+    # In-process application cache (set either value to 0 to disable)
+    APP_CACHE_MAX_ENTRIES = int(os.getenv('APP_CACHE_MAX_ENTRIES', '512'))
+    APP_CACHE_TTL_SECONDS = float(os.getenv('APP_CACHE_TTL_SECONDS', '300'))
     
     # API Keys
     LLM_API_KEY = os.getenv("LLM_API_KEY", "")
+
+    # OpenAI-compatible endpoint for the perplexity provider (point at loadtest/mock_provider.py for load tests)
+    LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.perplexity.ai")
     
     # Directories
     UPLOAD_DIR = ROOT_DIR / "uploads"
@@ -30,6 +57,94 @@ class Settings:
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
 
+    # Responses smaller than this (bytes) are sent uncompressed
+    GZIP_MIN_SIZE = int(os.getenv('GZIP_MIN_SIZE', '1024'))
+
+    # Seconds between keep-alive comments on the /api/events stream
+    SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+
+    # Provider request budget shared by all workers (0 disables); callers wait up to
+    # LLM_RATE_LIMIT_MAX_WAIT_SECONDS for a token before failing with a rate-limit error
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv('LLM_REQUESTS_PER_MINUTE', '0'))
+    LLM_RATE_LIMIT_BURST = int(os.getenv('LLM_RATE_LIMIT_BURST', '5'))
+    LLM_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv('LLM_RATE_LIMIT_MAX_WAIT_SECONDS', '30'))
+
+    # Admission control per worker: concurrent requests, queued requests and queue wait before a 503.
+    # "generate" covers single and batch generation, "upload" covers upload and add-resume.
+    ADMISSION_GENERATE_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_GENERATE_MAX_IN_FLIGHT', '8'))
+    ADMISSION_GENERATE_MAX_QUEUE = int(os.getenv('ADMISSION_GENERATE_MAX_QUEUE', '16'))
+    ADMISSION_GENERATE_MAX_WAIT_SECONDS = float(os.getenv('ADMISSION_GENERATE_MAX_WAIT_SECONDS', '30'))
+    ADMISSION_UPLOAD_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_UPLOAD_MAX_IN_FLIGHT', '4'))
+    ADMISSION_UPLOAD_MAX_QUEUE = int(os.getenv('ADMISSION_UPLOAD_MAX_QUEUE', '16'))
+    ADMISSION_UPLOAD_MAX_WAIT_SECONDS = float(os.getenv('ADMISSION_UPLOAD_MAX_WAIT_SECONDS', '10'))
+
+    # Total time budget for one generation (parsing, LLM call incl. retries, rendering); 0 disables
+    GENERATION_TIMEOUT_SECONDS = float(os.getenv('GENERATION_TIMEOUT_SECONDS', '180'))
+
+    # Bulk import (POST /api/import): archive limits, parallel parsers and applications per transaction
+    IMPORT_MAX_FILES = int(os.getenv('IMPORT_MAX_FILES', '500'))
+    IMPORT_MAX_TOTAL_BYTES = int(os.getenv('IMPORT_MAX_TOTAL_BYTES', str(200 * 1024 * 1024)))
+    IMPORT_PARSE_CONCURRENCY = int(os.getenv('IMPORT_PARSE_CONCURRENCY', '4'))
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '50'))
+
+    # Applications per database page of GET /api/export.ndjson; files per GET /api/applications/download-zip
+    EXPORT_PAGE_SIZE = int(os.getenv('EXPORT_PAGE_SIZE', '500'))
+    DOWNLOAD_ZIP_MAX_FILES = int(os.getenv('DOWNLOAD_ZIP_MAX_FILES', '200'))
+
+    # Document parsing: pages and characters read per file before stopping (0 is unlimited), and the
+    # process pool that extracts long PDFs PARSE_PAGES_PER_TASK pages at a time (0 workers parses in-process)
+    PARSE_MAX_PAGES = int(os.getenv('PARSE_MAX_PAGES', '20'))
+    PARSE_MAX_CHARS = int(os.getenv('PARSE_MAX_CHARS', '50000'))
+    PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(max(0, min(4, (os.cpu_count() or 1) - 1)))))
+    PARSE_PAGES_PER_TASK = int(os.getenv('PARSE_PAGES_PER_TASK', '4'))
+    # Shorter PDFs are not worth the hand-off to a worker process
+    PARSE_PARALLEL_MIN_PAGES = int(os.getenv('PARSE_PARALLEL_MIN_PAGES', '8'))
+
+    # Rendered resume previews kept in memory per worker, keyed by resume content hash and format
+    PREVIEW_CACHE_MAX_ENTRIES = int(os.getenv('PREVIEW_CACHE_MAX_ENTRIES', '256'))
+    PREVIEW_CACHE_TTL_SECONDS = float(os.getenv('PREVIEW_CACHE_TTL_SECONDS', '3600'))
+
+    # Pre-flight generation estimates: recorded LLM calls per model that predictions are based on,
+    # and the prompt size in tokens above which an estimate carries a warning (0 never warns)
+    ESTIMATE_HISTORY_SIZE = int(os.getenv('ESTIMATE_HISTORY_SIZE', '100'))
+    ESTIMATE_WARN_PROMPT_TOKENS = int(os.getenv('ESTIMATE_WARN_PROMPT_TOKENS', '16000'))
+
+    # Storage lifecycle: seconds between garbage-collection passes (0 disables), directory entries
+    # checked per step, how long unattached uploads and generated resumes are kept (0 keeps them
+    # forever) and disk quotas per directory in MB (0 is unlimited)
+    STORAGE_GC_INTERVAL_SECONDS = float(os.getenv('STORAGE_GC_INTERVAL_SECONDS', '3600'))
+    STORAGE_GC_BATCH_SIZE = int(os.getenv('STORAGE_GC_BATCH_SIZE', '500'))
+    STORAGE_UNATTACHED_RETENTION_HOURS = float(os.getenv('STORAGE_UNATTACHED_RETENTION_HOURS', '24'))
+    STORAGE_GENERATED_RETENTION_DAYS = float(os.getenv('STORAGE_GENERATED_RETENTION_DAYS', '0'))
+    STORAGE_UPLOADS_QUOTA_MB = float(os.getenv('STORAGE_UPLOADS_QUOTA_MB', '0'))
+    STORAGE_GENERATED_QUOTA_MB = float(os.getenv('STORAGE_GENERATED_QUOTA_MB', '0'))
+
+    # Maximum number of job descriptions tailored in a single batched LLM call
+    LLM_BATCH_MAX_JOBS = int(os.getenv('LLM_BATCH_MAX_JOBS', '5'))
+
+    # Admin endpoints and on-demand profiling (admin endpoints are disabled while ADMIN_TOKEN is empty)
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+    PROFILE_DIR = ROOT_DIR / "profiles"
+    PROFILE_ALL_REQUESTS = os.getenv('PROFILE_ALL_REQUESTS', 'false').lower() == 'true'
+    PROFILE_MAX_ARTIFACTS = int(os.getenv('PROFILE_MAX_ARTIFACTS', '20'))
+    PROFILE_TRACEMALLOC_FRAMES = int(os.getenv('PROFILE_TRACEMALLOC_FRAMES', '10'))
+
+    # Log the loop thread's stack when a callback blocks the event loop longer than this (0 disables)
+    LOOP_LAG_THRESHOLD_MS = float(os.getenv('LOOP_LAG_THRESHOLD_MS', '250'))
+
+    # Logging: "json" (one object per line) or "text"; both include the request trace ID
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+
+    # Span export: "none", "file" (OTLP/JSON lines in TRACE_FILE) or "otlp" (POST to OTLP_ENDPOINT/v1/traces)
+    TRACE_EXPORTER = os.getenv('TRACE_EXPORTER', 'none').lower()
+    TRACE_FILE = Path(os.getenv('TRACE_FILE', str(ROOT_DIR / "traces" / "spans.jsonl")))
+    OTLP_ENDPOINT = os.getenv('OTLP_ENDPOINT', 'http://localhost:4318')
+    TRACE_FLUSH_INTERVAL_SECONDS = float(os.getenv('TRACE_FLUSH_INTERVAL_SECONDS', '5'))
+    TRACE_MAX_BUFFERED_SPANS = int(os.getenv('TRACE_MAX_BUFFERED_SPANS', '10000'))
+
+    # Warm up the database, DOCX template and provider connections before accepting traffic
+    STARTUP_WARMUP = os.getenv('STARTUP_WARMUP', 'true').lower() == 'true'
+
     # AI Models
     AVAILABLE_MODELS: List[AIModelConfig] = [
         AIModelConfig(
@@ -37,7 +152,8 @@ class Settings:
             model_id="sonar-pro",
             display_name="Perplexity Sonar Pro",
             description="Advanced online reasoning model by Perplexity",
-            api_model_name="sonar-pro"
+            api_model_name="sonar-pro",
+            context_tokens=200000
         ),
 
     ]
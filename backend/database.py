@@ -1,54 +1,392 @@
+import asyncio
+import functools
+import random
+import sqlite3
 import aiosqlite
 import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from config import settings
+from services.metrics import DB_BUSY_RETRIES
 
 logger = logging.getLogger(__name__)
 
+# Space-separated analysis.job_keywords of the NEW row; empty when analysis is missing or not JSON
+_FTS_KEYWORDS_SQL = """COALESCE(CASE WHEN json_valid(NEW.analysis) THEN (
+        SELECT group_concat(value, ' ') FROM json_each(NEW.analysis, '$.job_keywords')
+    ) END, '')"""
+
+
+def _backfill_terms_sql(table: str, field: str) -> str:
+    """Count each distinct analysis term across completed applications."""
+    return f"""
+        INSERT INTO {table} (term, count)
+        SELECT substr(lower(trim(j.value)), 1, 100), COUNT(DISTINCT a.id)
+        FROM applications a,
+             json_each(CASE WHEN json_valid(a.analysis) THEN a.analysis ELSE '{{}}' END, '$.{field}') j
+        WHERE a.status = 'completed' AND trim(j.value) != ''
+        GROUP BY 1
+    """
+
+
+# Ordered schema migrations: (version, description, statements).
+# Applied versions are recorded in schema_migrations; never edit a released
+# migration, append a new one instead.
+MIGRATIONS = [
+    (1, "Create applications and base_resumes tables", [
+        """
+        CREATE TABLE IF NOT EXISTS applications (
+            id TEXT PRIMARY KEY,
+            job_title TEXT NOT NULL,
+            company TEXT NOT NULL,
+            job_description TEXT NOT NULL,
+            ai_model TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            generated_resume_path TEXT,
+            analysis TEXT,
+            formatting_preference TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS base_resumes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            application_id TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            file_type TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            uploaded_at TEXT NOT NULL,
+            FOREIGN KEY (application_id) REFERENCES applications (id) ON DELETE CASCADE
+        )
+        """,
+    ]),
+    (2, "Index resume lookups and dashboard ordering/filtering", [
+        "CREATE INDEX IF NOT EXISTS idx_base_resumes_application_id ON base_resumes (application_id)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_created_at ON applications (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_status ON applications (status, created_at)",
+    ]),
+    (3, "Remove base_resumes rows orphaned before foreign keys were enforced", [
+        "DELETE FROM base_resumes WHERE application_id NOT IN (SELECT id FROM applications)",
+    ]),
+    (4, "Full-text search index over applications and analysis keywords", [
+        # Rows are keyed by applications.rowid so the sync triggers touch a single FTS row.
+        # VACUUM may renumber those rowids, so rebuild this table after running one.
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5(
+            job_title, company, job_description, keywords,
+            tokenize = 'porter unicode61'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS applications_fts_insert AFTER INSERT ON applications BEGIN
+            INSERT INTO applications_fts (rowid, job_title, company, job_description, keywords)
+            VALUES (NEW.rowid, NEW.job_title, NEW.company, NEW.job_description, {_FTS_KEYWORDS_SQL});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS applications_fts_update
+        AFTER UPDATE OF job_title, company, job_description, analysis ON applications BEGIN
+            DELETE FROM applications_fts WHERE rowid = OLD.rowid;
+            INSERT INTO applications_fts (rowid, job_title, company, job_description, keywords)
+            VALUES (NEW.rowid, NEW.job_title, NEW.company, NEW.job_description, {_FTS_KEYWORDS_SQL});
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS applications_fts_delete AFTER DELETE ON applications BEGIN
+            DELETE FROM applications_fts WHERE rowid = OLD.rowid;
+        END
+        """,
+        f"""
+        INSERT INTO applications_fts (rowid, job_title, company, job_description, keywords)
+        SELECT rowid, job_title, company, job_description, {_FTS_KEYWORDS_SQL.replace('NEW.', '')}
+        FROM applications
+        """,
+    ]),
+    (5, "Analytics rollup tables and per-generation latency", [
+        "ALTER TABLE applications ADD COLUMN generation_ms INTEGER",
+        "CREATE TABLE IF NOT EXISTS analytics_keywords (term TEXT PRIMARY KEY, count INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_analytics_keywords_count ON analytics_keywords (count DESC, term)",
+        "CREATE TABLE IF NOT EXISTS analytics_gaps (term TEXT PRIMARY KEY, count INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_analytics_gaps_count ON analytics_gaps (count DESC, term)",
+        """
+        CREATE TABLE IF NOT EXISTS analytics_status_daily (
+            day TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (day, status)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS analytics_generation_latency (
+            ai_model TEXT NOT NULL,
+            bucket_ms INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (ai_model, bucket_ms)
+        )
+        """,
+        # One-off backfill from existing rows; afterwards the repositories maintain these incrementally
+        _backfill_terms_sql("analytics_keywords", "job_keywords"),
+        _backfill_terms_sql("analytics_gaps", "gaps"),
+        """
+        INSERT INTO analytics_status_daily (day, status, count)
+        SELECT substr(created_at, 1, 10), 'draft', COUNT(*) FROM applications GROUP BY 1
+        """,
+        """
+        INSERT INTO analytics_status_daily (day, status, count)
+        SELECT substr(updated_at, 1, 10), status, COUNT(*) FROM applications
+        WHERE status IS NOT NULL AND status != 'draft' GROUP BY 1, 2
+        ON CONFLICT (day, status) DO UPDATE SET count = count + excluded.count
+        """,
+    ]),
+    (6, "Change counters for conditional GETs and generated file hashes", [
+        "ALTER TABLE applications ADD COLUMN generated_resume_sha256 TEXT",
+        "CREATE TABLE IF NOT EXISTS table_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('applications', 1)",
+        *[
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()} AFTER {event} ON {table} BEGIN
+                UPDATE table_versions SET version = version + 1 WHERE name = 'applications';
+            END
+            """
+            for table in ("applications", "base_resumes")
+            for event in ("INSERT", "UPDATE", "DELETE")
+        ],
+    ]),
+    (7, "Cross-worker coordination: generation leases, shared rate-limit buckets, event relay", [
+        "ALTER TABLE applications ADD COLUMN lease_owner TEXT",
+        "ALTER TABLE applications ADD COLUMN lease_expires_at TEXT",
+        """
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            name TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS event_relay (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origin TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """,
+    ]),
+    (8, "Per-stage checkpoints of the current generation attempt", [
+        """
+        CREATE TABLE IF NOT EXISTS generation_checkpoints (
+            application_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            input_hash TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (application_id, stage),
+            FOREIGN KEY (application_id) REFERENCES applications (id) ON DELETE CASCADE
+        )
+        """,
+    ]),
+    (9, "Keyset pagination index for streaming exports (supersedes the created_at index)", [
+        "CREATE INDEX IF NOT EXISTS idx_applications_created_at_id ON applications (created_at, id)",
+        "DROP INDEX IF EXISTS idx_applications_created_at",
+    ]),
+    (10, "Storage lifecycle: resume path lookups, maintenance leases and last known disk usage", [
+        "CREATE INDEX IF NOT EXISTS idx_base_resumes_file_path ON base_resumes (file_path)",
+        """
+        CREATE TABLE IF NOT EXISTS maintenance_leases (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS storage_usage (
+            kind TEXT PRIMARY KEY,
+            bytes INTEGER NOT NULL,
+            files INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """,
+    ]),
+    (11, "Structured resume of the last generation, addressed by content hash for previews", [
+        "ALTER TABLE applications ADD COLUMN resume_data TEXT",
+        "ALTER TABLE applications ADD COLUMN resume_data_sha256 TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_applications_resume_data_sha256 ON applications (resume_data_sha256)",
+    ]),
+    (12, "Token usage and duration of each LLM call, the history behind generation estimates", [
+        """
+        CREATE TABLE IF NOT EXISTS generation_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            application_id TEXT,
+            ai_model TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            jobs INTEGER NOT NULL DEFAULT 1,
+            prompt_chars INTEGER NOT NULL,
+            prompt_tokens INTEGER NOT NULL,
+            prompt_tokens_local INTEGER NOT NULL,
+            completion_tokens INTEGER NOT NULL,
+            token_source TEXT NOT NULL,
+            llm_ms REAL NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_generation_stats_model_kind ON generation_stats (ai_model, kind, id)",
+    ]),
+]
+
+
+async def _configure_connection(db: aiosqlite.Connection) -> None:
+    """Apply per-connection pragmas."""
+    # Foreign keys are off by default in SQLite; without this ON DELETE CASCADE never fires
+    await db.execute("PRAGMA foreign_keys = ON")
+    await db.execute(f"PRAGMA busy_timeout = {int(settings.DB_BUSY_TIMEOUT_MS)}")
+    await db.execute("PRAGMA synchronous = NORMAL")
+    await db.execute("PRAGMA temp_store = MEMORY")
+
+
+@asynccontextmanager
+async def connect(immediate: bool = False):
+    """
+    Open a configured SQLite connection with dict-style rows.
+
+    With immediate=True the connection starts a write transaction up front
+    (BEGIN IMMEDIATE). Use it for read-then-write code: a deferred transaction
+    that reads first and then writes fails with "database is locked" straight
+    away, without waiting on busy_timeout, when another process committed in
+    between.
+    """
+    async with aiosqlite.connect(str(settings.DB_PATH)) as db:
+        db.row_factory = aiosqlite.Row
+        await _configure_connection(db)
+        if immediate:
+            await db.execute("BEGIN IMMEDIATE")
+        yield db
+
+
+def _is_busy_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+
+def retry_on_busy(func):
+    """
+    Retry an async write with jittered exponential backoff while SQLite reports
+    the database as locked/busy, e.g. during write bursts from several workers.
+    The wrapped function must run its whole transaction so a retry starts clean.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        for attempt in range(settings.DB_WRITE_RETRIES + 1):
+            try:
+                return await func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not _is_busy_error(e) or attempt == settings.DB_WRITE_RETRIES:
+                    raise
+                delay = min(0.05 * 2 ** attempt, 1.0) * random.uniform(0.5, 1.5)
+                DB_BUSY_RETRIES.inc(operation=func.__name__)
+                logger.warning(f"{func.__name__}: {e}; retrying in {delay * 1000:.0f} ms")
+                await asyncio.sleep(delay)
+    return wrapper
+
+
 async def get_db():
     """Get database connection context manager."""
     try:
-        async with aiosqlite.connect(str(settings.DB_PATH)) as db:
-            db.row_factory = aiosqlite.Row
+        async with connect() as db:
             yield db
     except Exception as e:
         logger.error(f"Database connection error: {e}")
         raise
 
+
+async def run_migrations(db: aiosqlite.Connection) -> int:
+    """Apply pending migrations in order, each in its own transaction. Returns the number applied."""
+    await db.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+    await db.commit()
+
+    cursor = await db.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+    current_version = (await cursor.fetchone())[0]
+
+    applied = 0
+    for version, description, statements in MIGRATIONS:
+        if version <= current_version:
+            continue
+        try:
+            # IMMEDIATE takes the write lock before the re-check, so workers starting
+            # together apply each migration exactly once
+            await db.execute("BEGIN IMMEDIATE")
+            cursor = await db.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,))
+            if await cursor.fetchone():
+                await db.rollback()
+                continue
+            for statement in statements:
+                await db.execute(statement)
+            await db.execute(
+                "INSERT INTO schema_migrations (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now(timezone.utc).isoformat())
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            logger.error(f"Migration {version} ({description}) failed")
+            raise
+        logger.info(f"Applied migration {version}: {description}")
+        applied += 1
+    return applied
+
+
+async def _drop_fts_statistics(db: aiosqlite.Connection) -> None:
+    """
+    Remove planner statistics for the FTS5 shadow tables.
+
+    FTS5 tunes its own shadow-table queries; with sqlite_stat1 rows for them
+    (e.g. from an ANALYZE of a fresh, nearly empty database) the planner picks
+    scans that make every FTS insert cost O(rows). New connections load the
+    cleaned statistics.
+    """
+    cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+    if await cursor.fetchone():
+        await db.execute("DELETE FROM sqlite_stat1 WHERE tbl LIKE 'applications\\_fts\\_%' ESCAPE '\\'")
+
+
+async def optimize_database(analyze: bool = False) -> None:
+    """Refresh query planner statistics."""
+    async with connect() as db:
+        if analyze:
+            await db.execute("ANALYZE")
+        await db.execute("PRAGMA optimize")
+        await _drop_fts_statistics(db)
+        await db.commit()
+
+
+async def run_periodic_optimize() -> None:
+    """Background task running PRAGMA optimize every DB_OPTIMIZE_INTERVAL_SECONDS."""
+    while True:
+        await asyncio.sleep(settings.DB_OPTIMIZE_INTERVAL_SECONDS)
+        try:
+            await optimize_database()
+            logger.info("Database optimized")
+        except Exception as e:
+            logger.warning(f"Scheduled database optimize failed: {e}")
+
+
 async def init_database():
-    """Initialize SQLite database with required tables."""
+    """Initialize SQLite database and bring the schema up to date."""
     try:
-        async with aiosqlite.connect(str(settings.DB_PATH)) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS applications (
-                    id TEXT PRIMARY KEY,
-                    job_title TEXT NOT NULL,
-                    company TEXT NOT NULL,
-                    job_description TEXT NOT NULL,
-                    ai_model TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    generated_resume_path TEXT,
-                    analysis TEXT,
-                    formatting_preference TEXT,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-            """)
-            
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS base_resumes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    application_id TEXT NOT NULL,
-                    file_path TEXT NOT NULL,
-                    file_name TEXT NOT NULL,
-                    file_type TEXT NOT NULL,
-                    file_size INTEGER NOT NULL,
-                    uploaded_at TEXT NOT NULL,
-                    FOREIGN KEY (application_id) REFERENCES applications (id) ON DELETE CASCADE
-                )
-            """)
-            
-            await db.commit()
-            logger.info(f"Database initialized at {settings.DB_PATH}")
+        async with connect() as db:
+            # WAL is persistent for the database file and lets readers run alongside a writer
+            await db.execute("PRAGMA journal_mode = WAL")
+            applied = await run_migrations(db)
+
+        # Fresh statistics after schema changes so the planner picks up new indexes
+        await optimize_database(analyze=applied > 0)
+        logger.info(f"Database initialized at {settings.DB_PATH}")
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
@@ -0,0 +1,222 @@
+"""
+Open-loop load driver for the full resume flow:
+
+    upload -> create application -> add resume -> generate -> download
+
+Flows start at a fixed rate (--rps) regardless of how fast earlier ones finish,
+so queueing in the backend shows up as latency instead of being hidden by a
+slower request rate. --max-in-flight caps concurrent flows; arrivals beyond
+the cap are counted as "dropped" rather than queued in the driver.
+
+    python -m loadtest.driver --base-url http://127.0.0.1:8000 --rps 2 --duration 60
+    python -m loadtest.driver --rps 5 --duration 30 --resume-pages 3 --json results.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import httpx  # noqa: E402
+
+from benchmarks import fixtures  # noqa: E402
+
+STEPS = ("upload", "create", "add_resume", "generate", "download")
+PERCENTILES = (50, 90, 95, 99)
+
+
+class StepError(Exception):
+    def __init__(self, step: str, reason: str):
+        super().__init__(f"{step}: {reason}")
+        self.step = step
+        self.reason = reason
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def record(self, step: str, seconds: float) -> None:
+        self.latencies[step].append(seconds * 1000)
+
+    @staticmethod
+    def _percentiles(values: List[float]) -> Dict[str, Any]:
+        if not values:
+            return {"count": 0}
+        ordered = sorted(values)
+        result = {"count": len(ordered), "mean_ms": round(statistics.fmean(ordered), 1)}
+        for p in PERCENTILES:
+            result[f"p{p}_ms"] = round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 1)
+        result["max_ms"] = round(ordered[-1], 1)
+        return result
+
+    def summary(self, elapsed: float, target_rps: float) -> Dict[str, Any]:
+        return {
+            "target_rps": target_rps,
+            "elapsed_s": round(elapsed, 2),
+            "flows": {
+                "started": self.started,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            },
+            "throughput_flows_per_s": round(self.completed / elapsed, 3) if elapsed else 0,
+            "latency": {
+                name: self._percentiles(self.latencies[name]) for name in (*STEPS, "flow")
+            },
+            "errors": {key: count for key, count in self.errors.most_common()},
+        }
+
+
+async def _call(client: httpx.AsyncClient, stats: LoadStats, step: str, method: str, url: str, **kwargs) -> httpx.Response:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.TimeoutException:
+        raise StepError(step, "timeout")
+    except httpx.HTTPError as e:
+        raise StepError(step, type(e).__name__)
+    stats.record(step, time.perf_counter() - start)
+    if response.status_code >= 400:
+        raise StepError(step, f"http_{response.status_code}")
+    return response
+
+
+async def run_flow(client: httpx.AsyncClient, stats: LoadStats, resume: bytes, resume_name: str, n: int) -> None:
+    start = time.perf_counter()
+    files = {"file": (resume_name, resume, "application/pdf")}
+    try:
+        await _call(client, stats, "upload", "POST", "/api/upload", files=files)
+        created = await _call(client, stats, "create", "POST", "/api/applications", json={
+            "job_title": f"Load Test Engineer {n}",
+            "company": "Load Co",
+            "job_description": fixtures.make_job_description(seed=fixtures.SEED + n),
+            "ai_model": "sonar-pro",
+        })
+        application_id = created.json()["id"]
+        await _call(client, stats, "add_resume", "POST", f"/api/applications/{application_id}/add-resume", files=files)
+        await _call(client, stats, "generate", "POST", f"/api/applications/{application_id}/generate")
+        await _call(client, stats, "download", "GET", f"/api/applications/{application_id}/download")
+    except StepError as e:
+        stats.failed += 1
+        stats.errors[f"{e.step}:{e.reason}"] += 1
+        return
+    stats.completed += 1
+    stats.record("flow", time.perf_counter() - start)
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="resume-load-") as tmp:
+        resume_path = fixtures.make_pdf(Path(tmp) / "resume.pdf", args.resume_pages)
+        resume = resume_path.read_bytes()
+
+    stats = LoadStats()
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    timeout = httpx.Timeout(args.timeout, connect=10)
+    tasks = set()
+    in_flight = 0
+    interval = 1 / args.rps
+
+    async def tracked(n: int):
+        nonlocal in_flight
+        try:
+            await run_flow(client, stats, resume, "resume.pdf", n)
+        finally:
+            in_flight -= 1
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        started_at = time.perf_counter()
+        next_report = started_at + args.report_every
+        n = 0
+        while True:
+            now = time.perf_counter()
+            if now - started_at >= args.duration:
+                break
+            # Schedule against the ideal arrival time so slow iterations do not lower the rate
+            next_arrival = started_at + n * interval
+            if now < next_arrival:
+                await asyncio.sleep(next_arrival - now)
+            n += 1
+            if in_flight >= args.max_in_flight:
+                stats.dropped += 1
+            else:
+                in_flight += 1
+                stats.started += 1
+                task = asyncio.create_task(tracked(n))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if time.perf_counter() >= next_report:
+                next_report += args.report_every
+                print(
+                    f"[{time.perf_counter() - started_at:6.1f}s] started={stats.started} completed={stats.completed} "
+                    f"failed={stats.failed} dropped={stats.dropped} in_flight={in_flight}",
+                    flush=True
+                )
+
+        if tasks:
+            print(f"Waiting for {len(tasks)} in-flight flows...", flush=True)
+            await asyncio.wait(tasks, timeout=args.timeout * len(STEPS))
+        elapsed = time.perf_counter() - started_at
+
+    return stats.summary(elapsed, args.rps)
+
+
+def print_report(summary: Dict[str, Any]) -> None:
+    flows = summary["flows"]
+    print(
+        f"\nTarget {summary['target_rps']} flows/s for {summary['elapsed_s']}s: "
+        f"{flows['completed']} completed, {flows['failed']} failed, {flows['dropped']} dropped; "
+        f"throughput {summary['throughput_flows_per_s']} flows/s"
+    )
+    print(f"\n{'step':<12}{'count':>8}{'p50':>10}{'p90':>10}{'p95':>10}{'p99':>10}{'max':>10}   (ms)")
+    for name, row in summary["latency"].items():
+        if not row["count"]:
+            print(f"{name:<12}{0:>8}")
+            continue
+        print(
+            f"{name:<12}{row['count']:>8}{row['p50_ms']:>10}{row['p90_ms']:>10}"
+            f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}"
+        )
+    if summary["errors"]:
+        print("\nErrors:")
+        for key, count in summary["errors"].items():
+            print(f"  {key:<30}{count:>6}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Drive the upload -> generate -> download flow at a target rate")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="backend URL")
+    parser.add_argument("--rps", type=float, default=1.0, help="new flows started per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to keep starting flows")
+    parser.add_argument("--max-in-flight", type=int, default=100, help="cap on concurrent flows")
+    parser.add_argument("--timeout", type=float, default=180.0, help="per-request timeout in seconds")
+    parser.add_argument("--resume-pages", type=int, default=2, help="pages in the uploaded synthetic PDF")
+    parser.add_argument("--report-every", type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument("--json", type=Path, help="also write the summary to this file")
+    args = parser.parse_args(argv)
+    if args.rps <= 0:
+        parser.error("--rps must be positive")
+
+    summary = asyncio.run(run_load(args))
+    print_report(summary)
+    if args.json:
+        args.json.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        print(f"\nSummary written to {args.json}")
+    return 0 if summary["flows"]["completed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Local OpenAI-compatible chat completions server for load testing.
+
+Point the backend at it with LLM_BASE_URL and any non-empty LLM_API_KEY:
+
+    python -m loadtest.mock_provider --port 8100 --latency lognormal:1500:0.4 --rate-429 0.05
+    LLM_BASE_URL=http://127.0.0.1:8100 LLM_API_KEY=mock uvicorn server:app
+
+Responses contain a valid analysis/resume JSON document (or the batch format
+when the prompt asks for several jobs). Latency, streaming speed and the
+share of 429 / 5xx / malformed / truncated / schema-drifted responses are set
+on the command line and can
+be changed while running with POST /__config; GET /__stats returns counters.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+
+from benchmarks import fixtures  # noqa: E402
+
+JOB_REF_RE = re.compile(r"\bJOB_(\d+)\b")
+
+
+class MockConfig:
+    """Behaviour knobs; every field can be updated at runtime through POST /__config."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.latency = args.latency
+        self.rate_429 = args.rate_429
+        self.error_rate = args.error_rate
+        self.malformed_rate = args.malformed_rate
+        self.truncate_rate = args.truncate_rate
+        self.drift_rate = args.drift_rate
+        self.tokens_per_second = args.tokens_per_second
+        self.experience = args.experience
+        self.seed = args.seed
+        self._parse_latency(self.latency)
+
+    def _parse_latency(self, spec: str) -> None:
+        kind, *values = spec.split(":")
+        numbers = [float(v) for v in values]
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}
+        if kind not in expected or len(numbers) != expected[kind]:
+            raise ValueError(
+                f"Invalid latency '{spec}'; use fixed:MS, uniform:MIN_MS:MAX_MS or lognormal:MEDIAN_MS:SIGMA"
+            )
+        self._latency_kind = kind
+        self._latency_values = numbers
+
+    def update(self, values: Dict[str, Any]) -> None:
+        for key, value in values.items():
+            if key.startswith("_") or not hasattr(self, key):
+                raise ValueError(f"Unknown setting '{key}'")
+            if key == "latency":
+                self._parse_latency(value)
+            setattr(self, key, type(getattr(self, key))(value))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in vars(self).items() if not k.startswith("_")}
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Seconds to wait before the first byte."""
+        if self._latency_kind == "fixed":
+            ms = self._latency_values[0]
+        elif self._latency_kind == "uniform":
+            ms = rng.uniform(*self._latency_values)
+        else:
+            median, sigma = self._latency_values
+            ms = rng.lognormvariate(math.log(median), sigma)
+        return max(ms, 0) / 1000
+
+
+def _completion_text(prompt: str, config: MockConfig, rng: random.Random) -> str:
+    if '"applications"' in prompt:
+        refs = sorted({int(n) for n in JOB_REF_RE.findall(prompt)}) or [1]
+        entries = []
+        for n in refs:
+            entry = fixtures.make_resume_data(config.experience, 5, seed=config.seed + n)
+            entries.append({"job_ref": f"JOB_{n}", **entry})
+        return json.dumps({"applications": entries}, indent=2)
+    return json.dumps(fixtures.make_resume_data(config.experience, 5, seed=config.seed), indent=2)
+
+
+def _drift(text: str) -> str:
+    """Typical type mistakes: skill lists and bullets sent as strings, numbers for text."""
+    data = json.loads(text)
+    for resume in [data.get("resume")] + [a.get("resume") for a in data.get("applications", [])]:
+        if not resume:
+            continue
+        resume["core_competencies"] = {k: ", ".join(v) for k, v in resume.get("core_competencies", {}).items()}
+        for entry in resume.get("experience", []):
+            entry["bullets"] = "\n".join(f"- {b}" for b in entry.get("bullets", []))
+        resume.get("contact", {})["phone"] = 5550100
+    return json.dumps(data, indent=2)
+
+
+def _truncate(text: str, rng: random.Random) -> str:
+    """
+    As if the model hit its output token limit: half the time anywhere past the
+    middle, otherwise just inside the last experience entry, right after it opens.
+    """
+    entry = text.rfind('"company": ')
+    if entry > 0 and rng.random() < 0.5:
+        return text[:text.index('"', entry + len('"company": ') + 1) - 1]
+    return text[:int(len(text) * rng.uniform(0.6, 0.95))]
+
+
+def _error(status: int, message: str, error_type: str) -> JSONResponse:
+    return JSONResponse(status_code=status, content={"error": {"message": message, "type": error_type}})
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    app = FastAPI(title="Mock LLM provider")
+    rng = random.Random(config.seed)
+    stats: Dict[str, int] = {
+        "requests": 0, "ok": 0, "rate_limited": 0, "errors": 0,
+        "malformed": 0, "truncated": 0, "drifted": 0, "streamed": 0,
+    }
+
+    @app.get("/__stats")
+    async def get_stats():
+        return {**stats, "config": config.as_dict()}
+
+    @app.post("/__config")
+    async def set_config(request: Request):
+        try:
+            config.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return _error(400, str(e), "invalid_request_error")
+        return config.as_dict()
+
+    @app.post("/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        messages: List[Dict[str, Any]] = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+
+        await asyncio.sleep(config.sample_latency(rng))
+
+        roll = rng.random()
+        if roll < config.rate_429:
+            stats["rate_limited"] += 1
+            return _error(429, "Rate limit exceeded (mock)", "rate_limit_error")
+        if roll < config.rate_429 + config.error_rate:
+            stats["errors"] += 1
+            return _error(rng.choice((500, 502, 503)), "Injected upstream failure (mock)", "server_error")
+
+        if rng.random() < config.malformed_rate:
+            stats["malformed"] += 1
+            text = "I'm sorry, I can't produce JSON for this request right now."
+        else:
+            text = _completion_text(prompt, config, rng)
+            if rng.random() < config.drift_rate:
+                stats["drifted"] += 1
+                text = _drift(text)
+            if rng.random() < config.truncate_rate:
+                stats["truncated"] += 1
+                text = _truncate(text, rng)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "mock")
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(text) // 4,
+            "total_tokens": (len(prompt) + len(text)) // 4,
+        }
+
+        if not body.get("stream"):
+            stats["ok"] += 1
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        async def stream():
+            # ~4 characters per token
+            chunk_chars = 32
+            delay = (chunk_chars / 4) / config.tokens_per_second if config.tokens_per_second > 0 else 0
+            for start in range(0, len(text), chunk_chars):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": text[start:start + chunk_chars]}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if delay:
+                    await asyncio.sleep(delay)
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        stats["ok"] += 1
+        stats["streamed"] += 1
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM provider")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="lognormal:1500:0.5",
+                        help="fixed:MS, uniform:MIN_MS:MAX_MS or lognormal:MEDIAN_MS:SIGMA (default lognormal:1500:0.5)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 5xx")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="share of successful responses whose content is not JSON")
+    parser.add_argument("--truncate-rate", type=float, default=0.0,
+                        help="share of successful responses cut off part-way through the JSON "
+                             "(half of them inside a just-opened experience entry)")
+    parser.add_argument("--drift-rate", type=float, default=0.0,
+                        help="share of successful responses with wrong field types (strings for lists, numbers for text)")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0,
+                        help="generation speed for stream=true responses (0 sends everything at once)")
+    parser.add_argument("--experience", type=int, default=4, help="experience entries per generated resume")
+    parser.add_argument("--seed", type=int, default=fixtures.SEED)
+    args = parser.parse_args()
+
+    # workers=1 explicitly: uvicorn would otherwise pick up WEB_CONCURRENCY meant for the backend
+    uvicorn.run(create_app(MockConfig(args)), host=args.host, port=args.port, log_level="warning", workers=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -33,6 +33,54 @@ class JobApplication(BaseModel):
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class ApplicationSearchResult(BaseModel):
+    id: str
+    job_title: str
+    company: str
+    status: str
+    created_at: datetime
+    snippet: str
+    score: float
+
+
+class ApplicationSearchResponse(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: List[ApplicationSearchResult]
+
+
+class TermCount(BaseModel):
+    term: str
+    count: int
+
+
+class StatusDay(BaseModel):
+    day: str
+    counts: Dict[str, int]
+
+
+class LatencyPercentiles(BaseModel):
+    count: int
+    p50_ms: Optional[int] = None
+    p90_ms: Optional[int] = None
+    p95_ms: Optional[int] = None
+    p99_ms: Optional[int] = None
+
+
+class GenerationLatency(BaseModel):
+    overall: LatencyPercentiles
+    by_model: Dict[str, LatencyPercentiles]
+
+
+class AnalyticsResponse(BaseModel):
+    top_keywords: List[TermCount]
+    top_gaps: List[TermCount]
+    status_by_day: List[StatusDay]
+    generation_latency: GenerationLatency
+
+
 class JobApplicationCreate(BaseModel):
     job_title: str
     company: str
@@ -55,6 +103,10 @@ class GenerateResumeRequest(BaseModel):
     application_id: str
 
 
+class BatchGenerateRequest(BaseModel):
+    application_ids: List[str] = Field(..., min_length=1)
+
+
 class AIModel(BaseModel):
     provider: str
     model_id: str
@@ -0,0 +1,180 @@
+import aiosqlite
+import json
+import logging
+from typing import List, Optional, Dict, Any, Iterable
+from datetime import datetime, timezone, timedelta
+from database import connect
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the generation latency histogram; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (
+    1000, 2000, 5000, 10000, 15000, 20000, 30000, 45000,
+    60000, 90000, 120000, 180000, 300000, 2 ** 31 - 1,
+)
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+MAX_TERM_LENGTH = 100
+
+
+def _normalize_terms(values: Any) -> List[str]:
+    """Lower-cased, de-duplicated terms from an analysis list field."""
+    if not isinstance(values, list):
+        return []
+    terms = {str(v).strip().lower()[:MAX_TERM_LENGTH] for v in values if v is not None}
+    terms.discard("")
+    return sorted(terms)
+
+
+def _latency_bucket(generation_ms: int) -> int:
+    for bound in LATENCY_BUCKETS_MS:
+        if generation_ms <= bound:
+            return bound
+    return LATENCY_BUCKETS_MS[-1]
+
+
+class AnalyticsRepository:
+    """
+    Incrementally maintained analytics rollups.
+
+    Keyword and gap counts reflect the completed analyses of the applications
+    that currently exist; status transitions and generation latencies are an
+    append-only history. Writers call the record_* methods on their own
+    connection so rollups commit atomically with the application change.
+    """
+
+    @staticmethod
+    async def _adjust_terms(db: aiosqlite.Connection, table: str, terms: Iterable[str], delta: int) -> None:
+        terms = list(terms)
+        if not terms:
+            return
+        if delta > 0:
+            await db.executemany(
+                f"""
+                INSERT INTO {table} (term, count) VALUES (?, ?)
+                ON CONFLICT(term) DO UPDATE SET count = count + excluded.count
+                """,
+                [(term, delta) for term in terms]
+            )
+        else:
+            await db.executemany(
+                f"UPDATE {table} SET count = count + ? WHERE term = ?",
+                [(delta, term) for term in terms]
+            )
+            await db.executemany(
+                f"DELETE FROM {table} WHERE term = ? AND count <= 0",
+                [(term,) for term in terms]
+            )
+
+    @staticmethod
+    async def record_analysis(
+        db: aiosqlite.Connection,
+        old_analysis: Optional[Any],
+        new_analysis: Optional[Any]
+    ) -> None:
+        """Swap one application's contribution to the keyword/gap rollups. Accepts dicts or JSON strings."""
+        old = AnalyticsRepository._load(old_analysis)
+        new = AnalyticsRepository._load(new_analysis)
+        for field, table in (("job_keywords", "analytics_keywords"), ("gaps", "analytics_gaps")):
+            old_terms = set(_normalize_terms(old.get(field)))
+            new_terms = set(_normalize_terms(new.get(field)))
+            await AnalyticsRepository._adjust_terms(db, table, sorted(old_terms - new_terms), -1)
+            await AnalyticsRepository._adjust_terms(db, table, sorted(new_terms - old_terms), 1)
+
+    @staticmethod
+    async def record_status(db: aiosqlite.Connection, status: str, at: Optional[str] = None) -> None:
+        """Count a transition into `status` on the day of `at` (ISO timestamp, default now)."""
+        day = (at or datetime.now(timezone.utc).isoformat())[:10]
+        await db.execute(
+            """
+            INSERT INTO analytics_status_daily (day, status, count) VALUES (?, ?, 1)
+            ON CONFLICT(day, status) DO UPDATE SET count = count + 1
+            """,
+            (day, status)
+        )
+
+    @staticmethod
+    async def record_latency(db: aiosqlite.Connection, ai_model: str, generation_ms: int) -> None:
+        await db.execute(
+            """
+            INSERT INTO analytics_generation_latency (ai_model, bucket_ms, count) VALUES (?, ?, 1)
+            ON CONFLICT(ai_model, bucket_ms) DO UPDATE SET count = count + 1
+            """,
+            (ai_model, _latency_bucket(int(generation_ms)))
+        )
+
+    @staticmethod
+    def _load(analysis: Optional[Any]) -> Dict[str, Any]:
+        if isinstance(analysis, dict):
+            return analysis
+        if not analysis:
+            return {}
+        try:
+            loaded = json.loads(analysis)
+        except (TypeError, ValueError):
+            return {}
+        return loaded if isinstance(loaded, dict) else {}
+
+    @staticmethod
+    def _percentiles(buckets: List[tuple]) -> Dict[str, Any]:
+        """Percentile upper bounds from (bucket_ms, count) pairs sorted by bucket, capped at the largest finite bound."""
+        total = sum(count for _, count in buckets)
+        result: Dict[str, Any] = {"count": total}
+        for p in LATENCY_PERCENTILES:
+            value = None
+            if total:
+                threshold = total * p / 100
+                cumulative = 0
+                for bound, count in buckets:
+                    cumulative += count
+                    if cumulative >= threshold:
+                        value = min(bound, LATENCY_BUCKETS_MS[-2])
+                        break
+            result[f"p{p}_ms"] = value
+        return result
+
+    @staticmethod
+    async def get_summary(top: int = 20, days: int = 30) -> Dict[str, Any]:
+        """Read the rollups; cost depends on `top`, `days` and the model count, not on history size."""
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).date().isoformat()
+        async with connect() as db:
+            cursor = await db.execute(
+                "SELECT term, count FROM analytics_keywords ORDER BY count DESC, term LIMIT ?", (top,)
+            )
+            keywords = [{"term": r['term'], "count": r['count']} for r in await cursor.fetchall()]
+
+            cursor = await db.execute(
+                "SELECT term, count FROM analytics_gaps ORDER BY count DESC, term LIMIT ?", (top,)
+            )
+            gaps = [{"term": r['term'], "count": r['count']} for r in await cursor.fetchall()]
+
+            cursor = await db.execute(
+                "SELECT day, status, count FROM analytics_status_daily WHERE day >= ? ORDER BY day",
+                (since,)
+            )
+            status_by_day: Dict[str, Dict[str, int]] = {}
+            for r in await cursor.fetchall():
+                status_by_day.setdefault(r['day'], {})[r['status']] = r['count']
+
+            cursor = await db.execute(
+                "SELECT ai_model, bucket_ms, count FROM analytics_generation_latency ORDER BY ai_model, bucket_ms"
+            )
+            per_model: Dict[str, List[tuple]] = {}
+            overall: Dict[int, int] = {}
+            for r in await cursor.fetchall():
+                per_model.setdefault(r['ai_model'], []).append((r['bucket_ms'], r['count']))
+                overall[r['bucket_ms']] = overall.get(r['bucket_ms'], 0) + r['count']
+
+        return {
+            "top_keywords": keywords,
+            "top_gaps": gaps,
+            "status_by_day": [
+                {"day": day, "counts": counts} for day, counts in status_by_day.items()
+            ],
+            "generation_latency": {
+                "overall": AnalyticsRepository._percentiles(sorted(overall.items())),
+                "by_model": {
+                    model: AnalyticsRepository._percentiles(buckets) for model, buckets in per_model.items()
+                },
+            },
+        }
@@ -1,20 +1,64 @@
-import aiosqlite
-import json
 import logging
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timezone
+import re
+from typing import AsyncIterator, List, Optional, Dict, Any, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
 from models import JobApplication, ResumeFile, JobApplicationCreate, JobApplicationUpdate
+from cache import TTLCache
 from config import settings
+from database import connect, retry_on_busy
+from repositories.analytics_repo import AnalyticsRepository
+from services.event_hub import event_hub
+from services.metrics import DB_QUERY_SECONDS, CACHE_REQUESTS
+from services.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+# Words ignored in free-text search; they match nearly every row and only add ranking noise
+SEARCH_STOPWORDS = {
+    "a", "an", "and", "at", "for", "in", "of", "on", "or", "the", "to", "with",
+    "role", "roles", "job", "jobs", "company", "companies",
+}
+
+# Columns selectable through get_projection(); computed fields map to their SQL expression
+PROJECTION_FIELDS = {
+    "id": None,
+    "job_title": None,
+    "company": None,
+    "job_description": None,
+    "ai_model": None,
+    "status": None,
+    "formatting_preference": None,
+    "generated_resume_path": None,
+    "analysis": None,
+    "created_at": None,
+    "updated_at": None,
+    "resume_count": "(SELECT COUNT(*) FROM base_resumes b WHERE b.application_id = a.id) AS resume_count",
+}
+
+# What the Dashboard cards show
+SUMMARY_FIELDS = ("id", "job_title", "company", "status", "ai_model", "created_at", "updated_at", "resume_count")
+
+# bm25 column weights for applications_fts: job_title, company, job_description, keywords
+SEARCH_COLUMN_WEIGHTS = (10.0, 5.0, 1.0, 4.0)
+
+# Control characters around snippet matches, so markup typed into a job description is never taken for a match
+SNIPPET_OPEN, SNIPPET_CLOSE = "\x02", "\x03"
+
 class ApplicationRepository:
     """Repository for accessing application data in SQLite."""
+
+    # Read-through cache of get_by_id results; every write path below refreshes or invalidates it
+    _cache = TTLCache(
+        max_entries=settings.APP_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.APP_CACHE_TTL_SECONDS
+    )
     
     @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="create")
+    @traced("db.create")
+    @retry_on_busy
     async def create(application: JobApplication) -> JobApplication:
-        async with aiosqlite.connect(str(settings.DB_PATH)) as db:
-            db.row_factory = aiosqlite.Row
+        async with connect(immediate=True) as db:
             await db.execute(
                 """
                 INSERT INTO applications (id, job_title, company, job_description, ai_model, 
@@ -33,78 +77,258 @@ class ApplicationRepository:
                     application.updated_at.isoformat()
                 )
             )
+            await AnalyticsRepository.record_status(db, application.status, application.created_at.isoformat())
             await db.commit()
+        event_hub.publish("created", application.id, status=application.status)
         return application
 
     @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="create_many")
+    @traced("db.create_many")
+    @retry_on_busy
+    async def create_many(entries: Sequence[Tuple[JobApplication, Sequence[ResumeFile]]]) -> None:
+        """Insert applications together with their base resumes in one transaction (bulk import)."""
+        async with connect(immediate=True) as db:
+            await db.executemany(
+                """
+                INSERT INTO applications (id, job_title, company, job_description, ai_model, 
+                                         status, formatting_preference, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        application.id,
+                        application.job_title,
+                        application.company,
+                        application.job_description,
+                        application.ai_model,
+                        application.status,
+                        application.formatting_preference,
+                        application.created_at.isoformat(),
+                        application.updated_at.isoformat()
+                    )
+                    for application, _ in entries
+                ]
+            )
+            await db.executemany(
+                """
+                INSERT INTO base_resumes (application_id, file_path, file_name, file_type, file_size, uploaded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        application.id,
+                        resume_file.file_path,
+                        resume_file.file_name,
+                        resume_file.file_type,
+                        resume_file.file_size,
+                        resume_file.uploaded_at.isoformat()
+                    )
+                    for application, resume_files in entries
+                    for resume_file in resume_files
+                ]
+            )
+            for application, _ in entries:
+                await AnalyticsRepository.record_status(db, application.status, application.created_at.isoformat())
+            await db.commit()
+        for application, _ in entries:
+            event_hub.publish("created", application.id, status=application.status)
+
+    @staticmethod
+    def _row_to_application(row) -> Dict[str, Any]:
+        """Convert an applications row to the dict shape returned by the repository."""
+        app_dict = dict(row)
+        # Parse fields
+        app_dict['created_at'] = datetime.fromisoformat(app_dict['created_at'])
+        app_dict['updated_at'] = datetime.fromisoformat(app_dict['updated_at'])
+        # `analysis` stays the stored JSON text: responses embed it as is, and the
+        # few callers that need the structure decode it themselves
+        return app_dict
+
+    @staticmethod
+    async def _fetch_resumes(db, application_id: str) -> List[Dict[str, Any]]:
+        resume_cursor = await db.execute(
+            "SELECT * FROM base_resumes WHERE application_id = ?", 
+            (application_id,)
+        )
+        resume_rows = await resume_cursor.fetchall()
+        return [ApplicationRepository._resume_to_dict(r) for r in resume_rows]
+
+    @staticmethod
+    def _resume_to_dict(r) -> Dict[str, Any]:
+        return {
+            'id': str(r['id']),
+            'file_path': r['file_path'],
+            'file_name': r['file_name'],
+            'file_type': r['file_type'],
+            'file_size': r['file_size'],
+            'uploaded_at': datetime.fromisoformat(r['uploaded_at'])
+        }
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="get_all")
+    @traced("db.get_all")
     async def get_all() -> List[Dict[str, Any]]:
-        async with aiosqlite.connect(str(settings.DB_PATH)) as db:
-            db.row_factory = aiosqlite.Row
+        async with connect() as db:
             cursor = await db.execute("SELECT * FROM applications ORDER BY created_at DESC")
             rows = await cursor.fetchall()
+
+            # One query for every resume instead of one per application
+            resume_cursor = await db.execute("SELECT * FROM base_resumes ORDER BY id")
+            resumes_by_app: Dict[str, List[Dict[str, Any]]] = {}
+            for r in await resume_cursor.fetchall():
+                resumes_by_app.setdefault(r['application_id'], []).append(
+                    ApplicationRepository._resume_to_dict(r)
+                )
             
             applications = []
             for row in rows:
-                app_dict = dict(row)
-                # Parse fields
-                app_dict['created_at'] = datetime.fromisoformat(app_dict['created_at'])
-                app_dict['updated_at'] = datetime.fromisoformat(app_dict['updated_at'])
-                if app_dict.get('analysis'):
-                    app_dict['analysis'] = json.loads(app_dict['analysis'])
-                
-                # Fetch resumes
-                resume_cursor = await db.execute(
-                    "SELECT * FROM base_resumes WHERE application_id = ?", 
-                    (app_dict['id'],)
-                )
-                resume_rows = await resume_cursor.fetchall()
-                app_dict['base_resumes'] = [
-                    {
-                        'file_path': r['file_path'],
-                        'file_name': r['file_name'],
-                        'file_type': r['file_type'],
-                        'file_size': r['file_size'],
-                        'uploaded_at': datetime.fromisoformat(r['uploaded_at'])
-                    } for r in resume_rows
-                ]
+                app_dict = ApplicationRepository._row_to_application(row)
+                app_dict['base_resumes'] = resumes_by_app.get(app_dict['id'], [])
                 applications.append(app_dict)
             return applications
 
     @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="get_projection")
+    @traced("db.get_projection")
+    async def get_projection(fields: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        List applications with only the requested columns, newest first.
+        
+        Values are returned as stored: timestamps stay ISO strings and `analysis`
+        stays raw JSON text, so callers can serialize them without a round trip.
+        """
+        unknown = set(fields) - set(PROJECTION_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        
+        columns = [PROJECTION_FIELDS[field] or field for field in dict.fromkeys(fields)]
+        async with connect() as db:
+            cursor = await db.execute(
+                f"SELECT {', '.join(columns)} FROM applications a ORDER BY created_at DESC"
+            )
+            return [dict(row) for row in await cursor.fetchall()]
+
+    @staticmethod
+    async def iter_export(
+        page_size: int,
+        after: Optional[Tuple[str, str]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Every application with its base resumes, newest first, one page at a time.
+
+        Pages follow a (created_at, id) keyset, so each is an index range scan on a
+        short-lived connection regardless of how far the export has got. `after`
+        resumes below a previously exported (created_at, id). Values are returned as
+        stored, like get_projection.
+        """
+        while True:
+            with DB_QUERY_SECONDS.time(operation="export_page"):
+                async with connect() as db:
+                    if after is None:
+                        cursor = await db.execute(
+                            "SELECT * FROM applications ORDER BY created_at DESC, id DESC LIMIT ?", (page_size,)
+                        )
+                    else:
+                        cursor = await db.execute(
+                            """
+                            SELECT * FROM applications WHERE (created_at, id) < (?, ?)
+                            ORDER BY created_at DESC, id DESC LIMIT ?
+                            """,
+                            (*after, page_size)
+                        )
+                    rows = [dict(row) for row in await cursor.fetchall()]
+                    if not rows:
+                        return
+                    ids = [row['id'] for row in rows]
+                    resume_cursor = await db.execute(
+                        f"SELECT * FROM base_resumes WHERE application_id IN ({', '.join('?' * len(ids))}) ORDER BY id",
+                        ids
+                    )
+                    resumes_by_app: Dict[str, List[Dict[str, Any]]] = {}
+                    for r in await resume_cursor.fetchall():
+                        resumes_by_app.setdefault(r['application_id'], []).append(
+                            ApplicationRepository._resume_to_dict(r)
+                        )
+            for row in rows:
+                row['base_resumes'] = resumes_by_app.get(row['id'], [])
+            yield rows
+            if len(rows) < page_size:
+                return
+            after = (rows[-1]['created_at'], rows[-1]['id'])
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="get_generated_files")
+    @traced("db.get_generated_files")
+    async def get_generated_files(application_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """id, job_title, company and generated_resume_path of the given applications that exist."""
+        if not application_ids:
+            return []
+        async with connect() as db:
+            cursor = await db.execute(
+                f"""
+                SELECT id, job_title, company, generated_resume_path FROM applications
+                WHERE id IN ({', '.join('?' * len(application_ids))})
+                """,
+                list(application_ids)
+            )
+            return [dict(row) for row in await cursor.fetchall()]
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="get_resume_data")
+    @traced("db.get_resume_data")
+    async def get_resume_data(resume_data_sha256: str) -> Optional[str]:
+        """Stored structured resume JSON with this content hash, from whichever application has it."""
+        async with connect() as db:
+            cursor = await db.execute(
+                "SELECT resume_data FROM applications WHERE resume_data_sha256 = ? LIMIT 1", (resume_data_sha256,)
+            )
+            row = await cursor.fetchone()
+            return row['resume_data'] if row else None
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="get_by_id")
+    @traced("db.get_by_id")
     async def get_by_id(application_id: str) -> Optional[Dict[str, Any]]:
-        async with aiosqlite.connect(str(settings.DB_PATH)) as db:
-            db.row_factory = aiosqlite.Row
+        cached = ApplicationRepository._cache.get(application_id)
+        if cached is not None and settings.SINGLE_WORKER:
+            CACHE_REQUESTS.inc(cache="application", result="hit")
+            return dict(cached)
+
+        async with connect() as db:
+            if cached is not None:
+                # Other workers write without invalidating this cache; every write bumps updated_at
+                cursor = await db.execute("SELECT updated_at FROM applications WHERE id = ?", (application_id,))
+                current = await cursor.fetchone()
+                if current is not None and current['updated_at'] == cached['updated_at'].isoformat():
+                    CACHE_REQUESTS.inc(cache="application", result="hit")
+                    return dict(cached)
+                ApplicationRepository._cache.invalidate(application_id)
+            CACHE_REQUESTS.inc(cache="application", result="miss")
+
             cursor = await db.execute("SELECT * FROM applications WHERE id = ?", (application_id,))
             row = await cursor.fetchone()
             
             if not row:
                 return None
             
-            app_dict = dict(row)
-            app_dict['created_at'] = datetime.fromisoformat(app_dict['created_at'])
-            app_dict['updated_at'] = datetime.fromisoformat(app_dict['updated_at'])
-            if app_dict.get('analysis'):
-                app_dict['analysis'] = json.loads(app_dict['analysis'])
-            
-            resume_cursor = await db.execute(
-                "SELECT * FROM base_resumes WHERE application_id = ?", 
-                (application_id,)
-            )
-            resume_rows = await resume_cursor.fetchall()
-            app_dict['base_resumes'] = [
-                {
-                    'file_path': r['file_path'],
-                    'file_name': r['file_name'],
-                    'file_type': r['file_type'],
-                    'file_size': r['file_size'],
-                    'uploaded_at': datetime.fromisoformat(r['uploaded_at'])
-                } for r in resume_rows
-            ]
-            return app_dict
+            app_dict = ApplicationRepository._row_to_application(row)
+            app_dict['base_resumes'] = await ApplicationRepository._fetch_resumes(db, application_id)
+
+        ApplicationRepository._cache.set(application_id, app_dict)
+        return dict(app_dict)
 
     @staticmethod
-    async def update(application_id: str, update_data: Dict[str, Any]) -> bool:
+    @DB_QUERY_SECONDS.timed(operation="update")
+    @traced("db.update")
+    @retry_on_busy
+    async def update(application_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply a partial update and return the updated application, or None if it does not exist."""
         update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
+        if update_data.get('status', 'processing') != 'processing':
+            # A generation lease only lives while the application is processing
+            update_data['lease_owner'] = None
+            update_data['lease_expires_at'] = None
         
         set_clauses = []
         values = []
@@ -113,24 +337,201 @@ class ApplicationRepository:
             values.append(value)
         values.append(application_id)
         
-        async with aiosqlite.connect(str(settings.DB_PATH)) as db:
-            await db.execute(
-                f"UPDATE applications SET {', '.join(set_clauses)} WHERE id = ?",
+        async with connect(immediate=True) as db:
+            previous = None
+            if 'status' in update_data or 'analysis' in update_data:
+                cursor = await db.execute(
+                    "SELECT status, analysis, ai_model FROM applications WHERE id = ?", (application_id,)
+                )
+                previous = await cursor.fetchone()
+
+            cursor = await db.execute(
+                f"UPDATE applications SET {', '.join(set_clauses)} WHERE id = ? RETURNING *",
                 tuple(values)
             )
+            row = await cursor.fetchone()
+            if row is None:
+                await db.commit()
+                ApplicationRepository._cache.invalidate(application_id)
+                return None
+
+            if previous is not None:
+                await ApplicationRepository._update_rollups(db, previous, update_data)
+            app_dict = ApplicationRepository._row_to_application(row)
+            app_dict['base_resumes'] = await ApplicationRepository._fetch_resumes(db, application_id)
+            await db.commit()
+
+        # Refresh rather than drop: the caller usually reads this application again right away
+        ApplicationRepository._cache.set(application_id, app_dict)
+        if 'status' in update_data:
+            event_hub.publish("status", application_id, status=app_dict['status'])
+        return dict(app_dict)
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="claim_generation")
+    @traced("db.claim_generation")
+    @retry_on_busy
+    async def claim_generation(
+        application_id: str, interrupted_only: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Mark an application as processing under a lease held by this worker.
+
+        Returns the updated application, or None when it does not exist or another
+        generation holds an unexpired lease on it. Leases left by a crashed worker
+        expire after GENERATION_LEASE_SECONDS. `interrupted_only` claims
+        only what find_interrupted_generations would still return, so a generation
+        restarted (or finished) since the lookup is left alone.
+        """
+        now = datetime.now(timezone.utc)
+        update_data = {
+            'status': 'processing',
+            'lease_owner': settings.WORKER_ID,
+            'lease_expires_at': (now + timedelta(seconds=settings.GENERATION_LEASE_SECONDS)).isoformat(),
+            'updated_at': now.isoformat(),
+        }
+        async with connect(immediate=True) as db:
+            cursor = await db.execute(
+                "SELECT status, analysis, ai_model, lease_owner, lease_expires_at FROM applications WHERE id = ?",
+                (application_id,)
+            )
+            previous = await cursor.fetchone()
+            lease_held = previous is not None and (
+                previous['status'] == 'processing' and (previous['lease_expires_at'] or '') > now.isoformat()
+            )
+            no_longer_interrupted = previous is not None and interrupted_only and (
+                previous['status'] != 'processing' or previous['lease_owner'] == settings.WORKER_ID
+            )
+            if previous is None or lease_held or no_longer_interrupted:
+                await db.rollback()
+                return None
+
+            cursor = await db.execute(
+                """
+                UPDATE applications SET status = ?, lease_owner = ?, lease_expires_at = ?, updated_at = ?
+                WHERE id = ? RETURNING *
+                """,
+                (*update_data.values(), application_id)
+            )
+            row = await cursor.fetchone()
+            await ApplicationRepository._update_rollups(db, previous, update_data)
+            app_dict = ApplicationRepository._row_to_application(row)
+            app_dict['base_resumes'] = await ApplicationRepository._fetch_resumes(db, application_id)
+            await db.commit()
+
+        ApplicationRepository._cache.set(application_id, app_dict)
+        event_hub.publish("status", application_id, status='processing')
+        return dict(app_dict)
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="find_interrupted")
+    @traced("db.find_interrupted")
+    async def find_interrupted_generations() -> List[str]:
+        """
+        IDs of applications left in 'processing' by a worker that is gone, i.e.
+        whose lease expired. An unexpired lease is never taken over: whether its
+        worker is still running cannot be told from here.
+        """
+        async with connect() as db:
+            cursor = await db.execute(
+                """
+                SELECT id FROM applications
+                WHERE status = 'processing'
+                  AND COALESCE(lease_owner, '') != ?
+                  AND COALESCE(lease_expires_at, '') <= ?
+                ORDER BY updated_at
+                """,
+                (settings.WORKER_ID, datetime.now(timezone.utc).isoformat())
+            )
+            return [row['id'] for row in await cursor.fetchall()]
+
+    @staticmethod
+    async def _update_rollups(db, previous, update_data: Dict[str, Any]) -> None:
+        """Fold one application write into the analytics rollups, inside the caller's transaction."""
+        new_status = update_data.get('status', previous['status'])
+        if new_status != previous['status']:
+            await AnalyticsRepository.record_status(db, new_status, update_data['updated_at'])
+
+        if 'analysis' in update_data:
+            # Only completed analyses count; a regeneration replaces the old contribution
+            old_analysis = previous['analysis'] if previous['status'] == 'completed' else None
+            new_analysis = update_data['analysis'] if new_status == 'completed' else None
+            await AnalyticsRepository.record_analysis(db, old_analysis, new_analysis)
+        elif previous['status'] == 'completed' and new_status != 'completed':
+            await AnalyticsRepository.record_analysis(db, previous['analysis'], None)
+
+        if new_status == 'completed' and update_data.get('generation_ms') is not None:
+            await AnalyticsRepository.record_latency(db, previous['ai_model'], update_data['generation_ms'])
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="delete")
+    @traced("db.delete")
+    @retry_on_busy
+    async def delete(application_id: str) -> Optional[List[str]]:
+        """
+        Delete an application and its base_resumes rows. Returns the file paths
+        nothing references any more (its generated resume, and resumes no other
+        application shares), or None when the application does not exist.
+        """
+        async with connect(immediate=True) as db:
+            cursor = await db.execute(
+                "SELECT status, analysis, generated_resume_path FROM applications WHERE id = ?", (application_id,)
+            )
+            existing = await cursor.fetchone()
+            if existing is None:
+                await db.rollback()
+                return None
+            cursor = await db.execute("SELECT DISTINCT file_path FROM base_resumes WHERE application_id = ?", (application_id,))
+            resume_paths = [row['file_path'] for row in await cursor.fetchall()]
+
+            await db.execute("DELETE FROM applications WHERE id = ?", (application_id,))
+            if existing['status'] == 'completed':
+                await AnalyticsRepository.record_analysis(db, existing['analysis'], None)
+            # Bulk imports attach one shared resume file to several applications
+            shared = set()
+            if resume_paths:
+                cursor = await db.execute(
+                    f"SELECT DISTINCT file_path FROM base_resumes WHERE file_path IN ({', '.join('?' * len(resume_paths))})",
+                    resume_paths
+                )
+                shared = {row['file_path'] for row in await cursor.fetchall()}
             await db.commit()
-        return True
+        ApplicationRepository._cache.invalidate(application_id)
+        event_hub.publish("deleted", application_id)
+        released = [path for path in resume_paths if path not in shared]
+        if existing['generated_resume_path']:
+            released.append(existing['generated_resume_path'])
+        return released
 
     @staticmethod
-    async def delete(application_id: str) -> bool:
-        async with aiosqlite.connect(str(settings.DB_PATH)) as db:
-            cursor = await db.execute("DELETE FROM applications WHERE id = ?", (application_id,))
+    @DB_QUERY_SECONDS.timed(operation="release_generated")
+    @traced("db.release_generated")
+    @retry_on_busy
+    async def release_generated(application_id: str, path: str) -> bool:
+        """Forget a generated resume whose file is being removed; False if the row points elsewhere now.
+
+        The structured resume behind its preview goes with it, so the preview cannot outlive the download.
+        """
+        async with connect(immediate=True) as db:
+            cursor = await db.execute(
+                """
+                UPDATE applications
+                SET generated_resume_path = NULL, generated_resume_sha256 = NULL,
+                    resume_data = NULL, resume_data_sha256 = NULL, updated_at = ?
+                WHERE id = ? AND generated_resume_path = ?
+                """,
+                (datetime.now(timezone.utc).isoformat(), application_id, path)
+            )
             await db.commit()
-            return cursor.rowcount > 0
+        ApplicationRepository._cache.invalidate(application_id)
+        return cursor.rowcount > 0
 
     @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="add_resume")
+    @traced("db.add_resume")
+    @retry_on_busy
     async def add_resume(application_id: str, resume_file: ResumeFile) -> None:
-        async with aiosqlite.connect(str(settings.DB_PATH)) as db:
+        async with connect(immediate=True) as db:
             await db.execute(
                 """
                 INSERT INTO base_resumes (application_id, file_path, file_name, file_type, file_size, uploaded_at)
@@ -145,4 +546,72 @@ class ApplicationRepository:
                     resume_file.uploaded_at.isoformat()
                 )
             )
+            # The resume list is part of the application, so it counts as a modification
+            await db.execute(
+                "UPDATE applications SET updated_at = ? WHERE id = ?",
+                (datetime.now(timezone.utc).isoformat(), application_id)
+            )
             await db.commit()
+        ApplicationRepository._cache.invalidate(application_id)
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="get_version")
+    @traced("db.get_version")
+    async def get_version() -> int:
+        """Counter bumped by triggers on every change to applications or base_resumes."""
+        async with connect() as db:
+            cursor = await db.execute("SELECT version FROM table_versions WHERE name = 'applications'")
+            row = await cursor.fetchone()
+            return row['version'] if row else 0
+
+    @staticmethod
+    def _build_match_query(query: str) -> Optional[str]:
+        """Turn free text into an FTS5 MATCH expression of quoted prefix terms joined by OR."""
+        terms = [
+            term for term in re.findall(r"\w+", query.lower())
+            if term not in SEARCH_STOPWORDS and len(term) > 1
+        ]
+        if not terms:
+            return None
+        return " OR ".join(f'"{term}"*' for term in dict.fromkeys(terms))
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="search")
+    @traced("db.search")
+    async def search(query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """Full-text search over applications, ranked by bm25 with highlighted snippets."""
+        match = ApplicationRepository._build_match_query(query)
+        if not match:
+            return {"total": 0, "results": []}
+
+        weights = ", ".join(str(w) for w in SEARCH_COLUMN_WEIGHTS)
+        async with connect() as db:
+            cursor = await db.execute(
+                "SELECT COUNT(*) FROM applications_fts WHERE applications_fts MATCH ?",
+                (match,)
+            )
+            total = (await cursor.fetchone())[0]
+
+            cursor = await db.execute(
+                f"""
+                SELECT a.id, a.job_title, a.company, a.status, a.created_at,
+                       snippet(applications_fts, -1, ?, ?, '…', 16) AS snippet,
+                       bm25(applications_fts, {weights}) AS rank
+                FROM applications_fts
+                JOIN applications a ON a.rowid = applications_fts.rowid
+                WHERE applications_fts MATCH ?
+                ORDER BY rank
+                LIMIT ? OFFSET ?
+                """,
+                (SNIPPET_OPEN, SNIPPET_CLOSE, match, limit, offset)
+            )
+            rows = await cursor.fetchall()
+
+        results = []
+        for row in rows:
+            result = dict(row)
+            result['created_at'] = datetime.fromisoformat(result['created_at'])
+            # bm25() is lower-is-better; expose a higher-is-better score
+            result['score'] = -result.pop('rank')
+            results.append(result)
+        return {"total": total, "results": results}
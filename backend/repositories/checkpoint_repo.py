@@ -0,0 +1,85 @@
+import logging
+from typing import Dict, Optional
+from datetime import datetime, timezone
+from database import connect, retry_on_busy
+from services.metrics import DB_QUERY_SECONDS
+from services.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in order; each checkpoint records the hash of the inputs it was computed from
+STAGES = ("parsed", "prompt", "llm_response", "structured", "rendered")
+
+
+class CheckpointRepository:
+    """
+    Outputs of each stage of an application's current generation attempt.
+
+    A retry (or a restart) reuses a stage's checkpoint when its input hash still
+    matches, so work that already succeeded, above all the LLM call, is not
+    repeated. Checkpoints are cleared once the generation completes.
+    """
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="checkpoint_load")
+    @traced("db.checkpoint_load")
+    async def load(application_id: str) -> Dict[str, Dict[str, str]]:
+        """Map of stage -> {"input_hash", "payload"} for the application."""
+        async with connect() as db:
+            cursor = await db.execute(
+                "SELECT stage, input_hash, payload FROM generation_checkpoints WHERE application_id = ?",
+                (application_id,)
+            )
+            return {
+                row['stage']: {"input_hash": row['input_hash'], "payload": row['payload']}
+                for row in await cursor.fetchall()
+            }
+
+    @staticmethod
+    def match(checkpoints: Dict[str, Dict[str, str]], stage: str, input_hash: str) -> Optional[str]:
+        """The stage's payload if it was checkpointed from the same inputs, else None."""
+        checkpoint = checkpoints.get(stage)
+        if checkpoint and checkpoint['input_hash'] == input_hash:
+            return checkpoint['payload']
+        return None
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="checkpoint_save")
+    @traced("db.checkpoint_save")
+    @retry_on_busy
+    async def save(application_id: str, stage: str, input_hash: str, payload: str) -> None:
+        async with connect() as db:
+            await db.execute(
+                """
+                INSERT INTO generation_checkpoints (application_id, stage, input_hash, payload, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (application_id, stage) DO UPDATE SET
+                    input_hash = excluded.input_hash,
+                    payload = excluded.payload,
+                    created_at = excluded.created_at
+                """,
+                (application_id, stage, input_hash, payload, datetime.now(timezone.utc).isoformat())
+            )
+            await db.commit()
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="checkpoint_clear")
+    @traced("db.checkpoint_clear")
+    @retry_on_busy
+    async def clear(application_id: str) -> None:
+        async with connect() as db:
+            await db.execute("DELETE FROM generation_checkpoints WHERE application_id = ?", (application_id,))
+            await db.commit()
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="checkpoint_discard")
+    @traced("db.checkpoint_discard")
+    @retry_on_busy
+    async def discard(application_id: str, stage: str) -> None:
+        """Drop one stage's checkpoint, e.g. an LLM response that turned out unusable."""
+        async with connect() as db:
+            await db.execute(
+                "DELETE FROM generation_checkpoints WHERE application_id = ? AND stage = ?",
+                (application_id, stage)
+            )
+            await db.commit()
@@ -0,0 +1,64 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from database import connect, retry_on_busy
+from services.metrics import DB_QUERY_SECONDS
+from services.tracing import traced
+
+# Older rows are pruned as new ones arrive; estimates only read the most recent few per model
+ROWS_KEPT = 10000
+
+
+class GenerationStatsRepository:
+    """
+    Token usage and duration of past LLM calls, per model and kind of call
+    (single/batch/sections), from which generation estimates are predicted.
+    """
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="record_generation_stats")
+    @traced("db.record_generation_stats")
+    @retry_on_busy
+    async def record(
+        application_id: Optional[str],
+        ai_model: str,
+        kind: str,
+        prompt_chars: int,
+        prompt_tokens: int,
+        prompt_tokens_local: int,
+        completion_tokens: int,
+        token_source: str,
+        llm_ms: float,
+        jobs: int = 1
+    ) -> None:
+        """Store one call; `token_source` says whether the counts came from the provider or a local count."""
+        async with connect(immediate=True) as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO generation_stats (
+                    application_id, ai_model, kind, jobs, prompt_chars, prompt_tokens, prompt_tokens_local,
+                    completion_tokens, token_source, llm_ms, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    application_id, ai_model, kind, jobs, prompt_chars, prompt_tokens, prompt_tokens_local,
+                    completion_tokens, token_source, llm_ms, time.time()
+                )
+            )
+            await db.execute("DELETE FROM generation_stats WHERE id <= ?", (cursor.lastrowid - ROWS_KEPT,))
+            await db.commit()
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="recent_generation_stats")
+    @traced("db.recent_generation_stats")
+    async def recent(ai_model: str, kind: str, limit: int) -> List[Dict[str, Any]]:
+        """The model's last `limit` calls of the given kind, newest first."""
+        async with connect() as db:
+            cursor = await db.execute(
+                """
+                SELECT prompt_tokens, prompt_tokens_local, completion_tokens, token_source, llm_ms
+                FROM generation_stats WHERE ai_model = ? AND kind = ? ORDER BY id DESC LIMIT ?
+                """,
+                (ai_model, kind, limit)
+            )
+            return [dict(row) for row in await cursor.fetchall()]
@@ -0,0 +1,156 @@
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from config import settings
+from database import connect, retry_on_busy
+from services.metrics import DB_QUERY_SECONDS
+from services.tracing import traced
+
+
+def _placeholders(values: Sequence[Any]) -> str:
+    return ", ".join("?" * len(values))
+
+
+class StorageRepository:
+    """
+    Database side of the storage lifecycle: which files on disk are still
+    referenced, the lease that keeps one worker at a time collecting garbage,
+    and the last measured disk usage shared with the other workers.
+    """
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="acquire_lease")
+    @traced("db.acquire_lease")
+    @retry_on_busy
+    async def acquire_lease(name: str, seconds: float) -> bool:
+        """Take (or renew) a named lease for this worker; False while another worker holds it."""
+        now = time.time()
+        async with connect(immediate=True) as db:
+            cursor = await db.execute(
+                """
+                INSERT INTO maintenance_leases (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE maintenance_leases.expires_at < ? OR maintenance_leases.owner = excluded.owner
+                """,
+                (name, settings.WORKER_ID, now + seconds, now)
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="release_lease")
+    @traced("db.release_lease")
+    @retry_on_busy
+    async def release_lease(name: str) -> None:
+        async with connect(immediate=True) as db:
+            await db.execute(
+                "DELETE FROM maintenance_leases WHERE name = ? AND owner = ?", (name, settings.WORKER_ID)
+            )
+            await db.commit()
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="delete_orphaned_resumes")
+    @traced("db.delete_orphaned_resumes")
+    @retry_on_busy
+    async def delete_orphaned_resumes() -> int:
+        """Remove base_resumes rows whose application is gone (deleted by a client without foreign keys)."""
+        async with connect(immediate=True) as db:
+            cursor = await db.execute(
+                "DELETE FROM base_resumes WHERE application_id NOT IN (SELECT id FROM applications)"
+            )
+            await db.commit()
+            return cursor.rowcount
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="foreign_resume_paths")
+    @traced("db.foreign_resume_paths")
+    async def foreign_resume_paths(upload_dir: str) -> int:
+        """Resume rows whose path lies outside `upload_dir`, e.g. after the install was moved."""
+        prefix = upload_dir.rstrip("/\\")
+        async with connect() as db:
+            cursor = await db.execute(
+                "SELECT COUNT(*) FROM base_resumes WHERE substr(file_path, 1, ?) != ?",
+                (len(prefix), prefix)
+            )
+            return (await cursor.fetchone())[0]
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="referenced_uploads")
+    @traced("db.referenced_uploads")
+    async def referenced_uploads(paths: Sequence[str]) -> Set[str]:
+        """The subset of `paths` attached to some application."""
+        if not paths:
+            return set()
+        async with connect() as db:
+            cursor = await db.execute(
+                f"SELECT DISTINCT file_path FROM base_resumes WHERE file_path IN ({_placeholders(paths)})",
+                list(paths)
+            )
+            return {row['file_path'] for row in await cursor.fetchall()}
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="generation_owners")
+    @traced("db.generation_owners")
+    async def generation_owners(application_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """id -> status, generated_resume_path and updated_at for the given applications that exist."""
+        if not application_ids:
+            return {}
+        async with connect() as db:
+            cursor = await db.execute(
+                f"""
+                SELECT id, status, generated_resume_path, updated_at FROM applications
+                WHERE id IN ({_placeholders(application_ids)})
+                """,
+                list(application_ids)
+            )
+            return {row['id']: dict(row) for row in await cursor.fetchall()}
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="oldest_generated")
+    @traced("db.oldest_generated")
+    async def oldest_generated(limit: int, after: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """Applications with a generated resume, least recently updated first, after an (updated_at, id) keyset."""
+        async with connect() as db:
+            if after is None:
+                cursor = await db.execute(
+                    """
+                    SELECT id, status, generated_resume_path, updated_at FROM applications
+                    WHERE generated_resume_path IS NOT NULL ORDER BY updated_at, id LIMIT ?
+                    """,
+                    (limit,)
+                )
+            else:
+                cursor = await db.execute(
+                    """
+                    SELECT id, status, generated_resume_path, updated_at FROM applications
+                    WHERE generated_resume_path IS NOT NULL AND (updated_at, id) > (?, ?)
+                    ORDER BY updated_at, id LIMIT ?
+                    """,
+                    (*after, limit)
+                )
+            return [dict(row) for row in await cursor.fetchall()]
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="save_usage")
+    @traced("db.save_usage")
+    @retry_on_busy
+    async def save_usage(usage: Dict[str, Dict[str, int]]) -> None:
+        now = time.time()
+        async with connect(immediate=True) as db:
+            await db.executemany(
+                """
+                INSERT INTO storage_usage (kind, bytes, files, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (kind) DO UPDATE SET
+                    bytes = excluded.bytes, files = excluded.files, updated_at = excluded.updated_at
+                """,
+                [(kind, totals['bytes'], totals['files'], now) for kind, totals in usage.items()]
+            )
+            await db.commit()
+
+    @staticmethod
+    @DB_QUERY_SECONDS.timed(operation="load_usage")
+    @traced("db.load_usage")
+    async def load_usage() -> Dict[str, Dict[str, int]]:
+        async with connect() as db:
+            cursor = await db.execute("SELECT kind, bytes, files FROM storage_usage")
+            return {row['kind']: {"bytes": row['bytes'], "files": row['files']} for row in await cursor.fetchall()}
@@ -1,14 +1,20 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+# Imported first so the cold-start clock covers every other import
+from services.startup import startup_timer, FirstSuccessMiddleware
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+import asyncio
+import hashlib
 import logging
+import time
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import aiofiles
 import uuid
 import json
-from tenacity import RetryError
-from google.api_core.exceptions import ResourceExhausted
+import orjson
+import re
 
 from models import (
     JobApplication,
@@ -16,28 +22,108 @@ from models import (
     JobApplicationUpdate,
     ResumeFile,
     AIModel,
-    UploadResponse
+    UploadResponse,
+    BatchGenerateRequest,
+    ApplicationSearchResponse,
+    AnalyticsResponse
 )
 from services.document_parser import DocumentParser
-from services.llm_service import LLMService
+from services.llm_service import LLMService, LLMRateLimitError, close_provider_clients
+from services.token_estimator import unparsed_text_chars
 from services.resume_generator import ResumeGenerator
+from services.event_hub import event_hub
+from services.event_relay import EventRelay
+from services.resume_schema import merge_sections
+from services import bulk_import
+from services.zip_stream import stream_zip
+from services.storage_lifecycle import storage_lifecycle
+from services.resume_preview import PREVIEW_FORMATS, RENDERER_VERSION
+from services.admission import AdmissionMiddleware, load_snapshot
+from services.deadline import ClientDisconnected, DeadlineExceeded, cancel_on_disconnect, deadline_scope
+from services.profiler import (
+    LoopLagMonitor,
+    ProfilingMiddleware,
+    admin_token_valid,
+    list_profiles,
+    resolve_profile_file
+)
+from services.tracing import (
+    TracingMiddleware,
+    configure_logging,
+    current_span,
+    exporter as span_exporter,
+    traced
+)
+from services.metrics import (
+    registry as metrics_registry,
+    STAGE_SECONDS,
+    RATE_LIMITED,
+    GENERATION_FAILURES,
+    GENERATIONS_IN_FLIGHT,
+    GENERATION_QUEUE_DEPTH,
+    CHECKPOINT_HITS,
+    SECTION_REASKS,
+    CACHE_REQUESTS
+)
 
 # New imports
 from config import settings, AIModelConfig
-from database import init_database
-from repositories.application_repo import ApplicationRepository
+from cache import TTLCache
+from database import connect, init_database, run_periodic_optimize
+from repositories.application_repo import ApplicationRepository, SUMMARY_FIELDS
+from repositories.analytics_repo import AnalyticsRepository
+from repositories.checkpoint_repo import CheckpointRepository
 
 from contextlib import asynccontextmanager
 
+startup_timer.mark("imports")
+
+
+async def _warm_database():
+    async with connect() as db:
+        async with db.execute("SELECT 1 FROM applications LIMIT 1") as cursor:
+            await cursor.fetchone()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan handler to initialize database and clean shutdown resources."""
     settings.ensure_directories()
     await init_database()
+    optimize_task = asyncio.create_task(run_periodic_optimize())
+    trace_flush_task = asyncio.create_task(span_exporter.run_periodic_flush()) if span_exporter.enabled else None
+    # Other workers' status changes reach this worker's SSE clients through the database
+    relay_task = asyncio.create_task(EventRelay(event_hub).run()) if not settings.SINGLE_WORKER else None
+    lag_monitor = None
+    if settings.LOOP_LAG_THRESHOLD_MS > 0:
+        lag_monitor = LoopLagMonitor(settings.LOOP_LAG_THRESHOLD_MS)
+        lag_monitor.start()
+    if settings.STARTUP_WARMUP:
+        await startup_timer.run_warmup({
+            "database": _warm_database,
+            "docx_template": lambda: asyncio.to_thread(ResumeGenerator.load_template),
+            "parser_libraries": lambda: asyncio.to_thread(DocumentParser.preload),
+            "providers": llm_service.warm_up,
+        })
+    startup_timer.mark("ready")
+    resume_task = asyncio.create_task(_watch_interrupted_generations())
+    storage_task = asyncio.create_task(storage_lifecycle.run()) if settings.STORAGE_GC_INTERVAL_SECONDS > 0 else None
     try:
         yield
     finally:
-        pass
+        resume_task.cancel()
+        if storage_task:
+            storage_task.cancel()
+        optimize_task.cancel()
+        if relay_task:
+            relay_task.cancel()
+        await close_provider_clients()
+        DocumentParser.shutdown_workers()
+        if lag_monitor:
+            lag_monitor.stop()
+        if trace_flush_task:
+            trace_flush_task.cancel()
+            await span_exporter.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -50,10 +136,7 @@ document_parser = DocumentParser()
 resume_generator = ResumeGenerator()
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -79,7 +162,37 @@ async def get_models():
     return models
 
 
+@api_router.get("/events")
+async def stream_events(request: Request, application_id: Optional[str] = None):
+    """Server-sent events for status/stage changes of one application, or of all when no ID is given"""
+    subscription = event_hub.subscribe(application_id)
+    
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.SSE_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {orjson.dumps(event).decode()}\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @api_router.post("/upload", response_model=UploadResponse)
+@STAGE_SECONDS.timed(stage="upload")
 async def upload_file(file: UploadFile = File(...)):
     """Upload a file (resume or job description)"""
     try:
@@ -97,6 +210,9 @@ async def upload_file(file: UploadFile = File(...)):
         if file_ext not in allowed_extensions:
             raise HTTPException(status_code=400, detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}")
         
+        if not storage_lifecycle.has_room("uploads", len(content)):
+            raise HTTPException(status_code=507, detail="Upload storage quota exceeded. Delete old applications to free space.")
+        
         # Generate unique file name
         file_id = str(uuid.uuid4())
         file_path = settings.UPLOAD_DIR / f"{file_id}{file_ext}"
@@ -108,6 +224,7 @@ async def upload_file(file: UploadFile = File(...)):
         except IOError as e:
             logger.error(f"IO Error saving file {file_id}: {e}")
             raise HTTPException(status_code=500, detail="Failed to save file to disk")
+        storage_lifecycle.record_write("uploads", len(content))
         
         return UploadResponse(
             file_id=file_id,
@@ -136,25 +253,172 @@ async def create_application(app_data: JobApplicationCreate):
         raise HTTPException(status_code=500, detail="Failed to create application")
 
 
-@api_router.get("/applications", response_model=List[JobApplication])
-async def get_applications():
+@api_router.get("/analytics", response_model=AnalyticsResponse)
+async def get_analytics(
+    top: int = Query(20, ge=1, le=100),
+    days: int = Query(30, ge=1, le=366)
+):
+    """Top keywords and gaps, daily status transitions and generation latency percentiles"""
+    try:
+        return await AnalyticsRepository.get_summary(top=top, days=days)
+    except Exception as e:
+        logger.error(f"Error getting analytics: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve analytics")
+
+
+def _etag(*parts) -> str:
+    """Strong ETag derived from the given version components"""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already matches `etag`"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _validator_headers(etag: str, cache_control: str = "no-cache") -> dict:
+    """Headers letting clients keep a copy but revalidate it with If-None-Match"""
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _raw_json(value: Optional[str]):
+    """Embed stored JSON text in an orjson response without decoding it"""
+    return orjson.Fragment(value) if value else None
+
+
+def _application_payload(app: dict) -> dict:
+    """Shape a repository application dict like JobApplication, passing stored analysis JSON through"""
+    payload = {field: app.get(field) for field in JobApplication.model_fields}
+    payload['base_resumes'] = app.get('base_resumes') or []
+    payload['analysis'] = _raw_json(app.get('analysis'))
+    return payload
+
+
+# No response_model: with `fields` the rows are projections, not full JobApplication objects
+@api_router.get("/applications")
+async def get_applications(
+    request: Request,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated columns to return, or 'summary' for the Dashboard card fields"
+    )
+):
     """Get all job applications"""
     try:
+        # Any write bumps the table version, so it identifies the whole list
+        etag = _etag("applications", await ApplicationRepository.get_version(), fields or "")
+        headers = _validator_headers(etag)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        
+        if fields:
+            requested = SUMMARY_FIELDS if fields == "summary" else [f.strip() for f in fields.split(",") if f.strip()]
+            try:
+                rows = await ApplicationRepository.get_projection(requested)
+            except ValueError as ve:
+                raise HTTPException(status_code=400, detail=str(ve))
+            if "analysis" in requested:
+                for row in rows:
+                    row['analysis'] = _raw_json(row['analysis'])
+            return ORJSONResponse(rows, headers=headers)
+        
         apps = await ApplicationRepository.get_all()
-        return apps  # FastAPI validates against List[JobApplication]
+        return ORJSONResponse([_application_payload(app) for app in apps], headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting applications: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve applications")
 
 
+@api_router.get("/applications/search", response_model=ApplicationSearchResponse)
+async def search_applications(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Full-text search over job title, company, description and analysis keywords"""
+    try:
+        found = await ApplicationRepository.search(q, limit=limit, offset=offset)
+        # Serialized like the other application endpoints, so timestamps keep their +00:00 offset
+        return ORJSONResponse({"query": q, "limit": limit, "offset": offset, **found})
+    except Exception as e:
+        logger.error(f"Error searching applications: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search applications")
+
+
+_UNSAFE_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+def _archive_name(app: dict, taken: set) -> str:
+    """Download filename for a generated resume, made safe and unique within one archive"""
+    base = _UNSAFE_FILENAME_CHARS.sub("_", f"{app['job_title']}_{app['company']}_Resume").strip(" ._") or app['id']
+    name, n = f"{base}.docx", 1
+    while name.lower() in taken:
+        n += 1
+        name = f"{base} ({n}).docx"
+    taken.add(name.lower())
+    return name
+
+
+@api_router.get("/applications/download-zip")
+async def download_resumes_zip(
+    ids: List[str] = Query(..., description="Application IDs, comma-separated and/or repeated")
+):
+    """Download the generated resumes of several applications as one ZIP, built while it is sent"""
+    application_ids = list(dict.fromkeys(i.strip() for value in ids for i in value.split(",") if i.strip()))
+    if not application_ids:
+        raise HTTPException(status_code=400, detail="No application IDs given")
+    if len(application_ids) > settings.DOWNLOAD_ZIP_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.DOWNLOAD_ZIP_MAX_FILES} applications can be downloaded at once"
+        )
+    
+    apps = {app['id']: app for app in await ApplicationRepository.get_generated_files(application_ids)}
+    files, missing, taken = [], [], set()
+    for application_id in application_ids:
+        app = apps.get(application_id)
+        if not app or not app['generated_resume_path'] or not Path(app['generated_resume_path']).exists():
+            missing.append(application_id)
+            continue
+        files.append((_archive_name(app, taken), Path(app['generated_resume_path'])))
+    if not files:
+        raise HTTPException(status_code=404, detail="None of the applications has a generated resume")
+    
+    notes = ("MISSING.txt", "No generated resume for these applications:\n" + "\n".join(missing) + "\n") if missing else None
+    return StreamingResponse(
+        stream_zip(files, notes),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="resumes.zip"'}
+    )
+
+
 @api_router.get("/applications/{application_id}", response_model=JobApplication)
-async def get_application(application_id: str):
+async def get_application(application_id: str, request: Request):
     """Get a specific job application"""
     try:
         app = await ApplicationRepository.get_by_id(application_id)
         if not app:
             raise HTTPException(status_code=404, detail="Application not found")
-        return app
+        etag = _etag(application_id, app['updated_at'].isoformat())
+        headers = _validator_headers(etag)
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        return ORJSONResponse(_application_payload(app), headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -166,19 +430,18 @@ async def get_application(application_id: str):
 async def update_application(application_id: str, update_data: JobApplicationUpdate):
     """Update a job application"""
     try:
-        existing = await ApplicationRepository.get_by_id(application_id)
-        if not existing:
-            raise HTTPException(status_code=404, detail="Application not found")
-        
         # Filter None values
         update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
         
         if update_dict:
-            await ApplicationRepository.update(application_id, update_dict)
+            # UPDATE ... RETURNING gives back the updated row in the same round trip
+            updated = await ApplicationRepository.update(application_id, update_dict)
+        else:
+            updated = await ApplicationRepository.get_by_id(application_id)
         
-        # Return updated
-        updated = await ApplicationRepository.get_by_id(application_id)
-        return updated
+        if not updated:
+            raise HTTPException(status_code=404, detail="Application not found")
+        return ORJSONResponse(_application_payload(updated))
     except HTTPException:
         raise
     except Exception as e:
@@ -215,9 +478,547 @@ async def add_resume_to_application(application_id: str, file: UploadFile = File
         raise HTTPException(status_code=500, detail="Failed to add resume")
 
 
+@api_router.post("/import")
+async def import_applications(
+    files: List[UploadFile] = File(...),
+    ai_model: Optional[str] = Query(None),
+    formatting_preference: Optional[str] = Query(None)
+):
+    """
+    Create applications in bulk from a ZIP archive (or several files in one request):
+    one folder per application holding a job*/jd* job description and resumes.
+    Streams progress as NDJSON, one event per line.
+    """
+    model_id = ai_model or settings.AVAILABLE_MODELS[0].model_id
+    try:
+        settings.get_model_config(model_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Already over quota: refuse before reading the upload; prepare() checks again as it extracts
+    if not storage_lifecycle.has_room("uploads", 0):
+        raise HTTPException(status_code=507, detail="Upload storage quota exceeded. Delete old applications to free space.")
+    
+    try:
+        plan = await asyncio.to_thread(bulk_import.prepare, [(f.filename, f.file) for f in files])
+    except bulk_import.ImportOverQuota as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except bulk_import.ImportRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def progress():
+        async for event in bulk_import.run_import(plan, model_id, formatting_preference):
+            yield orjson.dumps(event) + b"\n"
+    
+    return StreamingResponse(progress(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+
+def _export_record(row: dict) -> bytes:
+    record = {field: row.get(field) for field in JobApplication.model_fields}
+    record['analysis'] = _raw_json(row.get('analysis'))
+    return orjson.dumps(record) + b"\n"
+
+
+@api_router.get("/export.ndjson")
+async def export_applications(
+    after: Optional[str] = Query(
+        None,
+        description="Continue an interrupted export below this '<created_at>|<id>' of its last line"
+    )
+):
+    """Stream every application with its analysis and base resumes as NDJSON, newest first"""
+    cursor = None
+    if after:
+        created_at, separator, application_id = after.partition("|")
+        if not separator or not created_at or not application_id:
+            raise HTTPException(status_code=400, detail="'after' must be '<created_at>|<id>'")
+        cursor = (created_at, application_id)
+    
+    async def lines():
+        async for page in ApplicationRepository.iter_export(settings.EXPORT_PAGE_SIZE, cursor):
+            yield b"".join(_export_record(row) for row in page)
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="applications.ndjson"'}
+    )
+
+
+def _provider_label(model_id: str) -> str:
+    """Provider name for metric labels; unknown models are labelled as such instead of raising"""
+    try:
+        return settings.get_model_config(model_id).provider
+    except ValueError:
+        return "unknown"
+
+
+async def _parse_base_resumes(app: dict) -> List[str]:
+    """Extract text from every parseable base resume of an application"""
+    parsed_resumes = []
+    for resume in app['base_resumes']:
+        try:
+            text = await document_parser.parse_file(resume['file_path'], resume['file_type'])
+            parsed_resumes.append(text)
+        except DeadlineExceeded:
+            raise
+        except ValueError as ve:
+            logger.warning(f"Skipping unparseable resume {resume['file_name']}: {ve}")
+            continue # Skip bad files but try others
+        except Exception as e:
+            logger.error(f"Error parsing resume {resume['file_name']}: {e}")
+            # Continue attempting others?
+            continue
+    return parsed_resumes
+
+
+def _sha256(*parts: str) -> str:
+    """Stable hash of a sequence of strings, used as checkpoint input hashes and preview keys"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _reuse_checkpoint(checkpoints: dict, stage: str, input_hash: str) -> Optional[str]:
+    payload = CheckpointRepository.match(checkpoints, stage, input_hash)
+    if payload is not None:
+        CHECKPOINT_HITS.inc(stage=stage)
+    return payload
+
+
+async def _repair_structure(
+    application_id: str,
+    job_description: str,
+    parsed_resumes: List[str],
+    model_id: str,
+    formatting_preference: Optional[str],
+    parsed_response: dict
+) -> dict:
+    """
+    Check a parsed LLM response against the resume schema. Near-misses are coerced
+    locally; sections that are still broken are asked for again on their own
+    instead of regenerating the whole resume.
+    """
+    normalized, broken = resume_generator.normalize_resume_data(parsed_response)
+    if not broken:
+        return normalized
+    
+    logger.warning(f"LLM output for {application_id} has unusable sections {broken}; asking again for those only")
+    for section in broken:
+        SECTION_REASKS.inc(section=section)
+    event_hub.publish_stage(application_id, "repairing")
+    raw_sections = await llm_service.regenerate_sections(
+        job_description=job_description,
+        base_resumes=parsed_resumes,
+        sections=broken,
+        model_id=model_id,
+        session_id=application_id,
+        formatting_preference=formatting_preference
+    )
+    sections = resume_generator._parse_llm_response(raw_sections)
+    if "error" not in sections:
+        normalized, broken = resume_generator.normalize_resume_data(merge_sections(normalized, sections))
+    if "error" in sections or broken:
+        logger.error(f"LLM output for {application_id} still unusable after re-asking: {sections.get('error') or broken}")
+        raise HTTPException(status_code=500, detail="AI failed to generate structured data. Please try again.")
+    return normalized
+
+
+async def _save_generated_resume(
+    application_id: str,
+    parsed_response: dict,
+    started_at: float,
+    checkpoints: Optional[dict] = None
+) -> dict:
+    """
+    Render the DOCX for a parsed LLM response and mark the application completed.
+
+    With `checkpoints`, a file already rendered from the same response by an
+    earlier attempt is reused.
+    """
+    output_filename = f"{application_id}.docx"
+    output_path = settings.GENERATED_DIR / output_filename
+    structured_hash = _sha256(json.dumps(parsed_response, sort_keys=True))
+    
+    rendered = None
+    if checkpoints is not None:
+        payload = CheckpointRepository.match(checkpoints, "rendered", structured_hash)
+        rendered = json.loads(payload) if payload else None
+    if rendered and Path(rendered['path']).exists():
+        CHECKPOINT_HITS.inc(stage="rendered")
+        output_path, file_hash = Path(rendered['path']), rendered['sha256']
+    else:
+        event_hub.publish_stage(application_id, "rendering")
+        try:
+            resume_generator.generate_docx(parsed_response, str(output_path))
+            file_hash = await asyncio.to_thread(_file_sha256, output_path)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"DOCX Generation Error: {e}")
+            raise HTTPException(status_code=500, detail="Failed to generate DOCX file")
+        if checkpoints is not None:
+            await CheckpointRepository.save(
+                application_id, "rendered", structured_hash,
+                json.dumps({"path": str(output_path), "sha256": file_hash})
+            )
+    
+    # Kept with the row so previews render from it instead of the DOCX
+    resume_data = orjson.dumps(parsed_response.get('resume', {}), option=orjson.OPT_SORT_KEYS).decode()
+    
+    # Update Success
+    await ApplicationRepository.update(application_id, {
+        "status": "completed",
+        "generated_resume_path": str(output_path),
+        "generated_resume_sha256": file_hash,
+        "resume_data": resume_data,
+        "resume_data_sha256": _sha256(resume_data),
+        "analysis": json.dumps(parsed_response.get('analysis', {})),
+        "generation_ms": int((time.perf_counter() - started_at) * 1000)
+    })
+    # The attempt is over; the next generation is a fresh one
+    await CheckpointRepository.clear(application_id)
+    
+    return {
+        "success": True,
+        "message": "Resume generated successfully",
+        "download_url": f"/api/applications/{application_id}/download",
+        "analysis": parsed_response.get('analysis', {})
+    }
+
+
+@api_router.post("/applications/generate-batch")
+async def generate_resumes_batch(request: BatchGenerateRequest, raw_request: Request):
+    """Generate tailored resumes for several applications, sharing LLM calls where possible"""
+    results = {}
+    
+    # Group applications whose prompt context (model, formatting, resume text) is identical
+    groups = {}
+    for application_id in dict.fromkeys(request.application_ids):
+        app = await ApplicationRepository.get_by_id(application_id)
+        if not app:
+            results[application_id] = {"success": False, "error": "Application not found"}
+            continue
+        if not app.get('base_resumes'):
+            results[application_id] = {"success": False, "error": "No base resumes uploaded"}
+            continue
+        
+        parsed_resumes = await _parse_base_resumes(app)
+        if not parsed_resumes:
+            results[application_id] = {"success": False, "error": "Could not parse any provided resumes"}
+            continue
+        
+        key = (app['ai_model'], app.get('formatting_preference'), tuple(parsed_resumes))
+        groups.setdefault(key, []).append(app)
+    
+    # Applications wait in this request's queue until their chunk reaches the LLM
+    queued = sum(len(apps) for apps in groups.values())
+    GENERATION_QUEUE_DEPTH.inc(queued)
+    
+    async def run_chunks():
+        nonlocal queued
+        for group_key, apps in groups.items():
+            for start in range(0, len(apps), settings.LLM_BATCH_MAX_JOBS):
+                chunk = apps[start:start + settings.LLM_BATCH_MAX_JOBS]
+                GENERATION_QUEUE_DEPTH.dec(len(chunk))
+                queued -= len(chunk)
+                with GENERATIONS_IN_FLIGHT.track():
+                    await _generate_batch_chunk(group_key, chunk, results)
+    
+    try:
+        # Chunks not started yet keep their status; the one in flight is marked cancelled
+        await cancel_on_disconnect(raw_request.receive, run_chunks())
+    except ClientDisconnected:
+        logger.info(f"Batch generation cancelled: client disconnected after {len(results)} results")
+        raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        GENERATION_QUEUE_DEPTH.dec(queued)
+    
+    return {
+        "success": all(r.get("success") for r in results.values()),
+        "results": [
+            {"application_id": application_id, **results[application_id]}
+            for application_id in dict.fromkeys(request.application_ids)
+        ]
+    }
+
+
+async def _call_batch_llm(chunk: List[dict], model_id: str, formatting_preference, parsed_resumes) -> dict:
+    """One LLM call for a chunk; returns the parsed response per application id"""
+    chunk_ids = [a['id'] for a in chunk]
+    if len(chunk) == 1:
+        llm_response = await llm_service.analyze_and_generate_resume(
+            job_description=chunk[0]['job_description'],
+            base_resumes=list(parsed_resumes),
+            model_id=model_id,
+            session_id=chunk_ids[0],
+            formatting_preference=formatting_preference
+        )
+        return {chunk_ids[0]: resume_generator._parse_llm_response(llm_response['raw_response'])}
+    
+    llm_response = await llm_service.analyze_and_generate_resumes_batch(
+        job_descriptions={a['id']: a['job_description'] for a in chunk},
+        base_resumes=list(parsed_resumes),
+        model_id=model_id,
+        session_id=chunk_ids[0],
+        formatting_preference=formatting_preference
+    )
+    return resume_generator._split_batch_llm_response(llm_response['raw_response'], llm_response['job_refs'])
+
+
+@traced("batch_chunk")
+async def _generate_batch_chunk(group_key: tuple, chunk: List[dict], results: dict) -> None:
+    """Run one batched LLM call for applications sharing a prompt context and store per-application results"""
+    model_id, formatting_preference, parsed_resumes = group_key
+    started_at = time.perf_counter()
+    claimed = []
+    for app in chunk:
+        if await ApplicationRepository.claim_generation(app['id']):
+            claimed.append(app)
+            event_hub.publish_stage(app['id'], "generating")
+        else:
+            results[app['id']] = {"success": False, "error": "A resume is already being generated for this application"}
+    if not claimed:
+        return
+    chunk = claimed
+    chunk_ids = [a['id'] for a in chunk]
+    jobs = {a['id']: a['job_description'] for a in chunk}
+    current_span().set_attribute("batch.application_ids", ",".join(chunk_ids))
+    
+    try:
+        with deadline_scope(settings.GENERATION_TIMEOUT_SECONDS):
+            parsed_responses = await _call_batch_llm(chunk, model_id, formatting_preference, parsed_resumes)
+    except asyncio.CancelledError:
+        GENERATION_FAILURES.inc(len(chunk_ids), reason="cancelled")
+        for application_id in chunk_ids:
+            await ApplicationRepository.update(application_id, {"status": "cancelled"})
+        raise
+    except DeadlineExceeded as e:
+        logger.warning(f"Batch generation timed out for {chunk_ids}: {e}")
+        GENERATION_FAILURES.inc(len(chunk_ids), reason="deadline")
+        for application_id in chunk_ids:
+            await ApplicationRepository.update(application_id, {"status": "failed"})
+            results[application_id] = {"success": False, "error": "Generation timed out. Please try again."}
+        return
+    except LLMRateLimitError:
+        logger.warning(f"Rate limit exceeded for batch {chunk_ids}")
+        RATE_LIMITED.inc(provider=_provider_label(model_id))
+        GENERATION_FAILURES.inc(len(chunk_ids), reason="rate_limited")
+        for application_id in chunk_ids:
+            await ApplicationRepository.update(application_id, {"status": "failed"})
+            results[application_id] = {"success": False, "error": "AI Rate Limit Exceeded"}
+        return
+    except Exception as e:
+        logger.exception(f"Batch generation failed for {chunk_ids}: {e}")
+        GENERATION_FAILURES.inc(len(chunk_ids), reason="unexpected")
+        for application_id in chunk_ids:
+            await ApplicationRepository.update(application_id, {"status": "failed"})
+            results[application_id] = {"success": False, "error": str(e)}
+        return
+    
+    for application_id in chunk_ids:
+        parsed_response = parsed_responses[application_id]
+        if "error" in parsed_response:
+            logger.error(f"LLM JSON Parse Error for {application_id}: {parsed_response['error']}")
+            GENERATION_FAILURES.inc(reason="invalid_json")
+            await ApplicationRepository.update(application_id, {"status": "failed"})
+            results[application_id] = {
+                "success": False,
+                "error": "AI failed to generate structured data. Please try again."
+            }
+            continue
+        try:
+            parsed_response = await _repair_structure(
+                application_id, jobs[application_id], list(parsed_resumes), model_id,
+                formatting_preference, parsed_response
+            )
+            results[application_id] = await _save_generated_resume(
+                application_id, parsed_response, started_at
+            )
+        except HTTPException as he:
+            GENERATION_FAILURES.inc(reason="render")
+            await ApplicationRepository.update(application_id, {"status": "failed"})
+            results[application_id] = {"success": False, "error": he.detail}
+        except Exception as e:
+            logger.warning(f"Could not repair batch output for {application_id}: {e}")
+            GENERATION_FAILURES.inc(reason="repair")
+            await ApplicationRepository.update(application_id, {"status": "failed"})
+            results[application_id] = {"success": False, "error": str(e)}
+
+
+def _resumes_hash(app: dict) -> str:
+    """Input hash of the "parsed" checkpoint: changes whenever a base resume is added, removed or replaced"""
+    return _sha256(*(f"{r['id']}:{r['file_path']}:{r['file_size']}" for r in app['base_resumes']))
+
+
+async def _checkpointed_parse(app: dict, checkpoints: dict) -> List[str]:
+    """The application's parsed base resumes, from the "parsed" checkpoint while its resumes are unchanged"""
+    resumes_hash = _resumes_hash(app)
+    payload = _reuse_checkpoint(checkpoints, "parsed", resumes_hash)
+    if payload is not None:
+        return json.loads(payload)
+    parsed_resumes = await _parse_base_resumes(app)
+    if parsed_resumes:
+        await CheckpointRepository.save(app['id'], "parsed", resumes_hash, json.dumps(parsed_resumes))
+    return parsed_resumes
+
+
+async def _run_generation(app: dict, started_at: float) -> dict:
+    """
+    Parse, call the LLM and render for one application; runs inside the request's deadline.
+
+    Every stage's output is checkpointed under a hash of its inputs, so an
+    attempt after a failure or restart continues from the last completed stage
+    instead of paying for the LLM call again.
+    """
+    application_id = app['id']
+    checkpoints = await CheckpointRepository.load(application_id)
+    
+    event_hub.publish_stage(application_id, "parsing")
+    parsed_resumes = await _checkpointed_parse(app, checkpoints)
+    if not parsed_resumes:
+        raise HTTPException(status_code=400, detail="Could not parse any provided resumes")
+    
+    # Generate
+    event_hub.publish_stage(application_id, "generating")
+    model_id = app['ai_model']
+    try:
+        prompt = llm_service.prepare_resume_prompt(
+            job_description=app['job_description'],
+            base_resumes=parsed_resumes,
+            formatting_preference=app.get('formatting_preference')
+        )
+        prompt_hash = _sha256(model_id, prompt)
+        if _reuse_checkpoint(checkpoints, "prompt", prompt_hash) is None:
+            await CheckpointRepository.save(
+                application_id, "prompt", prompt_hash, json.dumps({"model_id": model_id, "prompt_chars": len(prompt)})
+            )
+        
+        raw_response = _reuse_checkpoint(checkpoints, "llm_response", prompt_hash)
+        if raw_response is None:
+            raw_response = await llm_service.complete(prompt, model_id, session_id=application_id)
+            await CheckpointRepository.save(application_id, "llm_response", prompt_hash, raw_response)
+    except ValueError as ve:
+        # Configuration error or invalid model
+        raise HTTPException(status_code=400, detail=str(ve))
+    
+    # Parse & Create Docx
+    raw_hash = _sha256(raw_response)
+    payload = _reuse_checkpoint(checkpoints, "structured", raw_hash)
+    if payload is not None:
+        parsed_response = json.loads(payload)
+    else:
+        parsed_response = resume_generator._parse_llm_response(raw_response)
+    
+        if "error" in parsed_response:
+            # LLM failed to produce valid JSON; the retry has to ask again
+            logger.error(f"LLM JSON Parse Error: {parsed_response['error']}. Raw: {parsed_response.get('raw')}")
+            await CheckpointRepository.discard(application_id, "llm_response")
+            raise HTTPException(status_code=500, detail="AI failed to generate structured data. Please try again.")
+        parsed_response = await _repair_structure(
+            application_id, app['job_description'], parsed_resumes, model_id,
+            app.get('formatting_preference'), parsed_response
+        )
+        await CheckpointRepository.save(application_id, "structured", raw_hash, json.dumps(parsed_response))
+
+    return await _save_generated_resume(application_id, parsed_response, started_at, checkpoints)
+
+
+async def _watch_interrupted_generations() -> None:
+    """
+    Recover interrupted generations at startup and then once per lease period,
+    so leases that were still unexpired at startup are picked up once they run out.
+    """
+    while True:
+        await _resume_interrupted_generations()
+        await asyncio.sleep(settings.GENERATION_LEASE_SECONDS)
+
+
+async def _resume_interrupted_generations() -> None:
+    """
+    Deal with generations left in 'processing' by a worker that is gone (their lease expired).
+
+    Those whose LLM response was checkpointed are finished from it; the rest are
+    marked failed, since their client is gone (a retry still reuses whatever
+    stages they completed).
+    """
+    try:
+        application_ids = await ApplicationRepository.find_interrupted_generations()
+    except Exception as e:
+        logger.error(f"Could not look up interrupted generations: {e}")
+        return
+    
+    for application_id in application_ids:
+        try:
+            # Claim before deciding: another worker may have restarted it for a retry since the lookup,
+            # and once claimed no retry can start until this worker is done with it
+            app = await ApplicationRepository.claim_generation(application_id, interrupted_only=True)
+            if not app:
+                continue
+            checkpoints = await CheckpointRepository.load(application_id)
+            if "llm_response" not in checkpoints:
+                await ApplicationRepository.update(application_id, {"status": "failed"})
+                logger.info(f"Marked interrupted generation for application {application_id} as failed")
+                continue
+            with deadline_scope(settings.GENERATION_TIMEOUT_SECONDS):
+                await _run_generation(app, time.perf_counter())
+            logger.info(f"Resumed interrupted generation for application {application_id} from its checkpoints")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            GENERATION_FAILURES.inc(reason="resume")
+            logger.warning(f"Could not resume generation for application {application_id}: {e}")
+            await ApplicationRepository.update(application_id, {"status": "failed"})
+
+
+@api_router.get("/applications/{application_id}/estimate")
+async def estimate_generation(application_id: str):
+    """
+    Predict the prompt tokens, output tokens and LLM latency of generating this
+    application, from the prompt a generation would send, without calling the model.
+
+    Nothing is parsed or stored: resume text comes from a "parsed" checkpoint left
+    by an earlier attempt, or is estimated from the stored file sizes.
+    """
+    current_span().set_attribute("application.id", application_id)
+    app = await ApplicationRepository.get_by_id(application_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="Application not found")
+    
+    if not app.get('base_resumes'):
+        raise HTTPException(status_code=400, detail="No base resumes uploaded")
+    
+    checkpoints = await CheckpointRepository.load(application_id)
+    payload = CheckpointRepository.match(checkpoints, "parsed", _resumes_hash(app))
+    if payload is not None:
+        parsed_resumes, unparsed_chars, resume_text = json.loads(payload), 0, "parsed"
+    else:
+        # Parsing (possibly in the PDF worker pool) is left to the generation, which is admission controlled
+        parsed_resumes = [""] * len(app['base_resumes'])
+        unparsed_chars = sum(
+            unparsed_text_chars(r['file_type'], r['file_size'], settings.PARSE_MAX_CHARS) for r in app['base_resumes']
+        )
+        resume_text = "file_sizes"
+    
+    try:
+        prompt = llm_service.prepare_resume_prompt(
+            job_description=app['job_description'],
+            base_resumes=parsed_resumes,
+            formatting_preference=app.get('formatting_preference')
+        )
+        estimate = await llm_service.estimate(prompt, app['ai_model'], unparsed_chars=unparsed_chars)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    
+    return {"application_id": application_id, "resume_text": resume_text, **estimate}
+
+
 @api_router.post("/applications/{application_id}/generate")
-async def generate_resume(application_id: str):
+async def generate_resume(application_id: str, request: Request):
     """Generate a tailored resume for an application"""
+    current_span().set_attribute("application.id", application_id)
     try:
         app = await ApplicationRepository.get_by_id(application_id)
         if not app:
@@ -226,85 +1027,50 @@ async def generate_resume(application_id: str):
         if not app.get('base_resumes'):
             raise HTTPException(status_code=400, detail="No base resumes uploaded")
         
-        # Update status -> processing
-        await ApplicationRepository.update(application_id, {"status": "processing"})
+        # Update status -> processing; the lease keeps other requests and workers from generating it twice
+        started_at = time.perf_counter()
+        if not await ApplicationRepository.claim_generation(application_id):
+            raise HTTPException(status_code=409, detail="A resume is already being generated for this application")
         
+        GENERATIONS_IN_FLIGHT.inc()
         try:
-            # CMS Logic
-            parsed_resumes = []
-            for resume in app['base_resumes']:
-                try:
-                    text = await document_parser.parse_file(resume['file_path'], resume['file_type'])
-                    parsed_resumes.append(text)
-                except ValueError as ve:
-                    logger.warning(f"Skipping unparseable resume {resume['file_name']}: {ve}")
-                    continue # Skip bad files but try others
-                except Exception as e:
-                    logger.error(f"Error parsing resume {resume['file_name']}: {e}")
-                    # Continue attempting others?
-                    continue
-            
-            if not parsed_resumes:
-                raise HTTPException(status_code=400, detail="Could not parse any provided resumes")
-            
-            # Generate
-            try:
-                llm_response = await llm_service.analyze_and_generate_resume(
-                    job_description=app['job_description'],
-                    base_resumes=parsed_resumes,
-                    model_id=app['ai_model'],
-                    session_id=application_id,
-                    formatting_preference=app.get('formatting_preference')
-                )
-            except ValueError as ve:
-                # Configuration error or invalid model
-                raise HTTPException(status_code=400, detail=str(ve))
-            
-            # Parse & Create Docx
-            parsed_response = resume_generator._parse_llm_response(llm_response['raw_response'])
-            
-            if "error" in parsed_response:
-                # LLM failed to produce valid JSON
-                logger.error(f"LLM JSON Parse Error: {parsed_response['error']}. Raw: {parsed_response.get('raw')}")
-                raise HTTPException(status_code=500, detail="AI failed to generate structured data. Please try again.")
-
-            output_filename = f"{application_id}.docx"
-            output_path = settings.GENERATED_DIR / output_filename
-            
-            try:
-                resume_generator.generate_docx(parsed_response, str(output_path))
-            except Exception as e:
-                logger.error(f"DOCX Generation Error: {e}")
-                raise HTTPException(status_code=500, detail="Failed to generate DOCX file")
-            
-            # Update Success
-            await ApplicationRepository.update(application_id, {
-                "status": "completed",
-                "generated_resume_path": str(output_path),
-                "analysis": json.dumps(parsed_response.get('analysis', {}))
-            })
-            
-            return {
-                "success": True,
-                "message": "Resume generated successfully",
-                "download_url": f"/api/applications/{application_id}/download",
-                "analysis": parsed_response.get('analysis', {})
-            }
+            # Nobody is waiting for the result once the client is gone; stop instead of spending quota on it
+            with deadline_scope(settings.GENERATION_TIMEOUT_SECONDS):
+                return await cancel_on_disconnect(request.receive, _run_generation(app, started_at))
             
-        except (RetryError, ResourceExhausted):
+        except ClientDisconnected:
+            GENERATION_FAILURES.inc(reason="cancelled")
+            await ApplicationRepository.update(application_id, {"status": "cancelled"})
+            logger.info(f"Generation for application {application_id} cancelled: client disconnected")
+            raise HTTPException(status_code=499, detail="Client closed request")
+        except DeadlineExceeded as e:
+            GENERATION_FAILURES.inc(reason="deadline")
+            await ApplicationRepository.update(application_id, {"status": "failed"})
+            logger.warning(f"Generation for application {application_id} timed out: {e}")
+            raise HTTPException(
+                status_code=504,
+                detail=f"Generation did not finish within {settings.GENERATION_TIMEOUT_SECONDS:.0f} seconds. Please try again."
+            )
+        except LLMRateLimitError:
+            RATE_LIMITED.inc(provider=_provider_label(app['ai_model']))
+            GENERATION_FAILURES.inc(reason="rate_limited")
             await ApplicationRepository.update(application_id, {"status": "failed"})
             logger.warning(f"Rate limit exceeded for application {application_id}")
             raise HTTPException(
                 status_code=429, 
                 detail="AI Rate Limit Exceeded. You have likely hit the daily quota for the free tier. Please try again tomorrow or upgrade your API key."
             )
-        except HTTPException:
+        except HTTPException as he:
+            GENERATION_FAILURES.inc(reason=f"http_{he.status_code}")
             await ApplicationRepository.update(application_id, {"status": "failed"})
             raise
         except Exception as e:
+            GENERATION_FAILURES.inc(reason="unexpected")
             await ApplicationRepository.update(application_id, {"status": "failed"})
             logger.exception(f"Unexpected error in generation flow: {e}")
             raise HTTPException(status_code=500, detail=f"Error generating resume: {str(e)}")
+        finally:
+            GENERATIONS_IN_FLIGHT.dec()
 
     except HTTPException:
         raise
@@ -314,7 +1080,7 @@ async def generate_resume(application_id: str):
 
 
 @api_router.get("/applications/{application_id}/download")
-async def download_resume(application_id: str):
+async def download_resume(application_id: str, request: Request):
     """Download the generated resume"""
     try:
         app = await ApplicationRepository.get_by_id(application_id)
@@ -328,11 +1094,19 @@ async def download_resume(application_id: str):
         file_path = Path(path_str)
         if not file_path.exists():
             raise HTTPException(status_code=404, detail="Resume file not found")
+        
+        # Rows generated before hashes were stored fall back to hashing on request
+        file_hash = app.get('generated_resume_sha256') or await asyncio.to_thread(_file_sha256, file_path)
+        etag = f'"{file_hash}"'
+        headers = _validator_headers(etag, "private, no-cache")
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
             
         return FileResponse(
             path=file_path,
             filename=f"{app['job_title']}_{app['company']}_Resume.docx",
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            headers=headers
         )
     except HTTPException:
         raise
@@ -341,13 +1115,71 @@ async def download_resume(application_id: str):
         raise HTTPException(status_code=500, detail="Failed to download resume")
 
 
+# Rendered previews by (resume_data_sha256, format); the key changes whenever the resume does
+_preview_cache = TTLCache(
+    max_entries=settings.PREVIEW_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PREVIEW_CACHE_TTL_SECONDS
+)
+_PREVIEW_NAME = re.compile(r"^([0-9a-f]{64})-v(\d+)\.(\w+)$")
+_PREVIEW_EXTENSIONS = {extension: fmt for fmt, (extension, _, _) in PREVIEW_FORMATS.items()}
+
+
+@api_router.get("/applications/{application_id}/preview")
+async def preview_resume(application_id: str, format: str = Query("html", pattern="^(html|text)$")):
+    """Redirect to the content-addressed preview of the generated resume"""
+    app = await ApplicationRepository.get_by_id(application_id)
+    if not app:
+        raise HTTPException(status_code=404, detail="Application not found")
+    resume_hash = app.get('resume_data_sha256')
+    if not resume_hash:
+        raise HTTPException(status_code=404, detail="No preview available. Generate the resume to create one.")
+    extension = PREVIEW_FORMATS[format][0]
+    # The redirect follows the application; the target never changes and is cached for good
+    return RedirectResponse(
+        url=f"/api/previews/{resume_hash}-v{RENDERER_VERSION}.{extension}",
+        status_code=307,
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@api_router.get("/previews/{name}")
+async def get_preview(name: str, request: Request):
+    """A rendered resume preview, immutable for its URL (resume hash, renderer version, format)"""
+    match = _PREVIEW_NAME.match(name)
+    if not match or int(match.group(2)) != RENDERER_VERSION or match.group(3) not in _PREVIEW_EXTENSIONS:
+        raise HTTPException(status_code=404, detail="Preview not found")
+    resume_hash, fmt = match.group(1), _PREVIEW_EXTENSIONS[match.group(3)]
+    _, media_type, render = PREVIEW_FORMATS[fmt]
+    
+    etag = f'"{resume_hash}-v{RENDERER_VERSION}-{fmt}"'
+    # Resumes carry personal data: browsers may keep previews forever, shared caches not at all
+    headers = _validator_headers(etag, "private, max-age=31536000, immutable")
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    body = _preview_cache.get((resume_hash, fmt))
+    CACHE_REQUESTS.inc(cache="preview", result="miss" if body is None else "hit")
+    if body is None:
+        resume_data = await ApplicationRepository.get_resume_data(resume_hash)
+        if resume_data is None:
+            raise HTTPException(status_code=404, detail="Preview not found")
+        body = render(orjson.loads(resume_data)).encode("utf-8")
+        _preview_cache.set((resume_hash, fmt), body)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
 @api_router.delete("/applications/{application_id}")
 async def delete_application(application_id: str):
-    """Delete a job application"""
+    """Delete a job application together with the files only it used"""
     try:
-        success = await ApplicationRepository.delete(application_id)
-        if not success:
+        released = await ApplicationRepository.delete(application_id)
+        if released is None:
             raise HTTPException(status_code=404, detail="Application not found")
+        try:
+            await storage_lifecycle.remove_files(released)
+        except Exception as e:
+            # The row is gone either way; the next lifecycle pass collects what is left
+            logger.warning(f"Could not remove files of deleted application {application_id}: {e}")
         return {"success": True, "message": "Application deleted"}
     except HTTPException:
         raise
@@ -356,8 +1188,100 @@ async def delete_application(application_id: str):
         raise HTTPException(status_code=500, detail="Failed to delete application")
 
 
+def _require_admin(request: Request) -> None:
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not admin_token_valid(request.headers.get("X-Admin-Token")):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@api_router.get("/admin/profiles")
+async def get_profiles(request: Request):
+    """List captured request profiles, newest first"""
+    _require_admin(request)
+    return await asyncio.to_thread(list_profiles)
+
+
+@api_router.get("/admin/profiles/{profile_id}/{file_name}")
+async def download_profile_file(profile_id: str, file_name: str, request: Request):
+    """Download one profile artifact (cpu.prof, cpu.txt or memory.txt)"""
+    _require_admin(request)
+    path = resolve_profile_file(profile_id, file_name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile artifact not found")
+    media_type = "application/octet-stream" if path.suffix == ".prof" else "text/plain"
+    return FileResponse(path=path, filename=f"{profile_id}-{file_name}", media_type=media_type)
+
+
+@api_router.get("/admin/storage")
+async def get_storage_status(request: Request):
+    """Disk usage per directory, quotas and the last lifecycle pass of this worker"""
+    _require_admin(request)
+    return storage_lifecycle.status()
+
+
+@api_router.post("/admin/storage/gc")
+async def run_storage_gc(request: Request):
+    """Run a storage lifecycle pass now and report what it reclaimed"""
+    _require_admin(request)
+    report = await storage_lifecycle.collect()
+    if report is None:
+        raise HTTPException(status_code=409, detail="A storage lifecycle pass is already running")
+    return storage_lifecycle.status()
+
+
+@app.get("/health", include_in_schema=False)
+async def health():
+    """Liveness/readiness probe with the cold-start timeline and this worker's admission load"""
+    load = load_snapshot()
+    if not startup_timer.ready:
+        status = "starting"
+    elif any(l["queued"] for l in load.values()):
+        status = "busy"
+    else:
+        status = "ok"
+    return ORJSONResponse(
+        {"status": status, "load": load, "startup": startup_timer.as_dict()},
+        status_code=200 if startup_timer.ready else 503
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of in-process metrics"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(api_router)
 
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip that leaves long-lived streams alone, since compressing them would buffer
+    events in the encoder, and ZIP downloads, which are compressed already.
+    """
+    
+    EXCLUDED_PATHS = ("/api/events", "/api/import", "/api/applications/download-zip")
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.EXCLUDED_PATHS):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(StreamingAwareGZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE)
+
+# Inside tracing so queue waits show in the root span; rejects before the body is read
+app.add_middleware(AdmissionMiddleware)
+
+# Outside GZip so the profile covers compression too
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost of our own middleware so the root span covers the whole request
+app.add_middleware(TracingMiddleware)
+
+app.add_middleware(FirstSuccessMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
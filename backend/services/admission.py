@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from starlette.responses import JSONResponse
+
+from config import settings
+from services.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Request rejected by admission control; retry_after is a hint in whole seconds."""
+
+    def __init__(self, endpoint_class: str, reason: str, retry_after: int):
+        super().__init__(f"{endpoint_class} overloaded ({reason})")
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """
+    Bounded concurrency with a bounded FIFO queue for one class of endpoints.
+
+    Up to max_in_flight requests run; up to max_queue more wait at most
+    max_wait seconds for a slot. Anything beyond that is rejected at once, so
+    an overloaded worker answers 503 quickly instead of timing out later.
+    Limits are per worker process.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max(max_queue, 0)
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of how long a request holds its slot, for Retry-After
+        self._avg_hold_seconds = 1.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained at the observed rate."""
+        backlog = self.in_flight + self.queued
+        return max(1, math.ceil(self._avg_hold_seconds * backlog / self.max_in_flight))
+
+    def _reject(self, reason: str) -> Overloaded:
+        self.rejected += 1
+        ADMISSION_REJECTED.inc(endpoint_class=self.name, reason=reason)
+        return Overloaded(self.name, reason, self.retry_after())
+
+    def _update_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self.in_flight, endpoint_class=self.name)
+        ADMISSION_QUEUED.set(self.queued, endpoint_class=self.name)
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._update_gauges()
+            return
+        if self.queued >= self.max_queue:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            raise self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation; pass it on
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._update_gauges()
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, endpoint_class=self.name)
+
+    def release(self, held_seconds: Optional[float] = None) -> None:
+        if held_seconds is not None:
+            self._avg_hold_seconds = 0.8 * self._avg_hold_seconds + 0.2 * held_seconds
+        # Hand the slot straight to the oldest live waiter so in_flight never dips below the limit
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+        self.in_flight -= 1
+        self._update_gauges()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+        }
+
+
+limiters = {
+    "generate": AdmissionLimiter(
+        "generate",
+        settings.ADMISSION_GENERATE_MAX_IN_FLIGHT,
+        settings.ADMISSION_GENERATE_MAX_QUEUE,
+        settings.ADMISSION_GENERATE_MAX_WAIT_SECONDS
+    ),
+    "upload": AdmissionLimiter(
+        "upload",
+        settings.ADMISSION_UPLOAD_MAX_IN_FLIGHT,
+        settings.ADMISSION_UPLOAD_MAX_QUEUE,
+        settings.ADMISSION_UPLOAD_MAX_WAIT_SECONDS
+    ),
+}
+
+# (endpoint class, method, path) for the expensive endpoints; everything else, including
+# all reads, bypasses admission control so it stays responsive while generation is saturated
+ENDPOINT_CLASSES = (
+    ("generate", "POST", re.compile(r"^/api/applications/(generate-batch|[^/]+/generate)$")),
+    ("upload", "POST", re.compile(r"^/api/(upload|import|applications/[^/]+/add-resume)$")),
+)
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    for endpoint_class, endpoint_method, pattern in ENDPOINT_CLASSES:
+        if method == endpoint_method and pattern.match(path):
+            return endpoint_class
+    return None
+
+
+def load_snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.snapshot() for name, limiter in limiters.items()}
+
+
+class AdmissionMiddleware:
+    """Applies the endpoint-class limiters before the request body is read."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        endpoint_class = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if endpoint_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiters[endpoint_class]
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            logger.warning(f"Rejected {scope['method']} {scope['path']}: {e}")
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(e.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
@@ -0,0 +1,360 @@
+import asyncio
+import json
+import logging
+import uuid
+import zipfile
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import settings
+from models import JobApplication, ResumeFile
+from repositories.application_repo import ApplicationRepository
+from services.document_parser import DocumentParser
+from services.metrics import IMPORT_FILES
+from services.storage_lifecycle import storage_lifecycle
+
+logger = logging.getLogger(__name__)
+
+# Same per-file limit as /api/upload
+MAX_FILE_BYTES = 10 * 1024 * 1024
+COPY_CHUNK_BYTES = 256 * 1024
+
+# MIME type stored for each accepted extension; DocumentParser dispatches on it
+EXTENSION_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".doc": "application/msword",
+    ".txt": "text/plain",
+}
+
+# Optional per-folder overrides: job_title, company, job_description, ai_model, formatting_preference
+METADATA_FILE = "application.json"
+METADATA_FIELDS = ("job_title", "company", "job_description", "ai_model", "formatting_preference")
+
+
+class ImportRejected(ValueError):
+    """The upload cannot be imported at all (unreadable archive, over the limits, nothing to import)."""
+
+
+class ImportOverQuota(ImportRejected):
+    """The extracted files would not fit the uploads quota."""
+
+
+@dataclass(eq=False)
+class ImportedFile:
+    """A file copied into UPLOAD_DIR; `name` is its path inside the archive or upload."""
+    name: str
+    path: Path
+    size: int
+
+    @property
+    def file_name(self) -> str:
+        return PurePosixPath(self.name).name
+
+    @property
+    def file_type(self) -> str:
+        return EXTENSION_TYPES[self.path.suffix.lower()]
+
+
+@dataclass
+class PlannedApplication:
+    """One application to create, from one folder of the import."""
+    folder: str
+    job_file: Optional[ImportedFile] = None
+    resumes: List[ImportedFile] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ImportPlan:
+    applications: List[PlannedApplication]
+    # Files at the top level of a folder-per-application import; every application gets them
+    shared_resumes: List[ImportedFile]
+    warnings: List[str]
+
+    @property
+    def files(self) -> List[ImportedFile]:
+        """Every extracted file once, in import order."""
+        files = {f.path: f for app in self.applications for f in ([app.job_file] if app.job_file else []) + app.resumes}
+        for f in self.shared_resumes:
+            files.setdefault(f.path, f)
+        return list(files.values())
+
+
+def _is_job_file(path: PurePosixPath) -> bool:
+    stem = path.stem.lower()
+    return stem.startswith("job") or stem == "jd" or stem.startswith(("jd_", "jd-", "jd "))
+
+
+def _clean_name(name: str) -> Optional[PurePosixPath]:
+    """Archive path of a file worth importing; None for directories, hidden files and macOS metadata."""
+    if not name or name.endswith(("/", "\\")):
+        return None
+    path = PurePosixPath(name.replace("\\", "/").lstrip("/"))
+    if not path.parts or any(part.startswith(".") or part == "__MACOSX" for part in path.parts):
+        return None
+    return path
+
+
+def _copy_limited(source: BinaryIO, target: Path, limit: int) -> Optional[int]:
+    """Stream `source` into `target`; returns the size, or None (and no file) past `limit` bytes."""
+    size = 0
+    with open(target, "wb") as out:
+        while chunk := source.read(COPY_CHUNK_BYTES):
+            size += len(chunk)
+            if size > limit:
+                break
+            out.write(chunk)
+    if size > limit:
+        target.unlink(missing_ok=True)
+        return None
+    return size
+
+
+def _extract(entries: Iterable[Tuple[str, Callable[[], BinaryIO]]]) -> Tuple[List[ImportedFile], Dict[str, Any], List[str]]:
+    """
+    Copy each (name, open) entry into UPLOAD_DIR under a fresh ID, one chunk at a
+    time, checking the uploads quota after every file. Returns the files, the
+    parsed metadata files by folder, and warnings. The names are only used for
+    planning, never as paths on disk.
+    """
+    files: List[ImportedFile] = []
+    metadata: Dict[str, Any] = {}
+    warnings: List[str] = []
+    total = 0
+    try:
+        for raw_name, open_entry in entries:
+            path = _clean_name(raw_name)
+            if path is None:
+                continue
+            if path.name.lower() == METADATA_FILE:
+                with open_entry() as source:
+                    try:
+                        metadata[str(path.parent)] = json.loads(source.read(MAX_FILE_BYTES))
+                    except ValueError as e:
+                        warnings.append(f"{path}: invalid JSON ({e})")
+                continue
+            suffix = path.suffix.lower()
+            if suffix not in EXTENSION_TYPES:
+                IMPORT_FILES.inc(outcome="unsupported")
+                warnings.append(f"{path}: unsupported file type")
+                continue
+            if len(files) >= settings.IMPORT_MAX_FILES:
+                raise ImportRejected(f"Import contains more than {settings.IMPORT_MAX_FILES} files")
+
+            target = settings.UPLOAD_DIR / f"{uuid.uuid4()}{suffix}"
+            with open_entry() as source:
+                size = _copy_limited(source, target, min(MAX_FILE_BYTES, settings.IMPORT_MAX_TOTAL_BYTES - total))
+            if size is None:
+                if total + MAX_FILE_BYTES > settings.IMPORT_MAX_TOTAL_BYTES:
+                    raise ImportRejected(f"Import expands to more than {settings.IMPORT_MAX_TOTAL_BYTES} bytes")
+                IMPORT_FILES.inc(outcome="too_large")
+                warnings.append(f"{path}: exceeds the 10MB file size limit")
+                continue
+            files.append(ImportedFile(name=str(path), path=target, size=size))
+            total += size
+            if not storage_lifecycle.has_room("uploads", total):
+                raise ImportOverQuota("Upload storage quota exceeded. Delete old applications to free space.")
+    except BaseException:
+        _remove(files)
+        raise
+    return files, metadata, warnings
+
+
+def _zip_entries(archive: zipfile.ZipFile) -> Iterable[Tuple[str, Callable[[], BinaryIO]]]:
+    for info in archive.infolist():
+        if not info.is_dir():
+            yield info.filename, lambda info=info: archive.open(info)
+
+
+def _plan(files: List[ImportedFile], metadata: Dict[str, Any], warnings: List[str], default_folder: str) -> ImportPlan:
+    """
+    Group files into applications: every top-level folder is one application,
+    with its job description in a file named job*/jd* and its other files as
+    resumes; files next to the folders are resumes shared by all of them. An
+    import without folders is a single application. A common root folder
+    (a zipped directory) is ignored.
+    """
+    paths = {f.path: PurePosixPath(f.name) for f in files}
+    roots = {p.parts[0] for p in paths.values()} | {PurePosixPath(folder).parts[0] for folder in metadata if folder != "."}
+    if len(roots) == 1 and all(len(p.parts) > 1 for p in paths.values()):
+        root = roots.pop()
+        default_folder = root
+        paths = {key: PurePosixPath(*p.parts[1:]) for key, p in paths.items()}
+        metadata = {str(PurePosixPath(*PurePosixPath(k).parts[1:]) or "."): v for k, v in metadata.items()}
+
+    by_folder: Dict[str, PlannedApplication] = {}
+    shared: List[ImportedFile] = []
+    nested = any(len(p.parts) > 1 for p in paths.values())
+    for f in files:
+        path = paths[f.path]
+        if nested and len(path.parts) == 1:
+            if _is_job_file(path):
+                warnings.append(f"{f.name}: job description outside an application folder, ignored")
+                _remove([f])
+            else:
+                shared.append(f)
+            continue
+        folder = path.parts[0] if nested else default_folder
+        planned = by_folder.setdefault(folder, PlannedApplication(folder=folder))
+        if _is_job_file(path) and planned.job_file is None:
+            planned.job_file = f
+        elif _is_job_file(path):
+            warnings.append(f"{f.name}: second job description in {folder}, ignored")
+            _remove([f])
+        else:
+            planned.resumes.append(f)
+
+    for folder, values in metadata.items():
+        if nested == (folder == "."):
+            warnings.append(f"{folder}/{METADATA_FILE}: not inside an application folder, ignored")
+            continue
+        key = PurePosixPath(folder).parts[0] if nested else default_folder
+        if not isinstance(values, dict):
+            warnings.append(f"{folder}/{METADATA_FILE}: expected a JSON object")
+            continue
+        planned = by_folder.setdefault(key, PlannedApplication(folder=key))
+        planned.metadata = {k: v for k, v in values.items() if k in METADATA_FIELDS and isinstance(v, str)}
+
+    if not by_folder:
+        raise ImportRejected("Nothing to import: no job descriptions or resumes found")
+    return ImportPlan(applications=list(by_folder.values()), shared_resumes=shared, warnings=warnings)
+
+
+def prepare(uploads: List[Tuple[str, BinaryIO]]) -> ImportPlan:
+    """
+    Extract an import (one ZIP archive, or several files whose names may include
+    folders) into UPLOAD_DIR and plan its applications. Blocking; run it in a thread.
+    """
+    if len(uploads) == 1 and zipfile.is_zipfile(uploads[0][1]):
+        name, fileobj = uploads[0]
+        fileobj.seek(0)
+        try:
+            # ZipFile reads the central directory and then one member at a time from the spooled upload
+            with zipfile.ZipFile(fileobj) as archive:
+                files, metadata, warnings = _extract(_zip_entries(archive))
+        except zipfile.BadZipFile as e:
+            raise ImportRejected(f"Invalid ZIP archive: {e}")
+        default_folder = PurePosixPath(name or "import").stem
+    else:
+        for _, fileobj in uploads:
+            fileobj.seek(0)
+        # The framework closes the uploads, so entries hand them out without closing
+        files, metadata, warnings = _extract((name or "", lambda f=fileobj: nullcontext(f)) for name, fileobj in uploads)
+        default_folder = "import"
+    try:
+        return _plan(files, metadata, warnings, default_folder)
+    except BaseException:
+        _remove(files)
+        raise
+
+
+def _remove(files: Iterable[ImportedFile]) -> None:
+    for f in files:
+        try:
+            f.path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not remove imported file {f.path}: {e}")
+
+
+def _job_title_and_company(folder: str) -> Tuple[str, str]:
+    """'Acme - Backend Engineer' -> ('Backend Engineer', 'Acme'); otherwise the folder is the title."""
+    company, separator, title = folder.partition(" - ")
+    if separator and company.strip() and title.strip():
+        return title.strip(), company.strip()
+    return folder, ""
+
+
+async def _parse(f: ImportedFile, semaphore: asyncio.Semaphore) -> Tuple[ImportedFile, Optional[str], Optional[str]]:
+    async with semaphore:
+        try:
+            text = await asyncio.to_thread(DocumentParser.parse_file_blocking, str(f.path), f.file_type)
+        except Exception as e:
+            return f, None, str(e)
+    if not text.strip():
+        return f, None, "no text could be extracted"
+    return f, text, None
+
+
+async def run_import(plan: ImportPlan, ai_model: str, formatting_preference: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse every file (at most IMPORT_PARSE_CONCURRENCY at a time), then create the
+    applications with their base resumes, IMPORT_BATCH_SIZE per transaction.
+    Yields progress events; files not used by a created application are removed.
+    """
+    files = plan.files
+    yield {
+        "event": "started",
+        "applications": len(plan.applications),
+        "files": len(files),
+        "warnings": plan.warnings,
+    }
+
+    kept: Set[Path] = set()
+    try:
+        texts: Dict[Path, str] = {}
+        semaphore = asyncio.Semaphore(max(settings.IMPORT_PARSE_CONCURRENCY, 1))
+        for done, parsing in enumerate(asyncio.as_completed([_parse(f, semaphore) for f in files]), start=1):
+            f, text, error = await parsing
+            IMPORT_FILES.inc(outcome="parsed" if error is None else "unreadable")
+            if text is not None:
+                texts[f.path] = text
+            yield {"event": "parsed", "file": f.name, "ok": error is None, "error": error, "done": done, "total": len(files)}
+
+        shared = [f for f in plan.shared_resumes if f.path in texts]
+        created: List[Dict[str, Any]] = []
+        skipped: List[Dict[str, str]] = []
+        for start in range(0, len(plan.applications), max(settings.IMPORT_BATCH_SIZE, 1)):
+            entries = []
+            for planned in plan.applications[start:start + settings.IMPORT_BATCH_SIZE]:
+                job_description = planned.metadata.get("job_description") or (
+                    texts.get(planned.job_file.path) if planned.job_file else None
+                )
+                if not job_description:
+                    skipped.append({"folder": planned.folder, "reason": "No readable job description"})
+                    continue
+                model_id = planned.metadata.get("ai_model") or ai_model
+                try:
+                    settings.get_model_config(model_id)
+                except ValueError as e:
+                    skipped.append({"folder": planned.folder, "reason": str(e)})
+                    continue
+                job_title, company = _job_title_and_company(planned.folder)
+                application = JobApplication(
+                    job_title=planned.metadata.get("job_title") or job_title,
+                    company=planned.metadata.get("company") or company,
+                    job_description=job_description,
+                    ai_model=model_id,
+                    formatting_preference=planned.metadata.get("formatting_preference") or formatting_preference
+                )
+                resumes = [
+                    ResumeFile(file_path=str(f.path), file_name=f.file_name, file_type=f.file_type, file_size=f.size)
+                    for f in [r for r in planned.resumes if r.path in texts] + shared
+                ]
+                entries.append((application, resumes))
+
+            if entries:
+                await ApplicationRepository.create_many(entries)
+                for application, resumes in entries:
+                    kept.update(Path(r.file_path) for r in resumes)
+                    created.append({
+                        "id": application.id,
+                        "job_title": application.job_title,
+                        "company": application.company,
+                        "resumes": len(resumes),
+                    })
+                yield {"event": "created", "applications": created[-len(entries):], "done": len(created), "total": len(plan.applications)}
+
+        logger.info(f"Imported {len(created)} applications ({len(skipped)} skipped) from {len(files)} files")
+        yield {"event": "completed", "created": len(created), "skipped": skipped}
+    except Exception as e:
+        logger.exception(f"Import failed: {e}")
+        yield {"event": "error", "detail": "Import failed; applications created before this point were kept"}
+    finally:
+        # Job description files, unreadable resumes and anything an interrupted import did not use
+        _remove(f for f in files if f.path not in kept)
+        for f in files:
+            if f.path in kept:
+                storage_lifecycle.record_write("uploads", f.size)
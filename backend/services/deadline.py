@@ -0,0 +1,99 @@
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Optional
+
+# Absolute time.monotonic() by which the current request's work must finish; None means no limit
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out; `stage` is where that was noticed."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class ClientDisconnected(Exception):
+    """The client closed the connection before the response was ready."""
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """
+    Give the enclosed work (and tasks/threads started from it, which copy the
+    context) a total budget of `seconds`. A nested scope can only shorten it.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    candidate = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(candidate if current is None else min(current, candidate))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current budget (never negative), or None without a deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
+
+
+def check(stage: str) -> None:
+    """Raise DeadlineExceeded if the budget is spent; cheap enough for per-page/per-section loops."""
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded(stage)
+
+
+async def within_deadline(awaitable: Awaitable[Any], stage: str) -> Any:
+    """Await `awaitable`, cancelling it when the budget runs out."""
+    budget = remaining()
+    if budget is None:
+        return await awaitable
+    check(stage)
+    try:
+        return await asyncio.wait_for(awaitable, budget)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(stage)
+
+
+async def _wait_for_disconnect(receive: Callable[[], Awaitable[dict]]) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(receive: Callable[[], Awaitable[dict]], awaitable: Awaitable[Any]) -> Any:
+    """
+    Run `awaitable` as a task and cancel it if the client disconnects first.
+
+    `receive` is the request's ASGI receive channel; the request body must have
+    been read already, so the next message it yields is the disconnect.
+    """
+    work = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(receive))
+    try:
+        await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        work.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if work.done():
+        return work.result()
+    work.cancel()
+    try:
+        await work
+    except asyncio.CancelledError:
+        pass
+    raise ClientDisconnected()
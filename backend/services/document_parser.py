@@ -1,19 +1,81 @@
-import os
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional
-from docx import Document
-from pypdf import PdfReader
+from typing import List, Optional
 import aiofiles
+from config import settings
+from services import pdf_pages
+from services.metrics import PARSE_SECONDS, PARSE_TRUNCATED
+from services.tracing import span
+from services.deadline import DeadlineExceeded, check as check_deadline
+
+logger = logging.getLogger(__name__)
+
+# Short metric labels for the MIME types parse_file accepts
+FILE_TYPE_LABELS = {
+    "application/pdf": "pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/msword": "doc",
+    "text/plain": "txt",
+}
+
+# Worker processes for long PDFs, started on first use
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> Optional[ProcessPoolExecutor]:
+    global _pdf_pool
+    if settings.PARSE_WORKERS <= 0:
+        return None
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # spawn, not fork: the server process runs an event loop and threads
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=settings.PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=pdf_pages.enable_reader_cache
+            )
+        return _pdf_pool
+
+
+def _report_truncation(file_path: str, label: str, limit: str, detail: str) -> None:
+    PARSE_TRUNCATED.inc(file_type=label, limit=limit)
+    logger.info(f"Stopped parsing {Path(file_path).name} at {limit} limit ({detail})")
 
 
 class DocumentParser:
     """Service for parsing different document formats"""
     
+    @staticmethod
+    def preload() -> None:
+        """Import the PDF/DOCX libraries ahead of the first upload (they are imported lazily otherwise)"""
+        import docx  # noqa: F401
+        import pypdf  # noqa: F401
+    
+    @staticmethod
+    def shutdown_workers() -> None:
+        """Stop the PDF worker processes; a later parse starts new ones"""
+        global _pdf_pool
+        with _pdf_pool_lock:
+            if _pdf_pool is not None:
+                _pdf_pool.shutdown(wait=False, cancel_futures=True)
+                _pdf_pool = None
+    
     @staticmethod
     async def parse_docx(file_path: str) -> str:
         """Extract text from .docx file"""
+        from docx import Document
+        
         try:
             doc = Document(file_path)
+            check_deadline("parse_docx")
             text_content = []
             
             for paragraph in doc.paragraphs:
@@ -26,38 +88,125 @@ class DocumentParser:
                         if cell.text.strip():
                             text_content.append(cell.text)
             
-            return "\n".join(text_content)
+            text = "\n".join(text_content)
+            if settings.PARSE_MAX_CHARS and len(text) > settings.PARSE_MAX_CHARS:
+                _report_truncation(file_path, "docx", "chars", f"{len(text)} chars")
+                text = text[:settings.PARSE_MAX_CHARS]
+            return text
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             raise ValueError(f"Error parsing DOCX file: {str(e)}")
     
     @staticmethod
     async def parse_pdf(file_path: str) -> str:
-        """Extract text from PDF file"""
+        """
+        Extract text from a PDF, stopping after PARSE_MAX_PAGES pages or
+        PARSE_MAX_CHARS characters. Long documents go to the worker pool in
+        ranges of PARSE_PAGES_PER_TASK pages, one range per worker in flight, so
+        only those pages' text is held besides what has been collected.
+        """
+        def open_pdf():
+            reader = pdf_pages.open_reader(file_path)
+            return reader, len(reader.pages)
+        
         try:
-            reader = PdfReader(file_path)
-            text_content = []
-            
-            for page in reader.pages:
-                text = page.extract_text()
-                if text.strip():
-                    text_content.append(text)
+            reader, total = await asyncio.to_thread(open_pdf)
+            pages = min(total, settings.PARSE_MAX_PAGES) if settings.PARSE_MAX_PAGES else total
+            pool = _get_pdf_pool() if pages >= settings.PARSE_PARALLEL_MIN_PAGES else None
+            texts = None
+            if pool is not None:
+                try:
+                    texts = await DocumentParser._extract_pdf_in_workers(pool, file_path, pages)
+                except BrokenProcessPool as e:
+                    logger.warning(f"PDF worker pool failed ({e}); parsing {Path(file_path).name} in-process")
+                    DocumentParser.shutdown_workers()
+            if texts is None:
+                texts, _ = await asyncio.to_thread(
+                    pdf_pages.extract_range, reader, 0, pages, settings.PARSE_MAX_CHARS,
+                    lambda: check_deadline("parse_pdf")
+                )
             
-            return "\n".join(text_content)
+            text = "\n".join(texts)
+            if settings.PARSE_MAX_CHARS and len(text) >= settings.PARSE_MAX_CHARS:
+                text = text[:settings.PARSE_MAX_CHARS]
+                _report_truncation(file_path, "pdf", "chars", f"{total}-page document")
+            elif pages < total:
+                _report_truncation(file_path, "pdf", "pages", f"{pages} of {total} pages")
+            return text
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             raise ValueError(f"Error parsing PDF file: {str(e)}")
     
+    @staticmethod
+    async def _extract_pdf_in_workers(pool: ProcessPoolExecutor, file_path: str, pages: int) -> List[str]:
+        """Texts of the first `pages` pages, in order, stopping once PARSE_MAX_CHARS are collected"""
+        loop = asyncio.get_running_loop()
+        step = max(1, settings.PARSE_PAGES_PER_TASK)
+        ranges = deque((start, min(start + step, pages)) for start in range(0, pages, step))
+        in_flight = deque()
+        texts: List[str] = []
+        collected = 0
+        
+        def submit():
+            start, stop = ranges.popleft()
+            budget = settings.PARSE_MAX_CHARS - collected if settings.PARSE_MAX_CHARS else 0
+            in_flight.append(loop.run_in_executor(pool, pdf_pages.extract_range, file_path, start, stop, budget))
+        
+        try:
+            while ranges and len(in_flight) < settings.PARSE_WORKERS:
+                submit()
+            while in_flight:
+                range_texts, _ = await in_flight.popleft()
+                check_deadline("parse_pdf")
+                texts.extend(range_texts)
+                collected += sum(len(text) for text in range_texts)
+                if settings.PARSE_MAX_CHARS and collected >= settings.PARSE_MAX_CHARS:
+                    break
+                if ranges:
+                    submit()
+        finally:
+            # Ranges not started yet are dropped; running ones finish in the background
+            for future in in_flight:
+                future.cancel()
+        return texts
+    
     @staticmethod
     async def parse_txt(file_path: str) -> str:
         """Extract text from .txt file"""
         try:
+            limit = settings.PARSE_MAX_CHARS
             async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                return await f.read()
+                text = await f.read(limit + 1 if limit else -1)
+            if limit and len(text) > limit:
+                _report_truncation(file_path, "txt", "chars", f"over {limit} chars")
+                text = text[:limit]
+            return text
         except Exception as e:
             raise ValueError(f"Error parsing TXT file: {str(e)}")
     
     @staticmethod
     async def parse_file(file_path: str, file_type: str) -> str:
         """Parse file based on type"""
+        label = FILE_TYPE_LABELS.get(file_type, "other")
+        started = time.perf_counter()
+        with span("parse_file", **{"file.type": label}) as current, PARSE_SECONDS.time(file_type=label):
+            text = await DocumentParser._parse_by_type(file_path, file_type)
+            current.set_attribute("parse.chars", len(text))
+        logger.info(
+            f"Parsed {Path(file_path).name} ({label}, {len(text)} chars) "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return text
+
+    @staticmethod
+    def parse_file_blocking(file_path: str, file_type: str) -> str:
+        """parse_file for worker threads (e.g. asyncio.to_thread); runs it on the thread's own event loop"""
+        return asyncio.run(DocumentParser.parse_file(file_path, file_type))
+
+    @staticmethod
+    async def _parse_by_type(file_path: str, file_type: str) -> str:
         if file_type == "application/pdf":
             return await DocumentParser.parse_pdf(file_path)
         elif file_type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
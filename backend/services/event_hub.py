@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One subscriber's queue; `application_id=None` receives every event."""
+    application_id: Optional[str]
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=100))
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        return self.application_id is None or event.get("application_id") == self.application_id
+
+
+class EventHub:
+    """
+    In-process publish/subscribe hub for application status and stage changes.
+
+    publish() never blocks: a subscriber that stops draining its queue loses
+    its oldest events rather than slowing down the publisher.
+    """
+
+    def __init__(self):
+        self._subscriptions: Set[Subscription] = set()
+        # Events published here and not yet shared with other workers; None while relaying is off
+        self._outbox: Optional[List[Dict[str, Any]]] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, application_id: Optional[str] = None) -> Subscription:
+        subscription = Subscription(application_id=application_id)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event_type: str, application_id: str, **data: Any) -> None:
+        event = {
+            "type": event_type,
+            "application_id": application_id,
+            "at": datetime.now(timezone.utc).isoformat(),
+            **data,
+        }
+        if self._outbox is not None:
+            self._outbox.append(event)
+        self.deliver(event)
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        """Hand an event to local subscribers only."""
+        for subscription in list(self._subscriptions):
+            if not subscription.wants(event):
+                continue
+            if subscription.queue.full():
+                subscription.queue.get_nowait()
+                logger.debug(f"Dropped oldest event for slow subscriber ({subscription.application_id})")
+            subscription.queue.put_nowait(event)
+
+    def enable_relay(self) -> None:
+        if self._outbox is None:
+            self._outbox = []
+
+    def take_outbox(self) -> List[Dict[str, Any]]:
+        """Return and clear the events waiting to be relayed to other workers."""
+        if not self._outbox:
+            return []
+        pending, self._outbox = self._outbox, []
+        return pending
+
+    def requeue(self, events: List[Dict[str, Any]]) -> None:
+        """Put events taken from the outbox back in front of newer ones."""
+        if self._outbox is not None:
+            self._outbox[:0] = events
+
+    def publish_stage(self, application_id: str, stage: str) -> None:
+        """Announce a pipeline stage (parsing, generating, rendering, ...) that is not persisted."""
+        self.publish("stage", application_id, stage=stage)
+
+
+event_hub = EventHub()
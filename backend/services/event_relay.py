@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+import orjson
+
+from config import settings
+from database import connect, retry_on_busy
+from services.event_hub import EventHub
+
+logger = logging.getLogger(__name__)
+
+# Relayed events are only needed until every worker has polled them
+RETENTION_SECONDS = 60
+
+
+class EventRelay:
+    """
+    Shares event hub events between worker processes through the event_relay table.
+
+    Every EVENT_RELAY_INTERVAL_SECONDS each worker appends the events it published
+    since the last poll and delivers rows written by other workers to its local
+    subscribers, so an SSE client sees every status change whichever worker it is
+    connected to. Rows are ordered by id; SQLite's single writer commits them in
+    id order, so polling with "id > last seen" never skips one.
+    """
+
+    def __init__(self, hub: EventHub, interval: float = settings.EVENT_RELAY_INTERVAL_SECONDS):
+        self.hub = hub
+        self.interval = interval
+        self.last_id = 0
+        self._next_prune = 0.0
+
+    async def run(self) -> None:
+        async with connect() as db:
+            cursor = await db.execute("SELECT COALESCE(MAX(id), 0) FROM event_relay")
+            self.last_id = (await cursor.fetchone())[0]
+        self.hub.enable_relay()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Event relay sync failed: {e}")
+
+    async def sync(self) -> None:
+        pending = self.hub.take_outbox()
+        if pending:
+            try:
+                await self._append(pending)
+            except Exception:
+                # Keep them for the next round rather than dropping them
+                self.hub.requeue(pending)
+                raise
+
+        async with connect() as db:
+            cursor = await db.execute(
+                "SELECT id, payload FROM event_relay WHERE id > ? AND origin != ? ORDER BY id",
+                (self.last_id, settings.WORKER_ID)
+            )
+            rows = await cursor.fetchall()
+        for row in rows:
+            self.last_id = row['id']
+            self.hub.deliver(orjson.loads(row['payload']))
+
+    @retry_on_busy
+    async def _append(self, events: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        async with connect(immediate=True) as db:
+            await db.executemany(
+                "INSERT INTO event_relay (origin, payload, created_at) VALUES (?, ?, ?)",
+                [(settings.WORKER_ID, orjson.dumps(event).decode(), now) for event in events]
+            )
+            if now >= self._next_prune:
+                await db.execute("DELETE FROM event_relay WHERE created_at < ?", (now - RETENTION_SECONDS,))
+                self._next_prune = now + RETENTION_SECONDS
+            await db.commit()
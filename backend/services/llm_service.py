@@ -1,12 +1,53 @@
 import os
+import asyncio
+import importlib
+import json
 import logging
-from typing import Dict, Optional, Any
-import google.generativeai as genai
+import time
+from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from config import settings
+from services.metrics import STAGE_SECONDS, LLM_CALL_SECONDS, LLM_RETRIES, LLM_TOKENS
+from services.tracing import span
+from services.rate_limiter import RateLimitTimeout, provider_bucket
+from services.deadline import check as check_deadline, remaining as remaining_budget, within_deadline
+from services.token_estimator import CHARS_PER_TOKEN, count_tokens, forecast
+from repositories.generation_stats_repo import GenerationStatsRepository
 
 logger = logging.getLogger(__name__)
 
+# SDK module per provider; imported on first use (or during warm-up) only for configured providers
+PROVIDER_SDK_MODULES = {
+    "perplexity": "openai",
+    "gemini": "google.generativeai",
+}
+
+# Chat framing around the system and user messages, on top of their text
+MESSAGE_OVERHEAD_TOKENS = 7
+
+# One AsyncOpenAI client (and its connection pool) per (base URL, API key)
+_openai_clients: Dict[tuple, Any] = {}
+
+
+class LLMRateLimitError(Exception):
+    """The provider kept rejecting the request with a rate limit / quota error."""
+
+
+def _get_openai_client(api_key: str):
+    key = (settings.LLM_BASE_URL, api_key)
+    client = _openai_clients.get(key)
+    if client is None:
+        from openai import AsyncOpenAI
+        client = _openai_clients[key] = AsyncOpenAI(api_key=api_key, base_url=settings.LLM_BASE_URL)
+    return client
+
+
+async def close_provider_clients() -> None:
+    for client in _openai_clients.values():
+        await client.close()
+    _openai_clients.clear()
+
+
 @dataclass
 class UserMessage:
     text: str
@@ -20,6 +61,10 @@ class LlmChat:
         self.system_message = system_message
         self.provider = None
         self.model_name = None
+        # Of the last call: (prompt, completion) tokens if the provider reported them, and
+        # its duration without the rate-limit wait
+        self.usage: Optional[tuple] = None
+        self.elapsed_ms: Optional[float] = None
 
     def with_model(self, provider: str, model_name: str):
         self.provider = provider
@@ -27,26 +72,53 @@ class LlmChat:
         return self
 
     async def send_message(self, user_message: UserMessage) -> str:
+        """Send one prompt, waiting for the shared rate limit, within the current request deadline."""
+        return await within_deadline(self._send_rate_limited(user_message), "llm_call")
+
+    async def _send_rate_limited(self, user_message: UserMessage) -> str:
+        bucket = provider_bucket(self.provider)
+        if bucket is not None:
+            try:
+                await bucket.acquire()
+            except RateLimitTimeout as e:
+                raise LLMRateLimitError(str(e)) from e
+        self.usage = None
+        started = time.perf_counter()
+        try:
+            return await self._send(user_message)
+        except LLMRateLimitError:
+            # The provider disagrees with our budget; make every worker wait for a refill
+            if bucket is not None:
+                await bucket.drain()
+            raise
+        finally:
+            self.elapsed_ms = (time.perf_counter() - started) * 1000
+
+    async def _send(self, user_message: UserMessage) -> str:
         if self.provider == "perplexity":
             if not self.api_key:
                 raise ValueError("LLM_API_KEY is not configured")
             
-            from openai import OpenAI
+            from openai import NOT_GIVEN, RateLimitError
             
-            client = OpenAI(
-                api_key=self.api_key,
-                base_url="https://api.perplexity.ai"
-            )
+            client = _get_openai_client(self.api_key)
             
             try:
-                response = client.chat.completions.create(
+                response = await client.chat.completions.create(
                     model=self.model_name,
                     messages=[
                         {"role": "system", "content": self.system_message},
                         {"role": "user", "content": user_message.text}
-                    ]
+                    ],
+                    # Per attempt; within_deadline() bounds the total including SDK retries
+                    timeout=remaining_budget() or NOT_GIVEN
                 )
+                if response.usage is not None:
+                    self.usage = (response.usage.prompt_tokens, response.usage.completion_tokens)
                 return response.choices[0].message.content
+            except RateLimitError as e:
+                logger.warning(f"Perplexity rate limit after retries: {e}")
+                raise LLMRateLimitError(str(e)) from e
             except Exception as e:
                 logger.error(f"Perplexity API error: {e}")
                 raise
@@ -56,30 +128,44 @@ class LlmChat:
             if not self.api_key:
                 raise ValueError("LLM_API_KEY is not configured")
             
+            import google.generativeai as genai
+            
             genai.configure(api_key=self.api_key)
             model = genai.GenerativeModel(
                 model_name=self.model_name,
                 system_instruction=self.system_message
             )
             
-            from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, before_sleep_log
+            from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, RetryError
             import google.api_core.exceptions
             
+            def log_retry(retry_state):
+                LLM_RETRIES.inc(provider="gemini")
+                logger.info(f"Gemini rate limited, retrying (attempt {retry_state.attempt_number})")
+            
             # Define retry strategy for Rate Limits (429)
             @retry(
                 retry=retry_if_exception_type(google.api_core.exceptions.ResourceExhausted),
                 wait=wait_exponential(multiplier=2, min=4, max=60),
                 stop=stop_after_attempt(5),
-                before_sleep=before_sleep_log(logger, logging.INFO)
+                before_sleep=log_retry
             )
             def generate_with_retry(text):
                 logger.info("Sending request to Gemini API...")
-                return model.generate_content(text)
+                check_deadline("llm_call")
+                # The Gemini SDK call blocks, so it cannot be cancelled; bound it with the remaining budget
+                budget = remaining_budget()
+                return model.generate_content(text, request_options={"timeout": budget} if budget else None)
 
             try:
                 # Use generating content with retry
                 response = generate_with_retry(user_message.text)
+                metadata = getattr(response, "usage_metadata", None)
+                if metadata is not None:
+                    self.usage = (metadata.prompt_token_count, metadata.candidates_token_count)
                 return response.text if hasattr(response, "text") else str(response)
+            except (RetryError, google.api_core.exceptions.ResourceExhausted) as e:
+                raise LLMRateLimitError(str(e)) from e
             except Exception as e:
                 logger.error(f"Gemini API error after retries: {e}")
                 raise
@@ -87,41 +173,7 @@ class LlmChat:
         raise NotImplementedError(f"Provider '{self.provider}' is not supported in this setup")
 
 
-class LLMService:
-    """Service for interacting with various LLM providers"""
-    
-    def __init__(self):
-        self.api_key = settings.LLM_API_KEY
-        if not self.api_key:
-            import warnings
-            warnings.warn("LLM_API_KEY not configured - AI features will be limited")
-    
-    async def analyze_and_generate_resume(
-        self,
-        job_description: str,
-        base_resumes: list,
-        model_id: str,
-        session_id: str,
-        formatting_preference: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        Analyze job description and resumes, then generate tailored resume content
-        """
-        if not job_description or not job_description.strip():
-            raise ValueError("Job description cannot be empty")
-        
-        if not base_resumes:
-            raise ValueError("At least one base resume must be provided")
-        
-        # Get model configuration from settings
-        try:
-            model_config = settings.get_model_config(model_id)
-        except ValueError as e:
-            logger.error(str(e))
-            raise
-        
-        # Create system message
-        system_message = """You are an expert resume writer and career consultant specializing in creating highly tailored, ATS-optimized resumes. 
+SYSTEM_MESSAGE = """You are an expert resume writer and career consultant specializing in creating highly tailored, ATS-optimized resumes. 
 Your task is to:
 1. Analyze the job description deeply to extract keywords, requirements, and priorities
 2. Review the candidate's resume(s) to identify relevant experience
@@ -134,64 +186,45 @@ Focus on:
 - Professional formatting and structure
 - Clear, impactful bullet points using strong action verbs"""
 
-        # Initialize LLM chat
-        chat = LlmChat(
-            api_key=self.api_key,
-            session_id=session_id,
-            system_message=system_message
-        ).with_model(model_config.provider, model_config.api_model_name)
-        
-        # Prepare the analysis prompt
-        resume_texts = "\n\n---RESUME SEPARATOR---\n\n".join(base_resumes)
-        
-        prompt = f"""Please analyze this job posting and create a highly tailored resume.
+RESUME_SEPARATOR = "\n\n---RESUME SEPARATOR---\n\n"
 
-JOB DESCRIPTION:
-{job_description}
-
-CANDIDATE'S BASE RESUME(S):
-{resume_texts}
-
-{f'FORMATTING PREFERENCE: {formatting_preference}' if formatting_preference else ''}
-
-Please provide a comprehensive analysis and generate a tailored resume in the following JSON format:
-
-{{
-  "analysis": {{
+# JSON structure requested for each tailored resume (shared by single and batch prompts)
+ANALYSIS_JSON_FORMAT = """{
     "job_keywords": ["list of critical keywords from job description"],
     "required_qualifications": ["must-have qualifications"],
     "preferred_qualifications": ["nice-to-have qualifications"],
     "candidate_strengths": ["candidate's matching strengths"],
     "gaps": ["areas where candidate lacks direct experience"],
     "tailoring_strategy": "Brief explanation of how resume was tailored"
-  }},
-  "resume": {{
+  }"""
+
+RESUME_JSON_FORMAT = """{
     "name": "Candidate Full Name",
-    "contact": {{
+    "contact": {
       "email": "email@example.com",
       "phone": "phone number",
       "location": "City, State",
       "linkedin": "LinkedIn URL if available"
-    }},
+    },
     "professional_summary": "3-5 line professional summary with keywords",
-    "core_competencies": {{
+    "core_competencies": {
       "Technical Domain Expertise": ["keyword1", "keyword2"],
       "Engineering Methodologies": ["keyword3", "keyword4"],
       "Analysis Tools": ["tool1", "tool2"],
       "Project Management": ["skill1", "skill2"]
-    }},
+    },
     "experience": [
-      {{
+      {
         "company": "Company Name",
         "location": "City, State",
         "title": "Job Title",
         "start_date": "MM/YYYY",
         "end_date": "MM/YYYY or Present",
         "bullets": ["Bullet point 1", "Bullet point 2"]
-      }}
+      }
     ],
     "education": [
-      {{
+      {
         "degree": "Degree Name",
         "field": "Field of Study",
         "university": "University Name",
@@ -199,20 +232,335 @@ Please provide a comprehensive analysis and generate a tailored resume in the fo
         "graduation_date": "MM/YYYY",
         "gpa": "X.XX/4.0 (if >3.5)",
         "coursework": ["Course 1", "Course 2"]
-      }}
+      }
     ],
     "certifications": ["Certification 1", "Certification 2"],
     "skills": ["Additional skills not covered above"]
-  }}
+  }"""
+
+# Example value per section, for asking again for only the sections that came back broken
+SECTION_JSON_FORMATS = {"analysis": json.loads(ANALYSIS_JSON_FORMAT), **json.loads(RESUME_JSON_FORMAT)}
+
+
+class LLMService:
+    """Service for interacting with various LLM providers"""
+    
+    def __init__(self):
+        self.api_key = settings.LLM_API_KEY
+        if not self.api_key:
+            import warnings
+            warnings.warn("LLM_API_KEY not configured - AI features will be limited")
+
+    async def warm_up(self) -> Dict[str, float]:
+        """
+        Import the SDKs of the configured providers and open a connection to the
+        OpenAI-compatible endpoint so the first generation skips that latency.
+        Returns seconds spent per step; failures are logged, never raised.
+        """
+        timings = {}
+        for provider in sorted({m.provider for m in settings.AVAILABLE_MODELS}):
+            module = PROVIDER_SDK_MODULES.get(provider)
+            if not module:
+                continue
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(importlib.import_module, module)
+            except ImportError as e:
+                logger.warning(f"SDK for provider {provider} unavailable: {e}")
+                continue
+            timings[f"import_{provider}"] = time.perf_counter() - started
+
+        if self.api_key and any(m.provider == "perplexity" for m in settings.AVAILABLE_MODELS):
+            started = time.perf_counter()
+            client = _get_openai_client(self.api_key)
+            try:
+                # Any response will do; the point is the pooled TCP/TLS connection
+                await client.with_options(max_retries=0, timeout=5).get("/", cast_to=object)
+            except Exception as e:
+                logger.debug(f"Provider pre-connect returned {type(e).__name__}")
+            timings["connect_perplexity"] = time.perf_counter() - started
+        return timings
+
+    @staticmethod
+    def build_prompt(
+        job_description: str,
+        base_resumes: list,
+        formatting_preference: Optional[str] = None
+    ) -> str:
+        """Build the user prompt for tailoring one resume to one job description"""
+        resume_texts = RESUME_SEPARATOR.join(base_resumes)
+        
+        return f"""Please analyze this job posting and create a highly tailored resume.
+
+JOB DESCRIPTION:
+{job_description}
+
+CANDIDATE'S BASE RESUME(S):
+{resume_texts}
+
+{f'FORMATTING PREFERENCE: {formatting_preference}' if formatting_preference else ''}
+
+Please provide a comprehensive analysis and generate a tailored resume in the following JSON format:
+
+{{
+  "analysis": {ANALYSIS_JSON_FORMAT},
+  "resume": {RESUME_JSON_FORMAT}
 }}
 
 Ensure the resume is ATS-optimized with exact keyword matches from the job description."""
 
-        # Send message and get response
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
+    @staticmethod
+    def build_batch_prompt(
+        jobs: List[Dict[str, str]],
+        base_resumes: list,
+        formatting_preference: Optional[str] = None
+    ) -> str:
+        """
+        Build one prompt tailoring the same base resumes to several job descriptions.
+        
+        Each job dict carries a short "ref" label and its "job_description"; the
+        resume text is included once and shared by every job in the batch.
+        """
+        resume_texts = RESUME_SEPARATOR.join(base_resumes)
+        job_blocks = "\n\n".join(
+            f"=== {job['ref']} ===\n{job['job_description']}" for job in jobs
+        )
+        refs = ", ".join(job['ref'] for job in jobs)
+        
+        return f"""Please analyze each of the following job postings and create a separate, highly tailored resume for each one.
+All job postings are for the same candidate, whose base resume(s) are given once below.
+
+CANDIDATE'S BASE RESUME(S):
+{resume_texts}
+
+JOB POSTINGS ({len(jobs)}):
+{job_blocks}
+
+{f'FORMATTING PREFERENCE: {formatting_preference}' if formatting_preference else ''}
+
+For every job posting ({refs}) provide a comprehensive analysis and a tailored resume. Respond with a single JSON object in the following format, with exactly one entry per job posting:
+
+{{
+  "applications": [
+    {{
+      "job_ref": "JOB_1",
+      "analysis": {ANALYSIS_JSON_FORMAT},
+      "resume": {RESUME_JSON_FORMAT}
+    }}
+  ]
+}}
+
+Tailor each resume independently to its own job posting and ensure each is ATS-optimized with exact keyword matches from that job description."""
+
+    @staticmethod
+    def build_sections_prompt(
+        job_description: str,
+        base_resumes: list,
+        sections: List[str],
+        formatting_preference: Optional[str] = None
+    ) -> str:
+        """Build a prompt asking again for only some sections of the tailored resume"""
+        resume_texts = RESUME_SEPARATOR.join(base_resumes)
+        section_format = json.dumps({section: SECTION_JSON_FORMATS[section] for section in sections}, indent=2)
+        
+        return f"""Please analyze this job posting and the candidate's resume(s), then write only the requested sections of a highly tailored resume.
+
+JOB DESCRIPTION:
+{job_description}
+
+CANDIDATE'S BASE RESUME(S):
+{resume_texts}
+
+{f'FORMATTING PREFERENCE: {formatting_preference}' if formatting_preference else ''}
+
+Respond with a single JSON object containing exactly these keys ({", ".join(sections)}), in the following format:
+
+{section_format}
+
+Ensure the content is ATS-optimized with exact keyword matches from the job description."""
+
+    async def regenerate_sections(
+        self,
+        job_description: str,
+        base_resumes: list,
+        sections: List[str],
+        model_id: str,
+        session_id: str,
+        formatting_preference: Optional[str] = None
+    ) -> str:
+        """Ask the model again for only the given sections; returns the raw response text"""
+        with span("prompt_build"), STAGE_SECONDS.time(stage="prompt_build"):
+            prompt = self.build_sections_prompt(job_description, base_resumes, sections, formatting_preference)
+        return await self.complete(prompt, model_id, session_id, kind="sections")
+
+    def _create_chat(self, model_id: str, session_id: str) -> LlmChat:
+        """Create a chat client for the configured model"""
+        try:
+            model_config = settings.get_model_config(model_id)
+        except ValueError as e:
+            logger.error(str(e))
+            raise
+        
+        return LlmChat(
+            api_key=self.api_key,
+            session_id=session_id,
+            system_message=SYSTEM_MESSAGE
+        ).with_model(model_config.provider, model_config.api_model_name)
+
+    @staticmethod
+    def _llm_span(chat: LlmChat, prompt: str):
+        return span("llm_call", **{
+            "llm.provider": chat.provider,
+            "llm.model": chat.model_name,
+            "llm.prompt_chars": len(prompt),
+        })
+
+    async def analyze_and_generate_resume(
+        self,
+        job_description: str,
+        base_resumes: list,
+        model_id: str,
+        session_id: str,
+        formatting_preference: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze job description and resumes, then generate tailored resume content
+        """
+        prompt = self.prepare_resume_prompt(job_description, base_resumes, formatting_preference)
+        response = await self.complete(prompt, model_id, session_id)
         
         return {
             "raw_response": response,
             "model_used": model_id
         }
+
+    def prepare_resume_prompt(
+        self,
+        job_description: str,
+        base_resumes: list,
+        formatting_preference: Optional[str] = None
+    ) -> str:
+        """Validate the inputs and build the single-job prompt (separate so callers can checkpoint it)"""
+        if not job_description or not job_description.strip():
+            raise ValueError("Job description cannot be empty")
+        
+        if not base_resumes:
+            raise ValueError("At least one base resume must be provided")
+        
+        with span("prompt_build"), STAGE_SECONDS.time(stage="prompt_build"):
+            return self.build_prompt(job_description, base_resumes, formatting_preference)
+
+    async def complete(self, prompt: str, model_id: str, session_id: str, kind: str = "single") -> str:
+        """Send a prepared prompt to the model and return the raw response text"""
+        chat = self._create_chat(model_id, session_id)
+        with self._llm_span(chat, prompt), LLM_CALL_SECONDS.time(provider=chat.provider, model=chat.model_name):
+            response = await chat.send_message(UserMessage(text=prompt))
+        await self._record_call(chat, model_id, kind, prompt, response)
+        return response
+
+    def count_prompt_tokens(self, prompt: str, model_id: str) -> tuple:
+        """
+        Local (tokens, tokenizer) count of everything sent for a prompt, system
+        message included. May load an encoding, so call it off the event loop.
+        """
+        encoding = settings.get_model_config(model_id).tokenizer
+        system_tokens, tokenizer = count_tokens(SYSTEM_MESSAGE, encoding)
+        prompt_tokens, _ = count_tokens(prompt, encoding)
+        return system_tokens + prompt_tokens + MESSAGE_OVERHEAD_TOKENS, tokenizer
+
+    async def _record_call(
+        self, chat: LlmChat, model_id: str, kind: str, prompt: str, response: str, jobs: int = 1
+    ) -> None:
+        """Store the call's token usage and duration for estimates; never fails the generation."""
+        try:
+            local_tokens, _ = await asyncio.to_thread(self.count_prompt_tokens, prompt, model_id)
+            if chat.usage is not None:
+                prompt_tokens, completion_tokens = chat.usage
+                source = "provider"
+            else:
+                encoding = settings.get_model_config(model_id).tokenizer
+                prompt_tokens = local_tokens
+                completion_tokens, _ = await asyncio.to_thread(count_tokens, response or "", encoding)
+                source = "local"
+            LLM_TOKENS.inc(prompt_tokens, provider=chat.provider, model=chat.model_name, direction="prompt")
+            LLM_TOKENS.inc(completion_tokens, provider=chat.provider, model=chat.model_name, direction="completion")
+            await GenerationStatsRepository.record(
+                application_id=chat.session_id,
+                ai_model=model_id,
+                kind=kind,
+                prompt_chars=len(prompt),
+                prompt_tokens=prompt_tokens,
+                prompt_tokens_local=local_tokens,
+                completion_tokens=completion_tokens,
+                token_source=source,
+                llm_ms=chat.elapsed_ms or 0.0,
+                jobs=jobs
+            )
+        except Exception as e:
+            logger.warning(f"Could not record LLM usage for {chat.session_id}: {e}")
+
+    async def estimate(self, prompt: str, model_id: str, unparsed_chars: int = 0) -> Dict[str, Any]:
+        """
+        Predict tokens and latency of sending a prompt to a single-job generation,
+        without calling the model. `unparsed_chars` is text the prompt will also
+        carry but that is only known by size, counted at CHARS_PER_TOKEN.
+        """
+        model_config = settings.get_model_config(model_id)
+        local_tokens, tokenizer = await asyncio.to_thread(self.count_prompt_tokens, prompt, model_id)
+        local_tokens += round(unparsed_chars / CHARS_PER_TOKEN)
+        history = await GenerationStatsRepository.recent(model_id, "single", settings.ESTIMATE_HISTORY_SIZE)
+        return {
+            "model": model_id,
+            "prompt_chars": len(prompt) + unparsed_chars,
+            "tokenizer": tokenizer,
+            **forecast(model_config, local_tokens, history, settings.ESTIMATE_WARN_PROMPT_TOKENS),
+        }
+
+    async def analyze_and_generate_resumes_batch(
+        self,
+        job_descriptions: Dict[str, str],
+        base_resumes: list,
+        model_id: str,
+        session_id: str,
+        formatting_preference: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Tailor the same base resumes to several job descriptions in one LLM call.
+        
+        `job_descriptions` maps an application ID to its job description. The
+        returned "job_refs" maps the short labels used in the prompt back to
+        those application IDs so the response can be split per application.
+        """
+        if not job_descriptions:
+            raise ValueError("At least one job description must be provided")
+        
+        if len(job_descriptions) > settings.LLM_BATCH_MAX_JOBS:
+            raise ValueError(
+                f"Batch size {len(job_descriptions)} exceeds the limit of {settings.LLM_BATCH_MAX_JOBS} jobs"
+            )
+        
+        if not base_resumes:
+            raise ValueError("At least one base resume must be provided")
+        
+        jobs = []
+        job_refs = {}
+        for index, (application_id, job_description) in enumerate(job_descriptions.items(), start=1):
+            if not job_description or not job_description.strip():
+                raise ValueError(f"Job description cannot be empty (application {application_id})")
+            ref = f"JOB_{index}"
+            job_refs[ref] = application_id
+            jobs.append({"ref": ref, "job_description": job_description})
+        
+        chat = self._create_chat(model_id, session_id)
+        with span("prompt_build", **{"batch.size": len(jobs)}), STAGE_SECONDS.time(stage="prompt_build"):
+            prompt = self.build_batch_prompt(jobs, base_resumes, formatting_preference)
+        
+        with self._llm_span(chat, prompt), LLM_CALL_SECONDS.time(provider=chat.provider, model=chat.model_name):
+            response = await chat.send_message(UserMessage(text=prompt))
+        await self._record_call(chat, model_id, "batch", prompt, response, jobs=len(jobs))
+        
+        return {
+            "raw_response": response,
+            "model_used": model_id,
+            "job_refs": job_refs
+        }
@@ -0,0 +1,321 @@
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+# Latency buckets (seconds) covering sub-millisecond DB queries up to multi-minute LLM calls
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels: str):
+        """Increment for the duration of the block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observe the wall time of the block, whether it succeeds or raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels: str):
+        """Decorator form of time() for sync and async functions."""
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.time(**labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "resume_stage_duration_seconds",
+    "Duration of generation pipeline stages (upload, prompt_build, json_parse, docx_render).",
+    labels=("stage",)
+))
+PARSE_SECONDS = registry.register(Histogram(
+    "resume_parse_duration_seconds",
+    "Duration of document text extraction by file type.",
+    labels=("file_type",)
+))
+LLM_CALL_SECONDS = registry.register(Histogram(
+    "resume_llm_call_duration_seconds",
+    "Duration of LLM provider calls.",
+    labels=("provider", "model")
+))
+DB_QUERY_SECONDS = registry.register(Histogram(
+    "resume_db_query_duration_seconds",
+    "Duration of repository operations, including connection setup.",
+    labels=("operation",)
+))
+CACHE_REQUESTS = registry.register(Counter(
+    "resume_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss).",
+    labels=("cache", "result")
+))
+LLM_RETRIES = registry.register(Counter(
+    "resume_llm_retries_total",
+    "LLM calls retried after a transient provider error.",
+    labels=("provider",)
+))
+RATE_LIMITED = registry.register(Counter(
+    "resume_rate_limited_total",
+    "Generations that ended in a provider rate limit (HTTP 429).",
+    labels=("provider",)
+))
+GENERATION_FAILURES = registry.register(Counter(
+    "resume_generation_failures_total",
+    "Failed generations by reason.",
+    labels=("reason",)
+))
+GENERATIONS_IN_FLIGHT = registry.register(Gauge(
+    "resume_generations_in_flight",
+    "Generations currently being processed."
+))
+STARTUP_SECONDS = registry.register(Gauge(
+    "resume_startup_seconds",
+    "Seconds from server import start to each startup phase (imports, warmup, ready, first_success).",
+    labels=("phase",)
+))
+GENERATION_QUEUE_DEPTH = registry.register(Gauge(
+    "resume_generation_queue_depth",
+    "Generations accepted but waiting to start."
+))
+DB_BUSY_RETRIES = registry.register(Counter(
+    "resume_db_busy_retries_total",
+    "Database writes retried after SQLite reported the database as locked.",
+    labels=("operation",)
+))
+RATE_LIMIT_WAIT_SECONDS = registry.register(Histogram(
+    "resume_rate_limit_wait_seconds",
+    "Time spent waiting for a token from the shared provider rate-limit bucket.",
+    labels=("bucket",)
+))
+ADMISSION_IN_FLIGHT = registry.register(Gauge(
+    "resume_admission_in_flight",
+    "Requests holding an admission slot, by endpoint class.",
+    labels=("endpoint_class",)
+))
+ADMISSION_QUEUED = registry.register(Gauge(
+    "resume_admission_queued",
+    "Requests waiting for an admission slot, by endpoint class.",
+    labels=("endpoint_class",)
+))
+ADMISSION_REJECTED = registry.register(Counter(
+    "resume_admission_rejected_total",
+    "Requests rejected with 503 by admission control, by endpoint class and reason (queue_full/queue_timeout).",
+    labels=("endpoint_class", "reason")
+))
+ADMISSION_WAIT_SECONDS = registry.register(Histogram(
+    "resume_admission_wait_seconds",
+    "Time queued requests waited for an admission slot.",
+    labels=("endpoint_class",)
+))
+CHECKPOINT_HITS = registry.register(Counter(
+    "resume_checkpoint_hits_total",
+    "Generation stages skipped because a checkpoint from an earlier attempt matched their inputs.",
+    labels=("stage",)
+))
+LLM_OUTPUT_REPAIRS = registry.register(Counter(
+    "resume_llm_output_repairs_total",
+    "LLM outputs fixed locally instead of regenerated, by kind (json/coercion).",
+    labels=("kind",)
+))
+SECTION_REASKS = registry.register(Counter(
+    "resume_section_reasks_total",
+    "Resume sections requested again from the LLM because local repair could not fix them.",
+    labels=("section",)
+))
+IMPORT_FILES = registry.register(Counter(
+    "resume_import_files_total",
+    "Files in bulk imports, by outcome (parsed/unreadable/unsupported/too_large).",
+    labels=("outcome",)
+))
+STORAGE_RECLAIMED_BYTES = registry.register(Counter(
+    "resume_storage_reclaimed_bytes_total",
+    "Bytes freed by the storage lifecycle, by directory (uploads/generated) and reason.",
+    labels=("kind", "reason")
+))
+STORAGE_FILES_REMOVED = registry.register(Counter(
+    "resume_storage_files_removed_total",
+    "Files removed by the storage lifecycle, by directory and reason (deleted/unattached/orphaned/expired/quota).",
+    labels=("kind", "reason")
+))
+STORAGE_BYTES = registry.register(Gauge(
+    "resume_storage_bytes",
+    "Disk usage per directory as measured by the last storage lifecycle pass.",
+    labels=("kind",)
+))
+PARSE_TRUNCATED = registry.register(Counter(
+    "resume_parse_truncated_total",
+    "Documents whose parsing stopped early at PARSE_MAX_PAGES or PARSE_MAX_CHARS, by file type and limit.",
+    labels=("file_type", "limit")
+))
+LLM_TOKENS = registry.register(Counter(
+    "resume_llm_tokens_total",
+    "Tokens sent to and received from the LLM, by provider, model and direction (prompt/completion).",
+    labels=("provider", "model", "direction")
+))
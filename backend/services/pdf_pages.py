@@ -0,0 +1,91 @@
+"""
+Page-level PDF text extraction.
+
+Runs in parser worker processes as well as in the server, so it imports
+nothing from the app: a spawned worker only pays for pypdf.
+"""
+import os
+import re
+import threading
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+# Plain extraction runs words together when the content stream positions every
+# word instead of emitting spaces; below this share of spaces a page is re-read
+# in layout mode, which infers them from glyph positions but costs several times more
+MIN_SPACE_RATIO = 0.05
+MIN_CHARS_FOR_RATIO = 200
+
+_RUNS_OF_SPACES = re.compile(r"[ \t]{2,}")
+
+# Worker processes keep the last document they opened, since consecutive ranges of one
+# document usually land on the same worker; the server never holds readers between calls
+_local = threading.local()
+_cache_readers = False
+
+
+def enable_reader_cache() -> None:
+    """Process pool initializer."""
+    global _cache_readers
+    _cache_readers = True
+
+
+def open_reader(file_path: str):
+    from pypdf import PdfReader
+
+    if not _cache_readers:
+        return PdfReader(file_path)
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_mtime_ns, stat.st_size)
+    if getattr(_local, "key", None) != key:
+        _local.key, _local.reader = key, PdfReader(file_path)
+    return _local.reader
+
+
+def _space_ratio(text: str) -> float:
+    return text.count(" ") / len(text) if text else 0.0
+
+
+def page_text(page) -> str:
+    """A page's text; layout mode only when the plain result is empty or has lost its spaces."""
+    text = page.extract_text() or ""
+    stripped = text.strip()
+    if stripped and (len(stripped) < MIN_CHARS_FOR_RATIO or _space_ratio(stripped) >= MIN_SPACE_RATIO):
+        return text
+    try:
+        layout = page.extract_text(extraction_mode="layout") or ""
+    except Exception:
+        return text
+    # Layout mode pads columns with spaces to keep them aligned
+    layout = "\n".join(_RUNS_OF_SPACES.sub(" ", line).rstrip() for line in layout.splitlines()).strip()
+    if len(layout) > len(stripped) or _space_ratio(layout) > _space_ratio(stripped):
+        return layout
+    return text
+
+
+def extract_range(
+    source: Union[str, Any],
+    start: int,
+    stop: int,
+    max_chars: int = 0,
+    check: Optional[Callable[[], None]] = None
+) -> Tuple[List[str], int]:
+    """
+    Text of the pages in [start, stop) of a PDF (path or open reader) that have
+    any, stopping early once `max_chars` characters are collected (0 for no
+    limit). `check` runs before each page. Returns the texts and the number of
+    pages read.
+    """
+    reader = open_reader(source) if isinstance(source, str) else source
+    texts: List[str] = []
+    collected = read = 0
+    for index in range(start, stop):
+        if check:
+            check()
+        text = page_text(reader.pages[index])
+        read += 1
+        if text.strip():
+            texts.append(text)
+            collected += len(text)
+            if max_chars and collected >= max_chars:
+                break
+    return texts, read
@@ -0,0 +1,281 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import logging
+import pstats
+import re
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+# Number of functions / allocation sites kept in the text summaries
+SUMMARY_LIMIT = 40
+
+# Innermost frames logged for a blocked event loop
+STACK_LIMIT = 30
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    """Constant-time check of an admin token; always False while ADMIN_TOKEN is unset."""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+
+def _slug(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")[:60] or "root"
+
+
+class RequestProfile:
+    """
+    cProfile + tracemalloc capture of a single request.
+
+    cProfile hooks the event-loop thread, so anything else the loop runs while
+    the request is in flight shows up too; only one request is profiled at a
+    time to keep that noise (and the overhead) bounded.
+    """
+
+    def __init__(self, method: str, path: str):
+        created = datetime.now(timezone.utc)
+        self.profile_id = f"{created.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.name = f"{self.profile_id}-{method.lower()}-{_slug(path)}"
+        self._profiler = cProfile.Profile()
+        self._started_tracemalloc = False
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._started_at = 0.0
+        self.duration_ms = 0.0
+        self.traced_memory = (0, 0)
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self._baseline = tracemalloc.take_snapshot()
+        self._started_at = time.perf_counter()
+        self._profiler.enable()
+
+    def stop(self) -> tracemalloc.Snapshot:
+        self._profiler.disable()
+        self.duration_ms = (time.perf_counter() - self._started_at) * 1000
+        snapshot = tracemalloc.take_snapshot()
+        self.traced_memory = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        return snapshot
+
+    def write(self, snapshot: tracemalloc.Snapshot, status_code: Optional[int]) -> Path:
+        """Write the .prof dump plus CPU and memory text summaries; returns the artifact directory."""
+        directory = settings.PROFILE_DIR / self.name
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self._profiler.dump_stats(str(directory / "cpu.prof"))
+
+        buffer = io.StringIO()
+        buffer.write(f"{self.method} {self.path} -> {status_code} in {self.duration_ms:.1f} ms\n\n")
+        stats = pstats.Stats(self._profiler, stream=buffer)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(SUMMARY_LIMIT)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(SUMMARY_LIMIT)
+        (directory / "cpu.txt").write_text(buffer.getvalue(), encoding="utf-8")
+
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ]
+        diff = snapshot.filter_traces(filters).compare_to(self._baseline.filter_traces(filters), "lineno")
+        current, peak = self.traced_memory
+        lines = [
+            f"Allocation growth during {self.method} {self.path} (top {SUMMARY_LIMIT})",
+            f"Traced memory: current={current} bytes, peak={peak} bytes",
+            "",
+        ]
+        lines.extend(str(stat) for stat in diff[:SUMMARY_LIMIT])
+        (directory / "memory.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        _prune_profiles()
+        return directory
+
+
+def _prune_profiles() -> None:
+    """Keep only the newest PROFILE_MAX_ARTIFACTS profile directories."""
+    if settings.PROFILE_MAX_ARTIFACTS <= 0:
+        return
+    directories = sorted(
+        (p for p in settings.PROFILE_DIR.iterdir() if p.is_dir()),
+        key=lambda p: p.name,
+        reverse=True
+    )
+    for stale in directories[settings.PROFILE_MAX_ARTIFACTS:]:
+        for artifact in stale.iterdir():
+            artifact.unlink(missing_ok=True)
+        stale.rmdir()
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Profile directories, newest first, with their artifact files."""
+    if not settings.PROFILE_DIR.exists():
+        return []
+    profiles = []
+    for directory in sorted(settings.PROFILE_DIR.iterdir(), key=lambda p: p.name, reverse=True):
+        if not directory.is_dir():
+            continue
+        profiles.append({
+            "id": directory.name,
+            "created_at": datetime.fromtimestamp(directory.stat().st_mtime, timezone.utc).isoformat(),
+            "files": [
+                {"name": f.name, "size": f.stat().st_size}
+                for f in sorted(directory.iterdir()) if f.is_file()
+            ],
+        })
+    return profiles
+
+
+def resolve_profile_file(profile_id: str, file_name: str) -> Optional[Path]:
+    """Path of one artifact, or None if it does not exist or escapes PROFILE_DIR."""
+    root = settings.PROFILE_DIR.resolve()
+    path = (root / profile_id / file_name).resolve()
+    if path.parent.parent != root or not path.is_file():
+        return None
+    return path
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles a request when PROFILE_ALL_REQUESTS is set,
+    or when it carries `X-Profile: 1` together with a valid `X-Admin-Token`.
+
+    The artifact ID is returned in the `X-Profile-Id` response header. The
+    event stream is never profiled; it would hold the profiler indefinitely.
+    """
+
+    EXCLUDED_PATHS = ("/api/events",)
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = asyncio.Lock()
+
+    def _requested(self, scope) -> bool:
+        if settings.PROFILE_ALL_REQUESTS:
+            return True
+        headers = dict(scope.get("headers") or [])
+        if headers.get(PROFILE_HEADER, b"").lower() not in (b"1", b"true"):
+            return False
+        return admin_token_valid(headers.get(ADMIN_TOKEN_HEADER, b"").decode("latin-1"))
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(self.EXCLUDED_PATHS)
+            or not self._requested(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+        if self._lock.locked():
+            logger.info(f"Profiler busy; not profiling {scope['method']} {scope['path']}")
+            await self.app(scope, receive, send)
+            return
+
+        async with self._lock:
+            profile = RequestProfile(scope["method"], scope["path"])
+            status_code = None
+
+            async def send_with_profile_id(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = list(message.get("headers", []))
+                    headers.append((PROFILE_ID_HEADER, profile.name.encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            profile.start()
+            try:
+                await self.app(scope, receive, send_with_profile_id)
+            finally:
+                snapshot = profile.stop()
+                try:
+                    directory = await asyncio.to_thread(profile.write, snapshot, status_code)
+                    logger.info(
+                        f"Profiled {profile.method} {profile.path} in {profile.duration_ms:.1f} ms -> {directory}"
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to write profile {profile.name}: {e}")
+
+
+class LoopLagMonitor:
+    """
+    Watchdog for callbacks that block the event loop.
+
+    A heartbeat scheduled on the loop records when it last ran; a daemon thread
+    checks it and, once the loop has been stuck for more than `threshold_ms`,
+    logs the loop thread's current stack (the offending callback). When the
+    loop recovers the total stall time is logged as well.
+    """
+
+    def __init__(self, threshold_ms: float):
+        self.threshold = threshold_ms / 1000
+        self._interval = max(self.threshold / 4, 0.005)
+        self._last_beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.TimerHandle] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stalls = 0
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat = self._loop.call_later(self._interval, self._beat)
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Event-loop lag monitor started (threshold {self.threshold * 1000:.0f} ms)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def _beat(self) -> None:
+        self._last_beat = time.monotonic()
+        if not self._stop.is_set():
+            self._heartbeat = self._loop.call_later(self._interval, self._beat)
+
+    def _watch(self) -> None:
+        stalled_since = None
+        while not self._stop.wait(self._interval):
+            last_beat = self._last_beat
+            lag = time.monotonic() - last_beat - self._interval
+            if lag > self.threshold:
+                if stalled_since != last_beat:
+                    stalled_since = last_beat
+                    self.stalls += 1
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame is not None else "<unavailable>\n"
+                    logger.warning(
+                        f"Event loop blocked for {lag * 1000:.0f} ms (threshold "
+                        f"{self.threshold * 1000:.0f} ms); loop thread stack:\n{stack}"
+                    )
+            elif stalled_since is not None:
+                blocked_ms = (last_beat - stalled_since - self._interval) * 1000
+                logger.warning(f"Event loop recovered after blocking for ~{blocked_ms:.0f} ms")
+                stalled_since = None
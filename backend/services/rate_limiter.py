@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from config import settings
+from database import connect, retry_on_busy
+from services.metrics import RATE_LIMIT_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitTimeout(Exception):
+    """No token became available within the allowed wait."""
+
+
+class SharedTokenBucket:
+    """
+    Token bucket whose state lives in the rate_limit_buckets table, so every
+    worker process on the host draws from the same budget.
+
+    Each take is one short BEGIN IMMEDIATE transaction: refill by elapsed wall
+    time, then spend a token if one is available.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: int):
+        self.name = name
+        self.rate = per_minute / 60
+        self.capacity = max(burst, 1)
+
+    @retry_on_busy
+    async def _take(self) -> float:
+        """Spend one token if available; otherwise return the seconds until one will be."""
+        now = time.time()
+        async with connect(immediate=True) as db:
+            cursor = await db.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE name = ?", (self.name,)
+            )
+            row = await cursor.fetchone()
+            if row is None:
+                tokens = float(self.capacity)
+            else:
+                tokens = min(self.capacity, row['tokens'] + max(now - row['updated_at'], 0) * self.rate)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            await db.execute(
+                """
+                INSERT INTO rate_limit_buckets (name, tokens, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+                """,
+                (self.name, tokens, now)
+            )
+            await db.commit()
+        return wait
+
+    async def acquire(self, max_wait: Optional[float] = None) -> None:
+        """Wait for a token; raises RateLimitTimeout if none is available within max_wait seconds."""
+        max_wait = settings.LLM_RATE_LIMIT_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        started = time.monotonic()
+        while True:
+            wait = await self._take()
+            if wait == 0:
+                RATE_LIMIT_WAIT_SECONDS.observe(time.monotonic() - started, bucket=self.name)
+                return
+            remaining = max_wait - (time.monotonic() - started)
+            if wait > remaining:
+                raise RateLimitTimeout(f"No '{self.name}' token within {max_wait:.0f}s")
+            await asyncio.sleep(wait)
+
+    @retry_on_busy
+    async def drain(self) -> None:
+        """Empty the bucket, e.g. after the provider answered 429, so all workers back off."""
+        async with connect(immediate=True) as db:
+            await db.execute(
+                """
+                INSERT INTO rate_limit_buckets (name, tokens, updated_at) VALUES (?, 0, ?)
+                ON CONFLICT (name) DO UPDATE SET tokens = 0, updated_at = excluded.updated_at
+                """,
+                (self.name, time.time())
+            )
+            await db.commit()
+
+
+_buckets: Dict[str, SharedTokenBucket] = {}
+
+
+def provider_bucket(provider: str) -> Optional[SharedTokenBucket]:
+    """The shared request bucket for an LLM provider, or None when LLM_REQUESTS_PER_MINUTE is 0."""
+    if settings.LLM_REQUESTS_PER_MINUTE <= 0:
+        return None
+    bucket = _buckets.get(provider)
+    if bucket is None:
+        bucket = _buckets[provider] = SharedTokenBucket(
+            f"llm:{provider}", settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_RATE_LIMIT_BURST
+        )
+    return bucket
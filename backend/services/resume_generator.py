@@ -1,35 +1,115 @@
+import io
 import json
 from pathlib import Path
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import re
+from services.metrics import STAGE_SECONDS, LLM_OUTPUT_REPAIRS
+from services.resume_schema import repair_json, validate_output
+from services.tracing import traced
+from services.deadline import check as check_deadline
 
 
 class ResumeGenerator:
     """Service for generating formatted .docx resumes"""
     
+    # Bytes of python-docx's built-in template, read once instead of from disk per render
+    _template: Optional[bytes] = None
+    
+    @staticmethod
+    def load_template() -> bytes:
+        """Import python-docx and cache its default template; called lazily or during warm-up"""
+        if ResumeGenerator._template is None:
+            from docx.api import _default_docx_path
+            ResumeGenerator._template = Path(_default_docx_path()).read_bytes()
+        return ResumeGenerator._template
+    
     @staticmethod
+    @STAGE_SECONDS.timed(stage="json_parse")
+    @traced("json_parse")
     def _parse_llm_response(raw_response: str) -> Dict[str, Any]:
-        """Parse LLM response to extract JSON data"""
-        try:
-            # Try to find JSON in the response
-            json_match = re.search(r'\{.*\}', raw_response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                return json.loads(json_str)
-            else:
-                # If no JSON found, return raw response
-                return {"error": "Could not parse JSON from response", "raw": raw_response}
-        except json.JSONDecodeError:
+        """Parse LLM response to extract JSON data, repairing common syntax damage locally"""
+        # Try to find JSON in the response
+        json_match = re.search(r'\{.*\}', raw_response, re.DOTALL)
+        if json_match:
+            try:
+                parsed = json.loads(json_match.group(0))
+                if isinstance(parsed, dict):
+                    return parsed
+            except json.JSONDecodeError:
+                pass
+        
+        # Trailing commas, truncated output, prose around the object
+        repaired = repair_json(raw_response)
+        if isinstance(repaired, dict):
+            LLM_OUTPUT_REPAIRS.inc(kind="json")
+            return repaired
+        if json_match:
             return {"error": "Invalid JSON in response", "raw": raw_response}
+        return {"error": "Could not parse JSON from response", "raw": raw_response}
+    
+    @staticmethod
+    def normalize_resume_data(data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Validate a parsed analysis/resume pair against the resume schema, coercing
+        near-misses (strings for lists, numbers for text, a single entry for a list).
+        Returns the normalized data and the sections that are still broken.
+        """
+        with STAGE_SECONDS.time(stage="schema_validate"):
+            normalized, broken, coerced = validate_output(data)
+        if coerced:
+            LLM_OUTPUT_REPAIRS.inc(kind="coercion")
+        return normalized, broken
+    
+    @staticmethod
+    def _split_batch_llm_response(raw_response: str, job_refs: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Split a batched LLM response into one parsed response per application.
+        
+        `job_refs` maps the prompt labels (e.g. "JOB_1") to application IDs. Every
+        application ID is present in the result; entries that are missing or
+        are not objects carry an "error" key, like `_parse_llm_response`; the
+        content of each entry is checked with `normalize_resume_data`.
+        """
+        parsed = ResumeGenerator._parse_llm_response(raw_response)
+        if "error" in parsed:
+            return {application_id: parsed for application_id in job_refs.values()}
+        
+        entries = parsed.get("applications")
+        if not isinstance(entries, list):
+            error = {"error": "Batch response has no 'applications' list", "raw": raw_response}
+            return {application_id: error for application_id in job_refs.values()}
+        
+        results = {}
+        for position, entry in enumerate(entries):
+            ref = entry.get("job_ref") if isinstance(entry, dict) else None
+            if ref not in job_refs:
+                # Fall back to ordering when the model drops or mangles the label
+                ref = f"JOB_{position + 1}"
+            application_id = job_refs.get(ref)
+            if application_id is None or application_id in results:
+                continue
+            
+            if not isinstance(entry, dict):
+                results[application_id] = {"error": f"Invalid batch entry {ref}: not a JSON object", "raw": entry}
+            else:
+                results[application_id] = {"analysis": entry.get("analysis"), "resume": entry.get("resume")}
+        
+        for ref, application_id in job_refs.items():
+            if application_id not in results:
+                results[application_id] = {"error": f"No entry for {ref} in batch response", "raw": raw_response}
+        
+        return results
     
     @staticmethod
+    @STAGE_SECONDS.timed(stage="docx_render")
+    @traced("docx_render")
     def generate_docx(resume_data: Dict[str, Any], output_path: str) -> str:
         """Generate a formatted .docx resume"""
+        from docx import Document
+        from docx.shared import Pt, Inches, RGBColor
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
         
-        doc = Document()
+        doc = Document(io.BytesIO(ResumeGenerator.load_template()))
         
         # Set document margins
         sections = doc.sections
@@ -117,6 +197,7 @@ class ResumeGenerator:
             exp_heading_run.font.name = 'Arial'
             
             for exp in resume["experience"]:
+                check_deadline("docx_render")
                 # Company and location
                 company_para = doc.add_paragraph()
                 company_run = company_para.add_run(f"{exp.get('company', '')} • {exp.get('location', '')}")
@@ -196,7 +277,8 @@ class ResumeGenerator:
                     run.font.size = Pt(10)
                     run.font.name = 'Arial'
         
-        # Save document
+        # Save document; a request that is out of time should not leave a file behind
+        check_deadline("docx_render")
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         doc.save(output_path)
         
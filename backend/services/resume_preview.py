@@ -0,0 +1,127 @@
+from html import escape
+from typing import Any, Callable, Dict, List, Tuple
+
+# Part of every preview URL; bump it when the output below changes so cached copies are not reused
+RENDERER_VERSION = 1
+
+_STYLE = """
+body { font-family: Arial, Helvetica, sans-serif; font-size: 10pt; color: #111; max-width: 8.5in; margin: 0.5in auto; padding: 0 0.75in; }
+h1 { font-size: 16pt; text-align: center; margin: 0; }
+.contact { text-align: center; margin: 4pt 0 16pt; }
+h2 { font-size: 11pt; margin: 14pt 0 4pt; }
+h3 { font-size: 10pt; margin: 8pt 0 0; }
+p, ul { margin: 2pt 0; }
+.indent { margin-left: 0.25in; }
+"""
+
+
+def _contact_parts(resume: Dict[str, Any]) -> List[str]:
+    contact = resume.get("contact") or {}
+    return [contact[key] for key in ("location", "phone", "email", "linkedin") if contact.get(key)]
+
+
+def _degree(edu: Dict[str, Any]) -> str:
+    return f"{edu.get('degree', '')} ({edu['field']})" if edu.get('field') else edu.get('degree', '')
+
+
+def _school(edu: Dict[str, Any]) -> str:
+    parts = [edu.get('university', '')]
+    if edu.get('location'):
+        parts.append(edu['location'])
+    if edu.get('gpa'):
+        parts.append(f"GPA: {edu['gpa']}")
+    if edu.get('graduation_date'):
+        parts.append(edu['graduation_date'])
+    return " • ".join(parts)
+
+
+def render_html(resume: Dict[str, Any]) -> str:
+    """The structured resume as a standalone HTML page, laid out like the generated DOCX."""
+    out = [
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">",
+        f"<title>{escape(resume.get('name', 'Resume'))}</title><style>{_STYLE}</style></head><body>",
+        f"<h1>{escape(resume.get('name', 'Candidate Name'))}</h1>",
+    ]
+    contact = _contact_parts(resume)
+    if contact:
+        out.append(f"<p class=\"contact\">{escape(' • '.join(contact))}</p>")
+
+    if resume.get("professional_summary"):
+        out.append(f"<h2>PROFESSIONAL SUMMARY</h2><p>{escape(resume['professional_summary'])}</p>")
+
+    if resume.get("core_competencies"):
+        out.append("<h2>CORE COMPETENCIES</h2>")
+        for category, skills in resume["core_competencies"].items():
+            out.append(f"<p class=\"indent\"><b>{escape(category)}:</b> {escape(' | '.join(skills))}</p>")
+
+    if resume.get("experience"):
+        out.append("<h2>PROFESSIONAL EXPERIENCE</h2>")
+        for exp in resume["experience"]:
+            out.append(f"<h3>{escape(exp.get('company', ''))} • {escape(exp.get('location', ''))}</h3>")
+            out.append(
+                f"<p><b>{escape(exp.get('title', ''))} | "
+                f"{escape(exp.get('start_date', ''))} - {escape(exp.get('end_date', ''))}</b></p>"
+            )
+            if exp.get("bullets"):
+                out.append("<ul class=\"indent\">")
+                out.extend(f"<li>{escape(bullet)}</li>" for bullet in exp["bullets"])
+                out.append("</ul>")
+
+    if resume.get("education"):
+        out.append("<h2>EDUCATION</h2>")
+        for edu in resume["education"]:
+            out.append(f"<h3>{escape(_degree(edu))}</h3><p>{escape(_school(edu))}</p>")
+            if edu.get("coursework"):
+                out.append(f"<p class=\"indent\">Relevant Coursework: {escape(', '.join(edu['coursework']))}</p>")
+
+    if resume.get("certifications"):
+        out.append("<h2>CERTIFICATIONS</h2><ul class=\"indent\">")
+        out.extend(f"<li>{escape(cert)}</li>" for cert in resume["certifications"])
+        out.append("</ul>")
+
+    out.append("</body></html>")
+    return "".join(out)
+
+
+def render_text(resume: Dict[str, Any]) -> str:
+    """The structured resume as plain text, in the same section order as the DOCX."""
+    out = [resume.get("name", "Candidate Name")]
+    contact = _contact_parts(resume)
+    if contact:
+        out.append(" • ".join(contact))
+
+    if resume.get("professional_summary"):
+        out += ["", "PROFESSIONAL SUMMARY", resume["professional_summary"]]
+
+    if resume.get("core_competencies"):
+        out += ["", "CORE COMPETENCIES"]
+        out += [f"  {category}: {' | '.join(skills)}" for category, skills in resume["core_competencies"].items()]
+
+    if resume.get("experience"):
+        out += ["", "PROFESSIONAL EXPERIENCE"]
+        for exp in resume["experience"]:
+            out.append(f"{exp.get('company', '')} • {exp.get('location', '')}")
+            out.append(f"{exp.get('title', '')} | {exp.get('start_date', '')} - {exp.get('end_date', '')}")
+            out += [f"  • {bullet}" for bullet in exp.get("bullets", [])]
+            out.append("")
+        out.pop()
+
+    if resume.get("education"):
+        out += ["", "EDUCATION"]
+        for edu in resume["education"]:
+            out += [_degree(edu), _school(edu)]
+            if edu.get("coursework"):
+                out.append(f"  Relevant Coursework: {', '.join(edu['coursework'])}")
+
+    if resume.get("certifications"):
+        out += ["", "CERTIFICATIONS"]
+        out += [f"  • {cert}" for cert in resume["certifications"]]
+
+    return "\n".join(out) + "\n"
+
+
+# format -> (file extension, media type, renderer)
+PREVIEW_FORMATS: Dict[str, Tuple[str, str, Callable[[Dict[str, Any]], str]]] = {
+    "html": ("html", "text/html; charset=utf-8", render_html),
+    "text": ("txt", "text/plain; charset=utf-8", render_text),
+}
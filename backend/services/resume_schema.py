@@ -0,0 +1,316 @@
+import itertools
+import json
+import re
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+
+from pydantic import AfterValidator, BaseModel, BeforeValidator, ConfigDict, TypeAdapter, ValidationError, model_validator
+
+
+# --- JSON repair ---------------------------------------------------------------
+
+# Cutting back past the last complete value nearly always parses at once; more tries means the text is not JSON
+_MAX_REPAIR_ATTEMPTS = 20
+
+# Output ending in a bare number, e.g. `"gpa": 3.` or `[1, 2`
+_TRAILING_NUMBER = re.compile(r"[:\[,]\s*[-+.\deE]+$")
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """
+    Parse the first JSON object in `text`, tolerating what LLMs commonly get
+    wrong: code fences, trailing commas, text after the object and output cut
+    off mid-object. A truncated object is cut back to its last complete value
+    and closed, so the partial value is dropped rather than kept half-written.
+    An object inside a list (an experience or education entry) is only ever
+    kept whole: one cut off anywhere inside is dropped. Returns None when
+    nothing usable is left.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    out: List[str] = []
+    stack: List[str] = []
+    # (length of out, open containers) at each point where the object could be closed
+    cut_points: List[Tuple[int, Tuple[str, ...]]] = []
+    # Depth of the list entry being read, while inside one; no cut points are recorded within it
+    entry_depth: Optional[int] = None
+    in_string = escaped = False
+    # Anything before the first "{" or after the object closes (code fences, prose) is ignored
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            in_list = bool(stack) and stack[-1] == "]"
+            if char == "{" and in_list and entry_depth is None:
+                entry_depth = len(stack)
+            stack.append("}" if char == "{" else "]")
+            out.append(char)
+            # Inside a list the cut before the entry (after "[" or ",") is already recorded
+            if not in_list and entry_depth is None:
+                cut_points.append((len(out), tuple(stack)))
+            continue
+        elif char in "}]":
+            # Trailing comma before a closing bracket
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break
+            if entry_depth == len(stack):
+                # The entry is complete
+                entry_depth = None
+                cut_points.append((len(out), tuple(stack)))
+            continue
+        elif char == "," and entry_depth is None:
+            cut_points.append((len(out), tuple(stack)))
+        out.append(char)
+
+    # Closing as is only keeps values that are known to be complete: not a half-read
+    # list entry, string or number (a number cut off after "12" still parses)
+    close_as_is = not in_string and entry_depth is None and not _TRAILING_NUMBER.search("".join(out[-64:]))
+    candidates = _closing_candidates(out, stack, cut_points, close_as_is)
+    for candidate in itertools.islice(candidates, _MAX_REPAIR_ATTEMPTS):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def _closing_candidates(out: List[str], stack: List[str], cut_points, close_as_is: bool):
+    """Texts to try parsing, most complete first; built lazily since usually the first one parses."""
+    if not stack:
+        yield "".join(out)
+        return
+    if close_as_is:
+        yield "".join(out) + "".join(reversed(stack))
+    for length, open_containers in reversed(cut_points):
+        yield "".join(out[:length]).rstrip(" \t\r\n,") + "".join(reversed(open_containers))
+
+
+# --- Coercion ------------------------------------------------------------------
+
+_LIST_ITEM = re.compile(r"^\s*(?:[-*•·]|\d+[.)])\s+")
+
+
+def _as_text(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, list) and all(isinstance(v, (str, int, float)) for v in value):
+        return ", ".join(str(v) for v in value)
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def _split_items(text: str) -> List[str]:
+    """Split a string the model should have sent as a list: lines, then |, ; or •, then commas."""
+    for separator in ("\n", "|", ";", "•"):
+        if separator in text:
+            parts = text.split(separator)
+            break
+    else:
+        parts = text.split(",")
+    return [_LIST_ITEM.sub("", part).strip() for part in parts if part.strip()]
+
+
+def _as_list(value: Any) -> Any:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return _split_items(value)
+    if isinstance(value, list):
+        return [item for item in value if item not in (None, "")]
+    return value
+
+
+def _as_competencies(value: Any) -> Any:
+    if value is None:
+        return {}
+    if isinstance(value, (str, list)):
+        return {"Skills": value}
+    return value
+
+
+def _as_entries(value: Any) -> Any:
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        return [value]
+    return value
+
+
+Text = Annotated[str, BeforeValidator(_as_text)]
+TextList = Annotated[List[Text], BeforeValidator(_as_list)]
+
+
+class _Section(BaseModel):
+    # Keys outside the schema are kept as sent; only the known fields are checked and coerced
+    model_config = ConfigDict(extra="allow")
+
+
+class Contact(_Section):
+    email: Text = ""
+    phone: Text = ""
+    location: Text = ""
+    linkedin: Text = ""
+
+
+class ExperienceEntry(_Section):
+    company: Text = ""
+    location: Text = ""
+    title: Text = ""
+    start_date: Text = ""
+    end_date: Text = ""
+    bullets: TextList = []
+
+    @model_validator(mode="after")
+    def _identified(self):
+        if not self.company and not self.title:
+            raise ValueError("experience entry has neither company nor title")
+        return self
+
+
+class EducationEntry(_Section):
+    degree: Text = ""
+    field: Text = ""
+    university: Text = ""
+    location: Text = ""
+    graduation_date: Text = ""
+    gpa: Text = ""
+    coursework: TextList = []
+
+    @model_validator(mode="after")
+    def _identified(self):
+        if not self.degree and not self.university:
+            raise ValueError("education entry has neither degree nor university")
+        return self
+
+
+class Analysis(_Section):
+    job_keywords: TextList = []
+    required_qualifications: TextList = []
+    preferred_qualifications: TextList = []
+    candidate_strengths: TextList = []
+    gaps: TextList = []
+    tailoring_strategy: Text = ""
+
+
+def _non_empty(value: str) -> str:
+    if not value:
+        raise ValueError("must not be empty")
+    return value
+
+
+# Validators compiled once; "analysis" is top-level, every other section lives under "resume"
+SECTION_SCHEMAS: Dict[str, TypeAdapter] = {
+    "analysis": TypeAdapter(Analysis),
+    "name": TypeAdapter(Annotated[Text, AfterValidator(_non_empty)]),
+    "contact": TypeAdapter(Contact),
+    "professional_summary": TypeAdapter(Text),
+    "core_competencies": TypeAdapter(Annotated[Dict[str, TextList], BeforeValidator(_as_competencies)]),
+    "experience": TypeAdapter(Annotated[List[ExperienceEntry], BeforeValidator(_as_entries)]),
+    "education": TypeAdapter(Annotated[List[EducationEntry], BeforeValidator(_as_entries)]),
+    "certifications": TypeAdapter(TextList),
+    "skills": TypeAdapter(TextList),
+}
+
+# Sections an output is broken without; the rest default to empty when the model leaves them out
+REQUIRED_SECTIONS = ("analysis", "name", "contact", "professional_summary", "core_competencies", "experience", "education")
+
+
+# Entry lists in which an entry that cannot be repaired is dropped instead of failing the section
+ENTRY_SCHEMAS: Dict[str, TypeAdapter] = {
+    "experience": TypeAdapter(ExperienceEntry),
+    "education": TypeAdapter(EducationEntry),
+}
+
+
+def _valid_entries(section: str, value: Any) -> Optional[List[Any]]:
+    """The entries of a list section that validate on their own, or None if there are none."""
+    schema = ENTRY_SCHEMAS.get(section)
+    if schema is None or not isinstance(value, list):
+        return None
+    entries = []
+    for entry in value:
+        try:
+            entries.append(schema.validate_python(entry))
+        except ValidationError:
+            continue
+    return entries or None
+
+
+def _section_value(data: Dict[str, Any], section: str) -> Any:
+    if section == "analysis":
+        return data.get("analysis")
+    resume = data.get("resume")
+    return resume.get(section) if isinstance(resume, dict) else None
+
+
+def validate_output(data: Any) -> Tuple[Dict[str, Any], List[str], bool]:
+    """
+    Validate and coerce a parsed {"analysis", "resume"} object section by section.
+
+    Returns the normalized object with the broken sections left out, the names
+    of the sections local repair could not fix, and whether coercion changed
+    anything.
+    """
+    if not isinstance(data, dict):
+        data = {}
+    normalized: Dict[str, Any] = {"analysis": {}, "resume": {}}
+    broken: List[str] = []
+    coerced = False
+    for section, schema in SECTION_SCHEMAS.items():
+        value = _section_value(data, section)
+        if value is None and section not in REQUIRED_SECTIONS:
+            value = []
+        if value is None:
+            broken.append(section)
+            continue
+        try:
+            validated = schema.validate_python(value)
+        except ValidationError:
+            validated = _valid_entries(section, value)
+            if validated is None:
+                broken.append(section)
+                continue
+            # Some entries were dropped
+            coerced = True
+        clean = schema.dump_python(validated)
+        # Defaults filled in for absent fields do not count as a repair
+        coerced = coerced or schema.dump_python(validated, exclude_unset=True) != value
+        if section == "analysis":
+            normalized["analysis"] = clean
+        else:
+            normalized["resume"][section] = clean
+    return normalized, broken, coerced
+
+
+def merge_sections(normalized: Dict[str, Any], sections: Dict[str, Any]) -> Dict[str, Any]:
+    """Put re-generated section values (keyed by section name) into a normalized object."""
+    merged = {"analysis": normalized.get("analysis", {}), "resume": dict(normalized.get("resume", {}))}
+    if isinstance(sections.get("resume"), dict):
+        # The model wrapped the sections in the full structure anyway
+        sections = {**sections["resume"], **{k: v for k, v in sections.items() if k != "resume"}}
+    for section, value in sections.items():
+        if section == "analysis":
+            merged["analysis"] = value
+        elif section in SECTION_SCHEMAS:
+            merged["resume"][section] = value
+    return merged
@@ -0,0 +1,79 @@
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from services.metrics import STARTUP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """
+    Cold-start timeline measured from when server.py started importing.
+
+    Phases: "imports" (module imports done), "warmup" (warm-up finished),
+    "ready" (lifespan startup complete) and "first_success" (first 2xx/3xx
+    response sent). Each is logged once and exported as resume_startup_seconds.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.warmup_steps: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        if phase in self.phases:
+            return
+        elapsed = time.perf_counter() - self.started_at
+        self.phases[phase] = elapsed
+        STARTUP_SECONDS.set(elapsed, phase=phase)
+        logger.info(f"Startup phase '{phase}' reached after {elapsed * 1000:.0f} ms")
+
+    @property
+    def ready(self) -> bool:
+        return "ready" in self.phases
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "phases_ms": {name: round(s * 1000, 1) for name, s in self.phases.items()},
+            "warmup_steps_ms": {name: round(s * 1000, 1) for name, s in self.warmup_steps.items()},
+        }
+
+    async def run_warmup(self, steps: Dict[str, Callable[[], Awaitable[Any]]]) -> None:
+        """Run warm-up steps in order; a failing step is logged and skipped, never fatal."""
+        for name, step in steps.items():
+            started = time.perf_counter()
+            try:
+                result = await step()
+            except Exception as e:
+                logger.warning(f"Warm-up step '{name}' failed: {e}")
+                continue
+            self.warmup_steps[name] = time.perf_counter() - started
+            # A step may report its own breakdown as {sub_step: seconds}
+            if isinstance(result, dict):
+                for sub_name, seconds in result.items():
+                    self.warmup_steps[f"{name}.{sub_name}"] = seconds
+        self.mark("warmup")
+
+
+startup_timer = StartupTimer()
+
+
+class FirstSuccessMiddleware:
+    """Records the first successful response; a single flag check per request afterwards."""
+
+    def __init__(self, app, timer: StartupTimer = startup_timer):
+        self.app = app
+        self.timer = timer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "first_success" in self.timer.phases:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                self.timer.mark("first_success")
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
@@ -0,0 +1,348 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import settings
+from repositories.application_repo import ApplicationRepository
+from repositories.storage_repo import StorageRepository
+from services.metrics import STORAGE_BYTES, STORAGE_FILES_REMOVED, STORAGE_RECLAIMED_BYTES
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "storage_gc"
+# A worker that dies mid-pass gives the lease up after this long
+LEASE_SECONDS = 600
+# The first pass runs soon after startup so usage (and with it the quotas) is known early
+FIRST_PASS_DELAY_SECONDS = 30
+# Files are written before the row that references them; younger ones are never treated as unreferenced
+MIN_AGE_SECONDS = 600
+# Quota eviction frees down to this share of the quota so the next writes do not trigger it again
+QUOTA_LOW_WATERMARK = 0.9
+# Applications read per query while evicting generated resumes for the quota
+EVICTION_PAGE_SIZE = 100
+MB = 1024 * 1024
+
+
+@dataclass
+class _Entry:
+    path: str
+    size: int
+    mtime: float
+
+    @property
+    def stem(self) -> str:
+        return Path(self.path).stem
+
+
+@dataclass
+class StorageReport:
+    """Outcome of one lifecycle pass."""
+    started_at: str
+    duration_ms: int = 0
+    # kind -> reason -> files removed / bytes reclaimed
+    files_removed: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    reclaimed_bytes: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    # kind -> {"bytes", "files"} left after the pass
+    usage: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    orphaned_resume_rows: int = 0
+    skipped: List[str] = field(default_factory=list)
+
+    def record(self, kind: str, reason: str, files: int, freed: int) -> None:
+        removed = self.files_removed.setdefault(kind, {})
+        removed[reason] = removed.get(reason, 0) + files
+        reclaimed = self.reclaimed_bytes.setdefault(kind, {})
+        reclaimed[reason] = reclaimed.get(reason, 0) + freed
+
+    @property
+    def total_reclaimed(self) -> int:
+        return sum(sum(by_reason.values()) for by_reason in self.reclaimed_bytes.values())
+
+
+def _directories() -> Dict[str, Path]:
+    return {"uploads": settings.UPLOAD_DIR, "generated": settings.GENERATED_DIR}
+
+
+def _kind_of(path: str) -> Optional[str]:
+    """Which managed directory a file lives in; None for anything else, which is never removed."""
+    parent = Path(path).parent
+    for kind, directory in _directories().items():
+        if parent == directory:
+            return kind
+    return None
+
+
+def _quota(kind: str) -> int:
+    mb = settings.STORAGE_UPLOADS_QUOTA_MB if kind == "uploads" else settings.STORAGE_GENERATED_QUOTA_MB
+    return int(mb * MB)
+
+
+def _scan(directory: Path, batch_size: int) -> Iterator[List[_Entry]]:
+    """Regular files of `directory` in batches, from a single scandir walk."""
+    try:
+        with os.scandir(directory) as entries:
+            batch: List[_Entry] = []
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                batch.append(_Entry(entry.path, stat.st_size, stat.st_mtime))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+    except FileNotFoundError:
+        return
+
+
+def _remove(paths: Iterable[str]) -> Tuple[int, int]:
+    """Unlink files, skipping ones already gone. Returns (files removed, bytes freed)."""
+    files = freed = 0
+    for path in paths:
+        try:
+            size = os.stat(path).st_size
+            os.unlink(path)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+            continue
+        files += 1
+        freed += size
+    return files, freed
+
+
+class StorageLifecycle:
+    """
+    Keeps uploads/ and generated/ in step with the database.
+
+    Deleting an application removes the files only it referenced straight away.
+    A periodic pass then reconciles the directories with the database in
+    batches of STORAGE_GC_BATCH_SIZE entries, one indexed lookup per batch:
+    unattached uploads past their retention, generated files no application
+    owns, and generated resumes past theirs are removed, and then the oldest
+    files go until each directory is back under its quota. Only the worker
+    holding the maintenance lease runs a pass; the others pick up its measured
+    usage, which uploads are checked against.
+    """
+
+    def __init__(self):
+        self.usage: Dict[str, Dict[str, int]] = {}
+        self.last_report: Optional[StorageReport] = None
+        self._lock = asyncio.Lock()
+
+    def has_room(self, kind: str, size: int) -> bool:
+        """Whether `size` more bytes fit the kind's quota, going by the last measured usage."""
+        quota = _quota(kind)
+        totals = self.usage.get(kind)
+        return not quota or totals is None or totals["bytes"] + size <= quota
+
+    def record_write(self, kind: str, size: int) -> None:
+        totals = self.usage.get(kind)
+        if totals is not None:
+            totals["bytes"] += size
+            totals["files"] += 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "usage": self.usage,
+            "quotas": {kind: _quota(kind) or None for kind in _directories()},
+            "last_report": asdict(self.last_report) if self.last_report else None,
+        }
+
+    async def remove_files(self, paths: Iterable[str], reason: str = "deleted") -> int:
+        """Remove files the database no longer references. Returns the bytes freed."""
+        by_kind: Dict[str, List[str]] = {}
+        for path in paths:
+            kind = _kind_of(path)
+            if kind:
+                by_kind.setdefault(kind, []).append(path)
+        freed = 0
+        for kind, kind_paths in by_kind.items():
+            freed += (await self._remove(kind, kind_paths, reason))[1]
+        return freed
+
+    async def run(self) -> None:
+        """Background task: a pass every STORAGE_GC_INTERVAL_SECONDS."""
+        delay = min(FIRST_PASS_DELAY_SECONDS, settings.STORAGE_GC_INTERVAL_SECONDS)
+        while True:
+            await asyncio.sleep(delay)
+            delay = settings.STORAGE_GC_INTERVAL_SECONDS
+            try:
+                if await self.collect() is None:
+                    # Another worker ran the pass; take over its measurements
+                    self.usage = await StorageRepository.load_usage()
+            except Exception as e:
+                logger.warning(f"Storage lifecycle pass failed: {e}")
+
+    async def collect(self) -> Optional[StorageReport]:
+        """Run one pass now. Returns None when one is already running here or on another worker."""
+        if self._lock.locked():
+            return None
+        async with self._lock:
+            if not await StorageRepository.acquire_lease(LEASE_NAME, LEASE_SECONDS):
+                return None
+            try:
+                report = await self._collect()
+            finally:
+                await StorageRepository.release_lease(LEASE_NAME)
+        self.last_report = report
+        logger.info(
+            f"Storage lifecycle pass reclaimed {report.total_reclaimed / MB:.1f} MB in {report.duration_ms} ms "
+            f"(removed {report.files_removed}, usage {report.usage})"
+        )
+        return report
+
+    async def _collect(self) -> StorageReport:
+        started = time.perf_counter()
+        report = StorageReport(started_at=datetime.now(timezone.utc).isoformat())
+        report.orphaned_resume_rows = await StorageRepository.delete_orphaned_resumes()
+        report.usage = {
+            "uploads": await self._collect_uploads(report),
+            "generated": await self._collect_generated(report),
+        }
+        self.usage = {kind: dict(totals) for kind, totals in report.usage.items()}
+        await StorageRepository.save_usage(report.usage)
+        for kind, totals in report.usage.items():
+            STORAGE_BYTES.set(totals["bytes"], kind=kind)
+        report.duration_ms = int((time.perf_counter() - started) * 1000)
+        return report
+
+    async def _batches(self, directory: Path) -> AsyncIterator[List[_Entry]]:
+        """Directory entries a batch at a time; the walk runs off the event loop and pauses between batches."""
+        scanner = _scan(directory, settings.STORAGE_GC_BATCH_SIZE)
+        try:
+            while True:
+                batch = await asyncio.to_thread(next, scanner, None)
+                if batch is None:
+                    return
+                yield batch
+        finally:
+            scanner.close()
+
+    async def _remove(
+        self, kind: str, paths: List[str], reason: str, report: Optional[StorageReport] = None
+    ) -> Tuple[int, int]:
+        if not paths:
+            return 0, 0
+        files, freed = await asyncio.to_thread(_remove, paths)
+        if files:
+            STORAGE_FILES_REMOVED.inc(files, kind=kind, reason=reason)
+            STORAGE_RECLAIMED_BYTES.inc(freed, kind=kind, reason=reason)
+            totals = self.usage.get(kind)
+            if totals is not None:
+                totals["bytes"] = max(totals["bytes"] - freed, 0)
+                totals["files"] = max(totals["files"] - files, 0)
+        if report is not None:
+            report.record(kind, reason, files, freed)
+        return files, freed
+
+    async def _collect_uploads(self, report: StorageReport) -> Dict[str, int]:
+        retention = settings.STORAGE_UNATTACHED_RETENTION_HOURS * 3600
+        # Paths recorded under another directory cannot be matched against this one, and
+        # every attached resume would look unattached; leave uploads alone until that is fixed
+        foreign = await StorageRepository.foreign_resume_paths(str(settings.UPLOAD_DIR))
+        if foreign:
+            report.skipped.append(f"uploads: {foreign} resume rows point outside {settings.UPLOAD_DIR}")
+        totals = {"bytes": 0, "files": 0}
+        # Unattached but within retention: the first to go when over quota
+        evictable: List[_Entry] = []
+        now = time.time()
+        async for batch in self._batches(settings.UPLOAD_DIR):
+            referenced = await StorageRepository.referenced_uploads([entry.path for entry in batch])
+            expired = []
+            for entry in batch:
+                if not foreign and entry.path not in referenced and now - entry.mtime >= MIN_AGE_SECONDS:
+                    if retention and now - entry.mtime >= retention:
+                        expired.append(entry.path)
+                        continue
+                    evictable.append(entry)
+                totals["bytes"] += entry.size
+                totals["files"] += 1
+            await self._remove("uploads", expired, "unattached", report)
+
+        quota = _quota("uploads")
+        if quota and totals["bytes"] > quota:
+            excess = totals["bytes"] - int(quota * QUOTA_LOW_WATERMARK)
+            evict, planned = [], 0
+            for entry in sorted(evictable, key=lambda e: e.mtime):
+                if planned >= excess:
+                    break
+                evict.append(entry.path)
+                planned += entry.size
+            files, freed = await self._remove("uploads", evict, "quota", report)
+            totals["bytes"] -= freed
+            totals["files"] -= files
+            if totals["bytes"] > quota:
+                logger.warning(
+                    f"Uploads use {totals['bytes'] / MB:.1f} MB of a {quota / MB:.0f} MB quota after removing "
+                    "every unattached file; new uploads are refused until applications are deleted"
+                )
+        return totals
+
+    async def _collect_generated(self, report: StorageReport) -> Dict[str, int]:
+        retention = settings.STORAGE_GENERATED_RETENTION_DAYS * 86400
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=retention)).isoformat() if retention else None
+        totals = {"bytes": 0, "files": 0}
+        now = time.time()
+        async for batch in self._batches(settings.GENERATED_DIR):
+            # Generated files are named after their application
+            owners = await StorageRepository.generation_owners([entry.stem for entry in batch])
+            orphaned, expired = [], []
+            for entry in batch:
+                owner = owners.get(entry.stem)
+                current = owner is not None and owner['generated_resume_path'] == entry.path
+                if current and cutoff and owner['status'] != 'processing' and owner['updated_at'] < cutoff:
+                    expired.append((owner['id'], entry.path))
+                elif (
+                    not current and now - entry.mtime >= MIN_AGE_SECONDS
+                    and (owner is None or owner['status'] != 'processing')
+                ):
+                    orphaned.append(entry.path)
+                else:
+                    totals["bytes"] += entry.size
+                    totals["files"] += 1
+            await self._remove("generated", orphaned, "orphaned", report)
+            for application_id, path in expired:
+                # The row stops pointing at the file first, so a download never finds a dangling path
+                if await ApplicationRepository.release_generated(application_id, path):
+                    await self._remove("generated", [path], "expired", report)
+
+        quota = _quota("generated")
+        if quota and totals["bytes"] > quota:
+            files, freed = await self._evict_generated(totals["bytes"] - int(quota * QUOTA_LOW_WATERMARK), report)
+            totals["bytes"] -= freed
+            totals["files"] -= files
+        return totals
+
+    async def _evict_generated(self, excess: int, report: StorageReport) -> Tuple[int, int]:
+        """Remove the least recently updated generated resumes until `excess` bytes are freed."""
+        files = freed = 0
+        after = None
+        while freed < excess:
+            rows = await StorageRepository.oldest_generated(EVICTION_PAGE_SIZE, after)
+            if not rows:
+                break
+            after = (rows[-1]['updated_at'], rows[-1]['id'])
+            for row in rows:
+                if freed >= excess:
+                    break
+                path = row['generated_resume_path']
+                if row['status'] == 'processing' or _kind_of(path) != "generated":
+                    continue
+                if await ApplicationRepository.release_generated(row['id'], path):
+                    removed, size = await self._remove("generated", [path], "quota", report)
+                    files += removed
+                    freed += size
+        return files, freed
+
+
+storage_lifecycle = StorageLifecycle()
@@ -0,0 +1,146 @@
+"""
+Token counts and forecasts for pre-flight generation estimates.
+
+Prompts are counted locally with the tiktoken encoding closest to the model's
+tokenizer, or at about four characters per token where tiktoken (or its
+encoding file) is unavailable. Recent calls to the same model, as reported by
+the provider, correct that count and predict the output size and latency.
+"""
+import functools
+import logging
+from statistics import median
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import AIModelConfig
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4.0
+HEURISTIC_TOKENIZER = "chars/4"
+
+# Without any history: about the size of a fully filled-in resume JSON
+DEFAULT_OUTPUT_TOKENS = 2000
+
+# Provider counts rarely differ from the local encoding by more than this factor either way;
+# beyond it the history is more likely wrong than the tokenizer
+CALIBRATION_LIMITS = (0.5, 2.0)
+
+# Fewer samples (or all of the same length) give no usable slope for latency per output token
+MIN_FIT_SAMPLES = 5
+
+# Rough share of a file's bytes that parsing turns into text, for resumes not parsed yet;
+# typical one- or two-page resumes, where fonts and images take up most of a PDF
+TEXT_CHARS_PER_BYTE = {
+    "application/pdf": 0.05,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": 0.2,
+    "application/msword": 0.2,
+    "text/plain": 1.0,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(name: str):
+    """The tiktoken encoding, or None (remembered) when it cannot be loaded."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        # Not installed, or the encoding file cannot be downloaded on first use
+        logger.warning(f"Tokenizer {name} unavailable, counting {CHARS_PER_TOKEN:g} characters per token: {e}")
+        return None
+
+
+def count_tokens(text: str, encoding: str) -> Tuple[int, str]:
+    """Token count of `text` and the tokenizer that produced it. May load an encoding, so call it off the event loop."""
+    tokenizer = _encoding(encoding)
+    if tokenizer is None:
+        return round(len(text) / CHARS_PER_TOKEN), HEURISTIC_TOKENIZER
+    return len(tokenizer.encode(text, disallowed_special=())), f"tiktoken:{encoding}"
+
+
+def unparsed_text_chars(file_type: str, file_size: int, max_chars: int = 0) -> int:
+    """Expected text length of a file from its type and size (0 for types that are not parsed)."""
+    chars = round(file_size * TEXT_CHARS_PER_BYTE.get(file_type, 0.0))
+    return min(chars, max_chars) if max_chars else chars
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..1) of a non-empty sequence."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def _calibration(history: List[Dict[str, Any]]) -> float:
+    """Median ratio of provider-reported to locally counted prompt tokens."""
+    ratios = [
+        row['prompt_tokens'] / row['prompt_tokens_local']
+        for row in history
+        if row['token_source'] == "provider" and row['prompt_tokens_local'] > 0
+    ]
+    if not ratios:
+        return 1.0
+    low, high = CALIBRATION_LIMITS
+    return min(high, max(low, median(ratios)))
+
+
+def _latency_model(history: List[Dict[str, Any]]) -> Optional[Tuple[float, float]]:
+    """
+    (fixed ms, ms per output token) by least squares over the history, or a
+    median rate alone when there are too few distinct samples to fit.
+    """
+    samples = [(row['completion_tokens'], row['llm_ms']) for row in history if row['completion_tokens'] > 0]
+    if not samples:
+        return None
+    if len(samples) >= MIN_FIT_SAMPLES:
+        mean_x = sum(x for x, _ in samples) / len(samples)
+        mean_y = sum(y for _, y in samples) / len(samples)
+        variance = sum((x - mean_x) ** 2 for x, _ in samples)
+        if variance > 0:
+            slope = sum((x - mean_x) * (y - mean_y) for x, y in samples) / variance
+            intercept = mean_y - slope * mean_x
+            # A negative part means the samples are noise around a constant; fall through to the rate
+            if slope > 0 and intercept >= 0:
+                return intercept, slope
+    return 0.0, median(y / x for x, y in samples)
+
+
+def forecast(
+    model: AIModelConfig,
+    prompt_tokens_local: int,
+    history: List[Dict[str, Any]],
+    warn_prompt_tokens: int = 0
+) -> Dict[str, Any]:
+    """Predicted prompt tokens, output tokens and LLM latency for a prompt, from the model's recent calls."""
+    calibration = _calibration(history)
+    prompt_tokens = round(prompt_tokens_local * calibration)
+
+    completions = [row['completion_tokens'] for row in history if row['completion_tokens'] > 0]
+    if completions:
+        output = {"p50": round(_percentile(completions, 0.5)), "p90": round(_percentile(completions, 0.9))}
+    else:
+        output = {"p50": DEFAULT_OUTPUT_TOKENS, "p90": DEFAULT_OUTPUT_TOKENS}
+
+    latency = None
+    latency_model = _latency_model(history)
+    if latency_model is not None:
+        intercept, per_token = latency_model
+        latency = {key: round(intercept + per_token * tokens) for key, tokens in output.items()}
+
+    warnings = []
+    if not history:
+        warnings.append("No recorded generations for this model yet; output size is a default and latency is unknown")
+    if warn_prompt_tokens and prompt_tokens > warn_prompt_tokens:
+        warnings.append(f"Prompt of about {prompt_tokens} tokens exceeds the {warn_prompt_tokens}-token warning threshold")
+    if model.context_tokens and prompt_tokens + output["p90"] > model.context_tokens:
+        warnings.append(
+            f"Prompt plus expected output may not fit the model's {model.context_tokens}-token context window"
+        )
+
+    return {
+        "prompt_tokens": prompt_tokens,
+        "calibration": round(calibration, 3),
+        "output_tokens": output,
+        "latency_ms": latency,
+        "history_samples": len(history),
+        "warnings": warnings,
+    }
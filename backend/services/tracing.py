@@ -0,0 +1,357 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "resume-builder"
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+class Span:
+    """One timed operation; children inherit the trace ID of the span active when they start."""
+
+    __slots__ = (
+        "name", "kind", "trace_id", "span_id", "parent_span_id", "attributes",
+        "start_ns", "end_ns", "_start_perf", "status_code", "status_message",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional["Span"] = None,
+        trace_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else (trace_id or _new_id(16))
+        self.span_id = _new_id(8)
+        self.parent_span_id = parent.span_id if parent else parent_span_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        # Wall-clock start for export, monotonic clock for the duration
+        self.start_ns = time.time_ns()
+        self._start_perf = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.status_code = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"[:500]
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = self.start_ns + (time.perf_counter_ns() - self._start_perf)
+            exporter.add(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else self.start_ns + (time.perf_counter_ns() - self._start_perf)
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            data["parentSpanId"] = self.parent_span_id
+        return data
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """Time the block as a child of the current span (or as a new trace when there is none)."""
+    current = Span(name, parent=_current_span.get(), attributes=attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def traced(name: str, **attributes: Any):
+    """Decorator form of span() for sync and async functions."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SpanExporter:
+    """
+    Buffers finished spans and periodically writes them as OTLP/JSON
+    ExportTraceServiceRequest payloads, either appended to TRACE_FILE (one
+    payload per line) or POSTed to an OTLP/HTTP collector.
+
+    Spans may finish on worker threads, hence the lock. When the buffer is full
+    the oldest spans are dropped rather than growing without bound.
+    """
+
+    def __init__(self):
+        self._buffer: Deque[Span] = deque(maxlen=settings.TRACE_MAX_BUFFERED_SPANS)
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.TRACE_EXPORTER in ("file", "otlp")
+
+    def add(self, finished: Span) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(finished)
+
+    def _drain(self) -> List[Span]:
+        with self._lock:
+            spans = list(self._buffer)
+            self._buffer.clear()
+        return spans
+
+    @staticmethod
+    def _payload(spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                "scopeSpans": [{
+                    "scope": {"name": SERVICE_NAME},
+                    "spans": [s.to_otlp() for s in spans],
+                }],
+            }]
+        }
+
+    def _write_file(self, payload: Dict[str, Any]) -> None:
+        settings.TRACE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(settings.TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+    async def flush(self) -> int:
+        """Export everything buffered so far; returns the number of spans exported."""
+        spans = self._drain()
+        if not spans:
+            return 0
+        payload = self._payload(spans)
+        try:
+            if settings.TRACE_EXPORTER == "file":
+                await asyncio.to_thread(self._write_file, payload)
+            else:
+                if self._client is None:
+                    self._client = httpx.AsyncClient(timeout=10)
+                response = await self._client.post(
+                    settings.OTLP_ENDPOINT.rstrip("/") + "/v1/traces", json=payload
+                )
+                response.raise_for_status()
+        except Exception as e:
+            self.dropped += len(spans)
+            logger.warning(f"Failed to export {len(spans)} spans: {e}")
+            return 0
+        return len(spans)
+
+    async def run_periodic_flush(self) -> None:
+        """Background task exporting buffered spans every TRACE_FLUSH_INTERVAL_SECONDS."""
+        while True:
+            await asyncio.sleep(settings.TRACE_FLUSH_INTERVAL_SECONDS)
+            await self.flush()
+
+    async def shutdown(self) -> None:
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+exporter = SpanExporter()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple]:
+    """(trace_id, parent_span_id) from a W3C traceparent header, or None if absent or malformed."""
+    if not value:
+        return None
+    match = TRACEPARENT_RE.match(value.strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening the root span of every HTTP request.
+
+    An incoming W3C `traceparent` header continues the caller's trace; the
+    trace ID is returned in `X-Trace-Id` so clients can quote it when reporting
+    a slow or failed request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        upstream = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+        root = Span(
+            f"{scope['method']} {scope['path']}",
+            trace_id=upstream[0] if upstream else None,
+            parent_span_id=upstream[1] if upstream else None,
+            kind=SPAN_KIND_SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        token = _current_span.set(root)
+
+        async def send_with_trace_id(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    root.status_code = STATUS_ERROR
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"x-trace-id", root.trace_id.encode())],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        except BaseException as e:
+            root.record_error(e)
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                root.name = f"{scope['method']} {route.path}"
+                root.set_attribute("http.route", route.path)
+            _current_span.reset(token)
+            root.end()
+
+
+class TraceContextFilter(logging.Filter):
+    """Stamps every log record with the active trace and span IDs (empty outside a trace)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = _current_span.get()
+        record.trace_id = current.trace_id if current else ""
+        record.span_id = current.span_id if current else ""
+        return True
+
+
+# LogRecord attributes that are not user-supplied `extra=` fields
+_STANDARD_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "trace_id", "span_id", "taskName",
+}
+
+
+class JsonLogFormatter(logging.Formatter):
+    """One JSON object per line with timestamp, level, logger, message, trace/span IDs and any extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "trace_id", ""):
+            entry["trace_id"] = record.trace_id
+            entry["span_id"] = record.span_id
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Root logging setup: JSON lines (LOG_FORMAT=json) or plain text, both carrying the trace ID."""
+    handler = logging.StreamHandler()
+    handler.addFilter(TraceContextFilter())
+    if settings.LOG_FORMAT == "json":
+        handler.setFormatter(JsonLogFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s'
+        ))
+    logging.basicConfig(level=level, handlers=[handler], force=True)
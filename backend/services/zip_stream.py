@@ -0,0 +1,62 @@
+import logging
+import zipfile
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+
+import aiofiles
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class _Sink:
+    """
+    Write-only target for ZipFile. It has no tell()/seek(), so ZipFile writes
+    data descriptors instead of going back to patch headers, and every byte
+    written can be sent on straight away.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_zip(files: Sequence[Tuple[str, Path]], notes: Optional[Tuple[str, str]] = None) -> AsyncIterator[bytes]:
+    """
+    Yield a ZIP archive of `files` ((name in archive, path on disk)) as it is
+    built, holding at most one read chunk in memory. Entries are stored
+    uncompressed; DOCX files are compressed already. Files that disappeared
+    since the caller checked them are left out; `notes` ((name, text)) adds a
+    text entry at the end.
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for name, path in files:
+            try:
+                source = await aiofiles.open(path, "rb")
+            except FileNotFoundError:
+                logger.warning(f"Skipping {path} in ZIP download: file no longer exists")
+                continue
+            try:
+                with archive.open(name, "w") as entry:
+                    while chunk := await source.read(READ_CHUNK_BYTES):
+                        entry.write(chunk)
+                        yield sink.drain()
+            finally:
+                await source.close()
+            yield sink.drain()
+        if notes:
+            archive.writestr(*notes)
+    yield sink.drain()
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from config import settings  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the database and file directories at a fresh temporary directory."""
+    monkeypatch.setattr(settings, "DB_PATH", tmp_path / "test.db")
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(settings, "GENERATED_DIR", tmp_path / "generated")
+    settings.UPLOAD_DIR.mkdir()
+    settings.GENERATED_DIR.mkdir()
+
+    from repositories.application_repo import ApplicationRepository
+    ApplicationRepository._cache.clear()
+    yield tmp_path
+    ApplicationRepository._cache.clear()
+
+
+@pytest.fixture
+async def db(data_dir):
+    """A migrated, empty database."""
+    from database import init_database
+    await init_database()
+    return settings.DB_PATH
@@ -0,0 +1,108 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from services import admission
+from services.admission import AdmissionLimiter, AdmissionMiddleware, Overloaded
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_full_queue_is_rejected_at_once():
+    limiter = AdmissionLimiter("test", max_in_flight=1, max_queue=0, max_wait=10)
+    await limiter.acquire()
+
+    with pytest.raises(Overloaded) as excinfo:
+        await asyncio.wait_for(limiter.acquire(), 0.5)
+    assert excinfo.value.reason == "queue_full"
+    assert excinfo.value.retry_after >= 1
+    assert limiter.rejected == 1
+
+
+async def test_queued_request_times_out():
+    limiter = AdmissionLimiter("test", max_in_flight=1, max_queue=1, max_wait=0.05)
+    await limiter.acquire()
+
+    with pytest.raises(Overloaded) as excinfo:
+        await limiter.acquire()
+    assert excinfo.value.reason == "queue_timeout"
+    assert limiter.queued == 0
+    assert limiter.in_flight == 1
+
+
+async def test_released_slot_goes_to_oldest_waiter():
+    limiter = AdmissionLimiter("test", max_in_flight=1, max_queue=2, max_wait=5)
+    await limiter.acquire()
+    order = []
+
+    async def wait(name):
+        await limiter.acquire()
+        order.append(name)
+
+    first = asyncio.create_task(wait("first"))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(wait("second"))
+    await asyncio.sleep(0)
+    assert limiter.queued == 2
+
+    limiter.release(0.1)
+    await first
+    assert order == ["first"]
+    assert limiter.in_flight == 1
+
+    limiter.release(0.1)
+    await second
+    limiter.release(0.1)
+    assert order == ["first", "second"]
+    assert limiter.in_flight == 0
+
+
+async def test_cancelled_waiter_does_not_leak_its_slot():
+    limiter = AdmissionLimiter("test", max_in_flight=1, max_queue=1, max_wait=5)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    limiter.release()
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+async def test_middleware_answers_503_with_retry_after(monkeypatch):
+    limiter = AdmissionLimiter("generate", max_in_flight=1, max_queue=0, max_wait=1)
+    monkeypatch.setitem(admission.limiters, "generate", limiter)
+    started, finish = asyncio.Event(), asyncio.Event()
+
+    async def generate(request):
+        started.set()
+        await finish.wait()
+        return PlainTextResponse("done")
+
+    async def read(request):
+        return PlainTextResponse("ok")
+
+    app = AdmissionMiddleware(Starlette(routes=[
+        Route("/api/applications/{id}/generate", generate, methods=["POST"]),
+        Route("/api/applications/{id}", read),
+    ]))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        running = asyncio.create_task(client.post("/api/applications/a/generate"))
+        await started.wait()
+
+        rejected = await client.post("/api/applications/b/generate")
+        assert rejected.status_code == 503
+        assert int(rejected.headers["Retry-After"]) >= 1
+
+        # Reads are never admission controlled
+        assert (await client.get("/api/applications/a")).status_code == 200
+
+        finish.set()
+        assert (await running).status_code == 200
+    assert limiter.in_flight == 0
@@ -0,0 +1,41 @@
+import io
+import zipfile
+
+import pytest
+
+from config import settings
+from services import bulk_import
+from services.storage_lifecycle import MB, storage_lifecycle
+
+
+def _archive(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def uploads_quota(data_dir, monkeypatch):
+    """A 1MB uploads quota with 0.5MB of it already used."""
+    monkeypatch.setattr(settings, "STORAGE_UPLOADS_QUOTA_MB", 1)
+    monkeypatch.setattr(storage_lifecycle, "usage", {"uploads": {"bytes": MB // 2, "files": 1}})
+
+
+def test_import_past_the_quota_is_rejected_and_cleaned_up(uploads_quota):
+    # Each file fits on its own; together they do not
+    archive = _archive({f"Acme - Engineer/resume{i}.txt": b"x" * (MB // 5) for i in range(3)})
+
+    with pytest.raises(bulk_import.ImportOverQuota):
+        bulk_import.prepare([("import.zip", archive)])
+    assert list(settings.UPLOAD_DIR.iterdir()) == []
+
+
+def test_import_within_the_quota_is_extracted(uploads_quota):
+    archive = _archive({"Acme - Engineer/job.txt": b"Build things", "Acme - Engineer/resume.txt": b"x" * (MB // 5)})
+
+    plan = bulk_import.prepare([("import.zip", archive)])
+    assert [app.folder for app in plan.applications] == ["Acme - Engineer"]
+    assert len(list(settings.UPLOAD_DIR.iterdir())) == 2
@@ -0,0 +1,130 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from benchmarks import fixtures
+from config import settings
+from models import JobApplication, ResumeFile
+from repositories.application_repo import ApplicationRepository
+from repositories.checkpoint_repo import CheckpointRepository
+
+pytestmark = pytest.mark.anyio
+
+RESPONSE = json.dumps(fixtures.make_resume_data(2, 3))
+
+
+class FakeLLM:
+    """Stands in for llm_service.complete, counting calls."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    async def __call__(self, prompt, model_id, session_id, kind="single"):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+async def application(db):
+    resume_path = settings.UPLOAD_DIR / "resume.txt"
+    resume_path.write_text("Jane Candidate\nSenior engineer, Python and Kubernetes.\n")
+    app = JobApplication(
+        job_title="Platform Engineer", company="Acme", job_description="Run our clusters", ai_model="sonar-pro"
+    )
+    await ApplicationRepository.create(app)
+    await ApplicationRepository.add_resume(app.id, ResumeFile(
+        file_path=str(resume_path), file_name="resume.txt", file_type="text/plain",
+        file_size=resume_path.stat().st_size
+    ))
+    return await ApplicationRepository.claim_generation(app.id)
+
+
+def _counting_parser(monkeypatch):
+    calls = []
+    parse = server._parse_base_resumes
+
+    async def counted(app):
+        calls.append(app['id'])
+        return await parse(app)
+    monkeypatch.setattr(server, "_parse_base_resumes", counted)
+    return calls
+
+
+def _fail_render_once(monkeypatch):
+    generate_docx = server.resume_generator.generate_docx
+
+    def fail_once(data, path):
+        monkeypatch.setattr(server.resume_generator, "generate_docx", generate_docx)
+        raise OSError("disk full")
+    monkeypatch.setattr(server.resume_generator, "generate_docx", fail_once)
+
+
+async def test_retry_after_llm_failure_reuses_parsed_resumes(application, monkeypatch):
+    parses = _counting_parser(monkeypatch)
+    llm = FakeLLM(RuntimeError("provider down"), RESPONSE)
+    monkeypatch.setattr(server.llm_service, "complete", llm)
+
+    with pytest.raises(RuntimeError):
+        await server._run_generation(application, 0.0)
+    stages = set(await CheckpointRepository.load(application['id']))
+    assert stages == {"parsed", "prompt"}
+
+    result = await server._run_generation(application, 0.0)
+    assert result["success"]
+    assert parses == [application['id']]
+    assert llm.calls == 2
+    assert await CheckpointRepository.load(application['id']) == {}
+
+
+async def test_retry_after_render_failure_skips_the_llm_call(application, monkeypatch):
+    llm = FakeLLM(RESPONSE)
+    monkeypatch.setattr(server.llm_service, "complete", llm)
+    _fail_render_once(monkeypatch)
+
+    with pytest.raises(HTTPException):
+        await server._run_generation(application, 0.0)
+    assert {"llm_response", "structured"} <= set(await CheckpointRepository.load(application['id']))
+
+    parses = _counting_parser(monkeypatch)
+    await server._run_generation(application, 0.0)
+    assert llm.calls == 1
+    assert parses == []
+
+    app = await ApplicationRepository.get_by_id(application['id'])
+    assert app['status'] == "completed"
+    assert app['generated_resume_path'] and (settings.GENERATED_DIR / f"{app['id']}.docx").exists()
+
+
+async def test_startup_finishes_interrupted_generation_from_checkpoints(application, monkeypatch):
+    llm = FakeLLM(RESPONSE)
+    monkeypatch.setattr(server.llm_service, "complete", llm)
+    _fail_render_once(monkeypatch)
+    with pytest.raises(HTTPException):
+        await server._run_generation(application, 0.0)
+
+    # As if the worker died: the row is still processing under a lease that has run out
+    expired = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+    await ApplicationRepository.update(application['id'], {"lease_owner": "gone", "lease_expires_at": expired})
+    await server._resume_interrupted_generations()
+
+    app = await ApplicationRepository.get_by_id(application['id'])
+    assert app['status'] == "completed"
+    assert llm.calls == 1
+
+
+async def test_startup_fails_interrupted_generation_without_llm_response(application):
+    expired = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()
+    await ApplicationRepository.update(application['id'], {"lease_owner": "gone", "lease_expires_at": expired})
+
+    await server._resume_interrupted_generations()
+
+    app = await ApplicationRepository.get_by_id(application['id'])
+    assert app['status'] == "failed"
+    assert app['lease_owner'] is None
@@ -0,0 +1,73 @@
+import sqlite3
+
+import httpx
+import orjson
+import pytest
+
+import server
+from config import settings
+from repositories.application_repo import ApplicationRepository
+
+pytestmark = pytest.mark.anyio
+
+# Several applications share a timestamp, so pages must break ties on id
+CREATED = ["2025-01-01T00:00:00+00:00"] * 3 + ["2025-01-02T00:00:00+00:00"] * 2 + ["2025-01-03T00:00:00+00:00"] * 2
+
+
+@pytest.fixture
+def applications(db):
+    conn = sqlite3.connect(settings.DB_PATH)
+    conn.executemany(
+        """
+        INSERT INTO applications (id, job_title, company, job_description, ai_model, status, created_at, updated_at)
+        VALUES (?, 'Engineer', 'Acme', 'Build things', 'sonar-pro', 'draft', ?, ?)
+        """,
+        [(f"app-{i}", created, created) for i, created in enumerate(CREATED)]
+    )
+    conn.executemany(
+        """
+        INSERT INTO base_resumes (application_id, file_path, file_name, file_type, file_size, uploaded_at)
+        VALUES (?, ?, ?, 'text/plain', 1, ?)
+        """,
+        [(f"app-{i}", f"/uploads/{i}.txt", f"{i}.txt", CREATED[i]) for i in (0, 4)]
+    )
+    conn.commit()
+    conn.close()
+    return sorted(((created, f"app-{i}") for i, created in enumerate(CREATED)), reverse=True)
+
+
+async def _export(page_size, after=None):
+    return [page async for page in ApplicationRepository.iter_export(page_size, after)]
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 7, 50])
+async def test_pages_cover_every_application_once_newest_first(applications, page_size):
+    pages = await _export(page_size)
+    rows = [row for page in pages for row in page]
+    assert [(row['created_at'], row['id']) for row in rows] == applications
+    assert all(len(page) == page_size for page in pages[:-1])
+
+
+async def test_resumes_are_attached_to_their_application(applications):
+    rows = {row['id']: row for page in await _export(3) for row in page}
+    assert [r['file_name'] for r in rows['app-0']['base_resumes']] == ["0.txt"]
+    assert [r['file_name'] for r in rows['app-4']['base_resumes']] == ["4.txt"]
+    assert rows['app-1']['base_resumes'] == []
+
+
+async def test_export_resumes_after_a_cursor_within_a_tie(applications):
+    cursor = applications[3]
+    rows = [row for page in await _export(2, cursor) for row in page]
+    assert [(row['created_at'], row['id']) for row in rows] == applications[4:]
+
+
+async def test_ndjson_endpoint_resumes_from_after(applications):
+    created_at, application_id = applications[1]
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/export.ndjson", params={"after": f"{created_at}|{application_id}"})
+        assert response.status_code == 200
+        lines = [orjson.loads(line) for line in response.text.splitlines() if line]
+        assert [line['id'] for line in lines] == [app_id for _, app_id in applications[2:]]
+
+        assert (await client.get("/api/export.ndjson", params={"after": "no-separator"})).status_code == 400
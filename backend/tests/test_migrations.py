@@ -0,0 +1,120 @@
+import json
+import sqlite3
+
+import pytest
+
+from config import settings
+from database import MIGRATIONS, connect, init_database, run_migrations
+from repositories.application_repo import ApplicationRepository
+
+pytestmark = pytest.mark.anyio
+
+# The schema before migrations existed, as the first release created it
+BASELINE_SCHEMA = """
+CREATE TABLE applications (
+    id TEXT PRIMARY KEY,
+    job_title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    job_description TEXT NOT NULL,
+    ai_model TEXT NOT NULL,
+    status TEXT DEFAULT 'pending',
+    generated_resume_path TEXT,
+    analysis TEXT,
+    formatting_preference TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE base_resumes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    application_id TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    uploaded_at TEXT NOT NULL,
+    FOREIGN KEY (application_id) REFERENCES applications (id) ON DELETE CASCADE
+);
+"""
+
+NOW = "2025-03-01T12:00:00+00:00"
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _seed_baseline(path) -> None:
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    analysis = json.dumps({"job_keywords": ["Kubernetes", "Terraform"], "gaps": ["Rust"]})
+    conn.executemany(
+        "INSERT INTO applications VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("app-1", "Platform Engineer", "Acme", "Run our clusters", "sonar-pro", "completed",
+             None, analysis, None, NOW, NOW),
+            ("app-2", "Data Engineer", "Globex", "Build pipelines", "sonar-pro", "draft",
+             None, None, None, NOW, NOW),
+        ]
+    )
+    conn.executemany(
+        "INSERT INTO base_resumes (application_id, file_path, file_name, file_type, file_size, uploaded_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            ("app-1", "/uploads/a.pdf", "a.pdf", "application/pdf", 10, NOW),
+            ("gone", "/uploads/orphan.pdf", "orphan.pdf", "application/pdf", 10, NOW),
+        ]
+    )
+    conn.commit()
+    conn.close()
+
+
+async def test_fresh_database_applies_every_migration(data_dir):
+    await init_database()
+
+    conn = sqlite3.connect(settings.DB_PATH)
+    versions = [row[0] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+    assert versions == [version for version, _, _ in MIGRATIONS]
+    assert versions == list(range(1, len(MIGRATIONS) + 1))
+    assert {"generation_ms", "lease_owner", "resume_data_sha256"} <= _columns(conn, "applications")
+    assert "prompt_tokens_local" in _columns(conn, "generation_stats")
+    conn.close()
+
+
+async def test_migrations_are_applied_once(data_dir):
+    await init_database()
+    async with connect() as db:
+        assert await run_migrations(db) == 0
+
+
+async def test_baseline_database_is_upgraded_in_place(data_dir):
+    _seed_baseline(settings.DB_PATH)
+
+    await init_database()
+
+    conn = sqlite3.connect(settings.DB_PATH)
+    assert conn.execute("SELECT COUNT(*) FROM applications").fetchone()[0] == 2
+    # Migration 3 removes resumes whose application is gone
+    assert [row[0] for row in conn.execute("SELECT file_name FROM base_resumes")] == ["a.pdf"]
+    # Migration 5 backfills the rollups from existing rows
+    keywords = dict(conn.execute("SELECT term, count FROM analytics_keywords"))
+    assert keywords == {"kubernetes": 1, "terraform": 1}
+    assert dict(conn.execute("SELECT term, count FROM analytics_gaps")) == {"rust": 1}
+    conn.close()
+
+    # Migration 4 indexes existing rows, analysis keywords included
+    found = await ApplicationRepository.search("terraform")
+    assert [result["id"] for result in found["results"]] == ["app-1"]
+
+    app = await ApplicationRepository.get_by_id("app-1")
+    assert app["company"] == "Acme"
+    assert [resume["file_name"] for resume in app["base_resumes"]] == ["a.pdf"]
+
+
+async def test_writes_bump_the_table_version(data_dir):
+    _seed_baseline(settings.DB_PATH)
+    await init_database()
+
+    # Migration 6 adds the counter behind the list ETag
+    before = await ApplicationRepository.get_version()
+    await ApplicationRepository.update("app-2", {"job_title": "Senior Data Engineer"})
+    assert await ApplicationRepository.get_version() > before
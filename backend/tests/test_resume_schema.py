@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from benchmarks import fixtures
+from services.resume_schema import repair_json, validate_output
+
+COMPLETE_ENTRY = '{"company": "Acme", "title": "Engineer", "end_date": "Present", "bullets": ["Shipped it"]}'
+
+
+def _resume_with_experience(experience_json: str) -> str:
+    """A full response whose text ends inside the experience list."""
+    data = fixtures.make_resume_data(1, 2)
+    data["resume"].pop("experience")
+    text = json.dumps(data)
+    return text[:-2] + f', "experience": [{experience_json}'
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', {"a": 1}),
+    ('```json\n{"a": [1, 2,],}\n```', {"a": [1, 2]}),
+    ('Here you go: {"a": "b"} Hope this helps!', {"a": "b"}),
+    ('{"a": "x", "b": "half a str', {"a": "x"}),
+    ('{"a": "x", "b": 12', {"a": "x"}),
+    ('{"a": 12', {}),
+    ('{"a": [1, 2', {"a": [1]}),
+    ('{"a": true', {"a": True}),
+    ('{"a": {"b": 1, "c": {"d"', {"a": {"b": 1, "c": {}}}),
+])
+def test_repair_json_shapes(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_repair_json_without_object():
+    assert repair_json("I'm sorry, I can't do that.") is None
+
+
+@pytest.mark.parametrize("tail", [
+    '{"company": "Glo',
+    '{"company": "Globex"',
+    '{"company": "Globex", "title": "Senior Eng", "start_date": "01/2020"',
+    '{"company": "Globex", "title": "Senior Eng", "bullets": ["Led migration of',
+    '{"company": "Globex", "title": "Senior Eng", "bullets": ["Led migration", "Cut costs"]',
+    '{"company": "Globex", "title": "Senior Eng", "years": 4',
+    '{',
+])
+def test_repair_json_drops_cut_off_list_entry(tail):
+    repaired = repair_json(f'{{"experience": [{COMPLETE_ENTRY}, {tail}')
+    assert repaired == {"experience": [json.loads(COMPLETE_ENTRY)]}
+
+
+def test_repair_json_keeps_entries_closed_before_the_cut():
+    repaired = repair_json(f'{{"experience": [{COMPLETE_ENTRY}, {COMPLETE_ENTRY},')
+    assert repaired == {"experience": [json.loads(COMPLETE_ENTRY)] * 2}
+
+
+def test_cut_off_entry_does_not_break_the_section():
+    repaired = repair_json(_resume_with_experience(
+        COMPLETE_ENTRY + ', {"company": "Globex", "title": "Senior Eng", "bullets": ["Led migration of'
+    ))
+    normalized, broken, _ = validate_output(repaired)
+    assert "experience" not in broken
+    assert [entry["company"] for entry in normalized["resume"]["experience"]] == ["Acme"]
+
+
+def test_validate_output_accepts_fixture_response():
+    normalized, broken, coerced = validate_output(fixtures.make_resume_data(3, 4))
+    assert broken == []
+    assert not coerced
+    assert len(normalized["resume"]["experience"]) == 3
+
+
+def test_validate_output_coerces_drifted_types():
+    data = fixtures.make_resume_data(1, 3)
+    resume = data["resume"]
+    resume["core_competencies"] = {"Languages": "Python, Go"}
+    resume["experience"][0]["bullets"] = "- One\n- Two"
+    resume["contact"]["phone"] = 5550100
+    normalized, broken, coerced = validate_output(data)
+    assert broken == []
+    assert coerced
+    assert normalized["resume"]["core_competencies"] == {"Languages": ["Python", "Go"]}
+    assert normalized["resume"]["experience"][0]["bullets"] == ["One", "Two"]
+    assert normalized["resume"]["contact"]["phone"] == "5550100"
+
+
+def test_validate_output_drops_unusable_entries_only():
+    data = fixtures.make_resume_data(2, 2)
+    data["resume"]["experience"].append({})
+    normalized, broken, coerced = validate_output(data)
+    assert broken == []
+    assert coerced
+    assert len(normalized["resume"]["experience"]) == 2
+
+
+def test_validate_output_reports_missing_required_sections():
+    data = fixtures.make_resume_data(1, 2)
+    del data["resume"]["education"]
+    data["resume"]["experience"] = [{}]
+    normalized, broken, _ = validate_output(data)
+    assert sorted(broken) == ["education", "experience"]
+    assert "experience" not in normalized["resume"]
@@ -0,0 +1,36 @@
+import httpx
+import pytest
+
+import server
+from models import JobApplication
+from repositories.application_repo import SNIPPET_CLOSE, SNIPPET_OPEN, ApplicationRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def application(db):
+    app = JobApplication(
+        job_title="Backend Engineer", company="Acme",
+        job_description="Wrap output in <mark>tags</mark>; we mostly write Python services.", ai_model="sonar-pro"
+    )
+    await ApplicationRepository.create(app)
+    return app
+
+
+async def test_snippet_marks_matches_with_sentinels_not_markup(application):
+    found = await ApplicationRepository.search("python")
+    snippet = found["results"][0]["snippet"]
+    assert f"{SNIPPET_OPEN}Python{SNIPPET_CLOSE}" in snippet
+    # Markup from the description comes through as plain text
+    assert "<mark>tags</mark>" in snippet
+
+
+async def test_search_timestamps_match_other_endpoints(application):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        found = (await client.get("/api/applications/search", params={"q": "python"})).json()
+        listed = (await client.get("/api/applications")).json()
+
+    assert found["total"] == 1
+    assert found["results"][0]["created_at"] == listed[0]["created_at"] == application.created_at.isoformat()
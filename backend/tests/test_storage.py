@@ -0,0 +1,50 @@
+import hashlib
+
+import httpx
+import pytest
+
+import server
+from config import settings
+from models import JobApplication
+from repositories.application_repo import ApplicationRepository
+
+pytestmark = pytest.mark.anyio
+
+RESUME_DATA = '{"name":"Jane Candidate"}'
+
+
+@pytest.fixture
+async def generated(db):
+    app = JobApplication(job_title="Engineer", company="Acme", job_description="Build things", ai_model="sonar-pro")
+    await ApplicationRepository.create(app)
+    path = settings.GENERATED_DIR / f"{app.id}.docx"
+    path.write_bytes(b"docx")
+    await ApplicationRepository.update(app.id, {
+        "status": "completed",
+        "generated_resume_path": str(path),
+        "resume_data": RESUME_DATA,
+        "resume_data_sha256": hashlib.sha256(RESUME_DATA.encode()).hexdigest(),
+    })
+    return app.id, str(path)
+
+
+async def test_released_resume_takes_its_preview_along(generated):
+    application_id, path = generated
+
+    assert await ApplicationRepository.release_generated(application_id, path)
+
+    app = await ApplicationRepository.get_by_id(application_id)
+    assert app['generated_resume_path'] is None
+    assert app['resume_data'] is None and app['resume_data_sha256'] is None
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get(f"/api/applications/{application_id}/preview")).status_code == 404
+
+
+async def test_release_skips_a_row_that_points_elsewhere(generated):
+    application_id, _ = generated
+
+    assert not await ApplicationRepository.release_generated(application_id, "/elsewhere.docx")
+
+    app = await ApplicationRepository.get_by_id(application_id)
+    assert app['resume_data'] == RESUME_DATA
@@ -0,0 +1,67 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from config import settings
+from models import JobApplication
+from repositories.application_repo import ApplicationRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def application(db):
+    app = JobApplication(job_title="Engineer", company="Acme", job_description="Build things", ai_model="sonar-pro")
+    await ApplicationRepository.create(app)
+    return app
+
+
+async def test_startup_leaves_unexpired_leases_alone(application):
+    # A sibling worker is generating it right now
+    live = (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat()
+    await ApplicationRepository.update(
+        application.id, {"status": "processing", "lease_owner": "sibling", "lease_expires_at": live}
+    )
+
+    await server._resume_interrupted_generations()
+
+    app = await ApplicationRepository.get_by_id(application.id)
+    assert app['status'] == "processing"
+    assert app['lease_owner'] == "sibling"
+
+
+async def test_claim_refuses_a_live_lease(application):
+    assert await ApplicationRepository.claim_generation(application.id) is not None
+    assert await ApplicationRepository.claim_generation(application.id) is None
+
+
+def _write_from_another_worker(application_id: str, job_title: str) -> None:
+    conn = sqlite3.connect(settings.DB_PATH)
+    conn.execute(
+        "UPDATE applications SET job_title = ?, updated_at = ? WHERE id = ?",
+        (job_title, datetime.now(timezone.utc).isoformat(), application_id)
+    )
+    conn.commit()
+    conn.close()
+
+
+async def test_cache_hits_are_revalidated_unless_single_worker(application, monkeypatch):
+    monkeypatch.setattr(settings, "SINGLE_WORKER", False)
+    await ApplicationRepository.get_by_id(application.id)
+
+    _write_from_another_worker(application.id, "Staff Engineer")
+
+    app = await ApplicationRepository.get_by_id(application.id)
+    assert app['job_title'] == "Staff Engineer"
+
+
+async def test_single_worker_trusts_its_cache(application, monkeypatch):
+    monkeypatch.setattr(settings, "SINGLE_WORKER", True)
+    await ApplicationRepository.get_by_id(application.id)
+
+    _write_from_another_worker(application.id, "Staff Engineer")
+
+    app = await ApplicationRepository.get_by_id(application.id)
+    assert app['job_title'] == "Engineer"
@@ -1,6 +1,6 @@
 import { useState, useEffect, useCallback } from "react";
 import { useParams, useNavigate } from "react-router-dom";
-import { ArrowLeft, Download, Loader2, FileText, Sparkles, CheckCircle2, AlertCircle, Trash2 } from "lucide-react";
+import { ArrowLeft, Download, Eye, Loader2, FileText, Sparkles, CheckCircle2, AlertCircle, Trash2, XCircle } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import { Accordion, AccordionContent, AccordionItem, AccordionTrigger } from "@/components/ui/accordion";
 import axios from "axios";
@@ -16,6 +16,7 @@ export default function ApplicationDetail() {
   const [loading, setLoading] = useState(true);
   const [generating, setGenerating] = useState(false);
   const [deleting, setDeleting] = useState(false);
+  const [stage, setStage] = useState(null);
 
   const fetchApplication = useCallback(async () => {
     try {
@@ -34,6 +35,22 @@ export default function ApplicationDetail() {
     fetchApplication();
   }, [fetchApplication]);
 
+  // Status and pipeline stage changes are pushed by the server instead of polled
+  useEffect(() => {
+    const source = new EventSource(`${API}/events?application_id=${id}`);
+    source.addEventListener("status", (event) => {
+      const data = JSON.parse(event.data);
+      if (data.status !== "processing") {
+        setStage(null);
+      }
+      fetchApplication();
+    });
+    source.addEventListener("stage", (event) => {
+      setStage(JSON.parse(event.data).stage);
+    });
+    return () => source.close();
+  }, [id, fetchApplication]);
+
   const handleGenerate = async () => {
     setGenerating(true);
     try {
@@ -103,7 +120,8 @@ export default function ApplicationDetail() {
       draft: { class: "bg-slate-50 text-slate-700 border border-slate-200", icon: FileText },
       processing: { class: "bg-amber-50 text-amber-700 border border-amber-200", icon: Loader2 },
       completed: { class: "bg-emerald-50 text-emerald-700 border border-emerald-200", icon: CheckCircle2 },
-      failed: { class: "bg-red-50 text-red-700 border border-red-200", icon: AlertCircle }
+      failed: { class: "bg-red-50 text-red-700 border border-red-200", icon: AlertCircle },
+      cancelled: { class: "bg-slate-50 text-slate-500 border border-slate-200", icon: XCircle }
     };
     const badge = badges[status] || badges.draft;
     const Icon = badge.icon;
@@ -171,7 +189,7 @@ export default function ApplicationDetail() {
               className="bg-amber-600 text-white shadow-sm h-10 px-6 py-2 rounded-md"
             >
               <Loader2 className="w-4 h-4 mr-2 animate-spin" />
-              Processing...
+              {stage ? `Processing (${stage})...` : "Processing..."}
             </Button>
           )}
           
@@ -185,6 +203,15 @@ export default function ApplicationDetail() {
                 <Download className="w-4 h-4 mr-2" />
                 Download Resume
               </Button>
+              <Button
+                data-testid="preview-resume-btn"
+                onClick={() => window.open(`${API}/applications/${id}/preview`, "_blank", "noopener")}
+                variant="outline"
+                className="bg-white text-slate-900 border border-slate-200 hover:bg-slate-50 shadow-sm h-10 px-6 py-2 rounded-md"
+              >
+                <Eye className="w-4 h-4 mr-2" />
+                Preview
+              </Button>
               <Button
                 data-testid="regenerate-resume-btn"
                 onClick={handleGenerate}
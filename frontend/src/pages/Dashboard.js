@@ -1,7 +1,8 @@
 import { useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
-import { Plus, Briefcase, FileText, Loader2, LayoutDashboard, Settings as SettingsIcon } from "lucide-react";
+import { Plus, Briefcase, FileText, Loader2, LayoutDashboard, Search, Settings as SettingsIcon } from "lucide-react";
 import { Button } from "@/components/ui/button";
+import { Input } from "@/components/ui/input";
 import axios from "axios";
 import { toast } from "sonner";
 
@@ -12,6 +13,9 @@ export default function Dashboard() {
   const navigate = useNavigate();
   const [applications, setApplications] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [query, setQuery] = useState("");
+  const [searchResults, setSearchResults] = useState(null);
+  const [searching, setSearching] = useState(false);
 
   useEffect(() => {
     fetchApplications();
@@ -19,7 +23,7 @@ export default function Dashboard() {
 
   const fetchApplications = async () => {
     try {
-      const response = await axios.get(`${API}/applications`);
+      const response = await axios.get(`${API}/applications`, { params: { fields: "summary" } });
       setApplications(response.data);
     } catch (error) {
       console.error("Error fetching applications:", error);
@@ -29,12 +33,43 @@ export default function Dashboard() {
     }
   };
 
+  const handleSearch = async (e) => {
+    e.preventDefault();
+    if (!query.trim()) {
+      setSearchResults(null);
+      return;
+    }
+    setSearching(true);
+    try {
+      const response = await axios.get(`${API}/applications/search`, { params: { q: query } });
+      setSearchResults(response.data);
+    } catch (error) {
+      console.error("Error searching applications:", error);
+      toast.error("Search failed");
+    } finally {
+      setSearching(false);
+    }
+  };
+
+  // Snippets wrap matches in \x02…\x03; split on them so every odd part is a match
+  const renderSnippet = (snippet) =>
+    snippet.split(/\x02(.*?)\x03/g).map((part, i) =>
+      i % 2 === 1 ? (
+        <mark key={i} className="bg-amber-100 text-slate-900 rounded px-0.5">
+          {part}
+        </mark>
+      ) : (
+        part
+      )
+    );
+
   const getStatusBadge = (status) => {
     const badges = {
       draft: "bg-slate-50 text-slate-700 border border-slate-200 px-2 py-1 rounded-full text-xs font-medium",
       processing: "bg-amber-50 text-amber-700 border border-amber-200 px-2 py-1 rounded-full text-xs font-medium",
       completed: "bg-emerald-50 text-emerald-700 border border-emerald-200 px-2 py-1 rounded-full text-xs font-medium",
-      failed: "bg-red-50 text-red-700 border border-red-200 px-2 py-1 rounded-full text-xs font-medium"
+      failed: "bg-red-50 text-red-700 border border-red-200 px-2 py-1 rounded-full text-xs font-medium",
+      cancelled: "bg-slate-50 text-slate-500 border border-slate-200 px-2 py-1 rounded-full text-xs font-medium"
     };
     return badges[status] || badges.draft;
   };
@@ -97,8 +132,52 @@ export default function Dashboard() {
             </Button>
           </div>
 
-          {/* Applications Grid */}
-          {loading ? (
+          {/* Search */}
+          <form onSubmit={handleSearch} className="flex items-center gap-2 mb-6">
+            <div className="relative flex-1">
+              <Search className="w-4 h-4 text-slate-400 absolute left-3 top-1/2 -translate-y-1/2" strokeWidth={1.5} />
+              <Input
+                data-testid="search-applications-input"
+                value={query}
+                onChange={(e) => setQuery(e.target.value)}
+                placeholder="Search by title, company, description or keywords"
+                className="pl-9 bg-white"
+              />
+            </div>
+            <Button type="submit" variant="outline" disabled={searching}>
+              {searching ? <Loader2 className="w-4 h-4 animate-spin" /> : "Search"}
+            </Button>
+            {searchResults && (
+              <Button type="button" variant="ghost" onClick={() => { setQuery(""); setSearchResults(null); }}>
+                Clear
+              </Button>
+            )}
+          </form>
+
+          {/* Search Results / Applications Grid */}
+          {searchResults ? (
+            <div data-testid="search-results" className="space-y-3">
+              <p className="text-sm text-slate-500">
+                {searchResults.total} result(s) for "{searchResults.query}"
+              </p>
+              {searchResults.results.map((result) => (
+                <div
+                  key={result.id}
+                  className="bg-white border border-slate-200 shadow-sm rounded-lg p-4 hover:border-blue-300 transition-all cursor-pointer"
+                  onClick={() => navigate(`/application/${result.id}`)}
+                >
+                  <div className="flex items-start justify-between mb-2">
+                    <div>
+                      <h3 className="text-base font-semibold text-slate-900">{result.job_title}</h3>
+                      <p className="text-sm text-slate-500">{result.company}</p>
+                    </div>
+                    <span className={getStatusBadge(result.status)}>{result.status}</span>
+                  </div>
+                  <p className="text-sm text-slate-600">{renderSnippet(result.snippet)}</p>
+                </div>
+              ))}
+            </div>
+          ) : loading ? (
             <div className="flex items-center justify-center py-20">
               <Loader2 className="w-8 h-8 text-slate-400 animate-spin" />
             </div>
@@ -144,7 +223,7 @@ export default function Dashboard() {
                   <div className="space-y-2 text-xs text-slate-500">
                     <div className="flex items-center gap-2">
                       <FileText className="w-4 h-4" strokeWidth={1.5} />
-                      <span>{app.base_resumes?.length || 0} resume(s) uploaded</span>
+                      <span>{app.resume_count ?? app.base_resumes?.length ?? 0} resume(s) uploaded</span>
                     </div>
                     <div className="flex items-center gap-2">
                       <Briefcase className="w-4 h-4" strokeWidth={1.5} />